@@ -16,11 +16,13 @@ from rabbitai.extensions import (
     APP_DIR,
     appbuilder,
     async_query_manager,
+    cache_key_index,
     cache_manager,
     celery_app,
     csrf,
     db,
     encrypted_field_factory,
+    engine_registry,
     feature_flag_manager,
     machine_auth_provider_factory,
     manifest_processor,
@@ -233,7 +235,9 @@ class RabbitaiAppInitializer:
     def configure_cache(self) -> None:
         """配置缓存管理器"""
         cache_manager.init_app(self.flask_app)
+        cache_key_index.init_app(self.flask_app, cache_manager.data_cache.cache)
         results_backend_manager.init_app(self.flask_app)
+        engine_registry.init_app(self.flask_app)
 
     # region in_ctx
 
@@ -8,10 +8,14 @@ from flask_appbuilder.security.decorators import protect
 from marshmallow.exceptions import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
 
-from rabbitai.cachekeys.schemas import CacheInvalidationRequestSchema
+from rabbitai.cachekeys.schemas import (
+    CacheInvalidationRequestSchema,
+    MemoizedCachesClearRequestSchema,
+)
 from rabbitai.connectors.connector_registry import ConnectorRegistry
-from rabbitai.extensions import cache_manager, db, event_logger
+from rabbitai.extensions import cache_key_index, cache_manager, db, event_logger
 from rabbitai.models.cache import CacheKey
+from rabbitai.utils.core import clear_memoized_caches, get_memoized_stats
 from rabbitai.views.base_api import BaseRabbitaiModelRestApi, statsd_metrics
 
 logger = logging.getLogger(__name__)
@@ -24,9 +28,19 @@ class CacheRestApi(BaseRabbitaiModelRestApi):
     class_permission_name = "CacheRestApi"
     include_route_methods = {
         "invalidate",
+        "memoized",
+        "clear_memoized",
+    }
+    method_permission_name = {
+        **BaseRabbitaiModelRestApi.method_permission_name,
+        "memoized": "memoized",
+        "clear_memoized": "memoized",
     }
 
-    openapi_spec_component_schemas = (CacheInvalidationRequestSchema,)
+    openapi_spec_component_schemas = (
+        CacheInvalidationRequestSchema,
+        MemoizedCachesClearRequestSchema,
+    )
 
     @expose("/invalidate", methods=["POST"])
     @protect()
@@ -77,6 +91,15 @@ class CacheRestApi(BaseRabbitaiModelRestApi):
             if ds_obj:
                 datasource_uids.add(ds_obj.uid)
 
+        cache_manager.delete_local_data(datasource_uids=datasource_uids)
+        if cache_key_index.enabled:
+            indexed_keys_count = cache_key_index.invalidate(datasource_uids)
+            self.stats_logger.gauge("invalidated_indexed_cache", indexed_keys_count)
+            logger.info(
+                "Invalidated %s indexed cache keys for %s datasources",
+                indexed_keys_count,
+                len(datasource_uids),
+            )
         cache_key_objs = (
             db.session.query(CacheKey)
             .filter(CacheKey.datasource_uid.in_(datasource_uids))
@@ -111,3 +134,88 @@ class CacheRestApi(BaseRabbitaiModelRestApi):
                 return self.response_500(str(ex))
             db.session.commit()
         return self.response(201)
+
+    @expose("/memoized", methods=["GET"])
+    @protect()
+    @safe
+    @statsd_metrics
+    def memoized(self) -> Response:
+        """
+        Returns the statistics of the caches of the memoized functions of the
+        worker serving the request
+
+        ---
+        get:
+          description: >-
+            Returns the size, the bounds and the hit rate of the caches of the
+            memoized functions of the worker serving the request
+          responses:
+            200:
+              description: The statistics of the caches
+              content:
+                application/json:
+                  schema:
+                    type: object
+                    properties:
+                      result:
+                        type: array
+                        items:
+                          type: object
+            401:
+              $ref: '#/components/responses/401'
+            500:
+              $ref: '#/components/responses/500'
+        """
+        stats = get_memoized_stats()
+        for cache_stats in stats:
+            self.stats_logger.gauge(
+                f"memoized.{cache_stats['name']}.size", cache_stats["size"]
+            )
+        return self.response(200, result=stats)
+
+    @expose("/memoized/clear", methods=["POST"])
+    @protect()
+    @safe
+    @statsd_metrics
+    @event_logger.log_this_with_context(log_to_statsd=False)
+    def clear_memoized(self) -> Response:
+        """
+        Clears the caches of the memoized functions of the worker serving the
+        request
+
+        ---
+        post:
+          description: >-
+            Clears the caches of the memoized functions of the worker serving the
+            request
+          requestBody:
+            description: The names of the memoized functions
+            required: false
+            content:
+              application/json:
+                schema:
+                  $ref: "#/components/schemas/MemoizedCachesClearRequestSchema"
+          responses:
+            200:
+              description: The caches were cleared
+              content:
+                application/json:
+                  schema:
+                    type: object
+                    properties:
+                      cleared:
+                        type: integer
+            400:
+              $ref: '#/components/responses/400'
+            401:
+              $ref: '#/components/responses/401'
+            500:
+              $ref: '#/components/responses/500'
+        """
+        try:
+            params = MemoizedCachesClearRequestSchema().load(request.json or {})
+        except ValidationError as error:
+            return self.response_400(message=str(error))
+        cleared = clear_memoized_caches(params.get("names"))
+        logger.info("Cleared %s memoized values", cleared)
+        return self.response(200, cleared=cleared)
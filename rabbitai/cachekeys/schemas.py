@@ -27,3 +27,10 @@ class CacheInvalidationRequestSchema(Schema):
         fields.Nested(Datasource),
         description="A list of the data source and database names",
     )
+
+
+class MemoizedCachesClearRequestSchema(Schema):
+    names = fields.List(
+        fields.String(),
+        description="The names of the memoized functions, all of them when not set",
+    )
@@ -5,8 +5,16 @@ from io import BytesIO
 from typing import Any, Dict, Optional
 from zipfile import ZipFile
 
-import simplejson
-from flask import g, make_response, redirect, request, Response, send_file, url_for
+from flask import (
+    g,
+    make_response,
+    redirect,
+    request,
+    Response,
+    send_file,
+    stream_with_context,
+    url_for,
+)
 from flask_appbuilder.api import expose, protect, rison, safe
 from flask_appbuilder.hooks import before_request
 from flask_appbuilder.models.sqla.interface import SQLAInterface
@@ -16,6 +24,7 @@ from werkzeug.wrappers import Response as WerkzeugResponse
 from werkzeug.wsgi import FileWrapper
 
 from rabbitai import is_feature_enabled, thumbnail_cache
+from rabbitai.charts.commands.batch_data import ChartDataBatchCommand
 from rabbitai.charts.commands.bulk_delete import BulkDeleteChartCommand
 from rabbitai.charts.commands.create import CreateChartCommand
 from rabbitai.charts.commands.data import ChartDataCommand
@@ -38,6 +47,7 @@ from rabbitai.charts.dao import ChartDAO
 from rabbitai.charts.filters import ChartAllTextFilter, ChartFavoriteFilter, ChartFilter
 from rabbitai.charts.schemas import (
     CHART_SCHEMAS,
+    ChartDataBatchSchema,
     ChartPostSchema,
     ChartPutSchema,
     get_delete_ids_schema,
@@ -58,7 +68,7 @@ from rabbitai.utils.async_query_manager import AsyncQueryTokenException
 from rabbitai.utils.core import (
     ChartDataResultFormat,
     ChartDataResultType,
-    json_int_dttm_ser,
+    fast_json_dumps,
 )
 from rabbitai.utils.screenshots import ChartScreenshot
 from rabbitai.utils.urls import get_url_path
@@ -91,6 +101,7 @@ class ChartRestApi(BaseRabbitaiModelRestApi):
         RouteMethod.RELATED,
         "bulk_delete",  # not using RouteMethod since locally defined
         "data",
+        "data_batch",
         "data_from_cache",
         "viz_types",
         "favorite_status",
@@ -484,12 +495,11 @@ class ChartRestApi(BaseRabbitaiModelRestApi):
             data = result["queries"][0]["data"]
             return CsvResponse(data, headers=generate_download_headers("csv"))
 
-        if result_format == ChartDataResultFormat.JSON:
-            response_data = simplejson.dumps(
-                {"result": result["queries"]},
-                default=json_int_dttm_ser,
-                ignore_nan=True,
-            )
+        if result_format in (
+            ChartDataResultFormat.JSON,
+            ChartDataResultFormat.COLUMNAR,
+        ):
+            response_data = fast_json_dumps({"result": result["queries"]})
             resp = make_response(response_data, 200)
             resp.headers["Content-Type"] = "application/json; charset=utf-8"
             return resp
@@ -584,6 +594,68 @@ class ChartRestApi(BaseRabbitaiModelRestApi):
 
         return self.get_data_response(command)
 
+    @expose("/data/batch", methods=["POST"])
+    @protect()
+    @statsd_metrics
+    @event_logger.log_this_with_context(
+        action=lambda self, *args, **kwargs: f"{self.__class__.__name__}.data_batch",
+        log_to_statsd=False,
+    )
+    def data_batch(self) -> Response:
+        """
+        Takes many query contexts, e.g. of all the charts of a dashboard, and
+        streams the payload data response of each of them as soon as it's ready.
+        ---
+        post:
+          description: >-
+            Takes many query contexts and streams the payload data response of
+            each of them, as newline delimited JSON, as soon as it's ready.
+            Identical query objects are only computed once. Only the `json` and
+            `columnar` result formats are supported.
+          requestBody:
+            description: >-
+              The query contexts, see the data endpoint.
+            required: true
+            content:
+              application/json:
+                schema:
+                  $ref: "#/components/schemas/ChartDataBatchSchema"
+          responses:
+            200:
+              description: >-
+                One line per query context with its index in the request and
+                either its results or its error message and status code
+              content:
+                application/x-ndjson:
+                  schema:
+                    $ref: "#/components/schemas/ChartDataBatchResponseSchema"
+            400:
+              $ref: '#/components/responses/400'
+            401:
+              $ref: '#/components/responses/401'
+            500:
+              $ref: '#/components/responses/500'
+        """
+        if not request.is_json:
+            return self.response_400(message=_("Request is not JSON"))
+        try:
+            batch = ChartDataBatchSchema().load(request.json)
+        except ValidationError as error:
+            return self.response_400(
+                message=_(
+                    "Request is incorrect: %(error)s", error=error.normalized_messages()
+                )
+            )
+
+        command = ChartDataBatchCommand(batch["queries"])
+        command.validate()
+        return Response(
+            stream_with_context(
+                fast_json_dumps(result) + "\n" for result in command.run()
+            ),
+            mimetype="application/x-ndjson",
+        )
+
     @expose("/data/<cache_key>", methods=["GET"])
     @protect()
     @statsd_metrics
@@ -0,0 +1,166 @@
+import json
+import logging
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from flask_babel import gettext as _
+from marshmallow import ValidationError
+
+from rabbitai import app
+from rabbitai.charts.schemas import ChartDataQueryContextSchema
+from rabbitai.commands.base import BaseCommand
+from rabbitai.commands.exceptions import CommandException
+from rabbitai.common.query_context import QueryContext
+from rabbitai.exceptions import QueryObjectValidationError, RabbitaiSecurityException
+from rabbitai.extensions import security_manager
+from rabbitai.utils.concurrency import iter_concurrently
+from rabbitai.utils.core import ChartDataResultFormat
+
+logger = logging.getLogger(__name__)
+
+
+class ChartDataBatchCommand(BaseCommand):
+    """
+    Get the data of many query contexts, e.g. of all the charts of a dashboard.
+
+    The datasources are loaded and the access to each of them is checked once,
+    identical query objects are computed once, and the distinct ones are computed
+    concurrently. The result of each query context is returned as soon as all of
+    its query objects are done.
+    """
+
+    def __init__(self, form_data: List[Dict[str, Any]]) -> None:
+        self._form_data = form_data
+        self._query_contexts: List[Optional[QueryContext]] = []
+        self._errors: Dict[int, Dict[str, Any]] = {}
+
+    def _error(self, index: int, message: str, status: int = 400) -> None:
+        self._errors[index] = {"index": index, "message": message, "status": status}
+
+    def validate(self) -> None:
+        """
+        Load the query contexts and check the access to their datasources. The
+        errors of the query contexts are returned by `run` instead of raised.
+        """
+        access_errors: Dict[str, Optional[RabbitaiSecurityException]] = {}
+        for index, form_data in enumerate(self._form_data):
+            self._query_contexts.append(None)
+            try:
+                query_context = ChartDataQueryContextSchema().load(form_data)
+                if query_context.result_format not in (
+                    ChartDataResultFormat.JSON,
+                    ChartDataResultFormat.COLUMNAR,
+                ):
+                    raise QueryObjectValidationError(
+                        _(
+                            "Unsupported result_format: %(result_format)s",
+                            result_format=query_context.result_format,
+                        )
+                    )
+                for query in query_context.queries:
+                    query.validate()
+            except KeyError:
+                self._error(index, _("Request is incorrect"))
+                continue
+            except ValidationError as ex:
+                message = ex.normalized_messages()
+                self._error(index, _("Request is incorrect: %(error)s", error=message))
+                continue
+            except QueryObjectValidationError as ex:
+                self._error(index, ex.message)
+                continue
+            except CommandException as ex:
+                self._error(index, ex.message, status=ex.status)
+                continue
+
+            datasource = query_context.datasource
+            if datasource.uid not in access_errors:
+                try:
+                    security_manager.raise_for_access(datasource=datasource)
+                    access_errors[datasource.uid] = None
+                except RabbitaiSecurityException as ex:
+                    access_errors[datasource.uid] = ex
+            access_error = access_errors[datasource.uid]
+            if access_error:
+                self._error(index, access_error.message, status=403)
+            else:
+                self._query_contexts[index] = query_context
+
+    @staticmethod
+    def _get_query_key(form_data: Dict[str, Any], query: Dict[str, Any]) -> str:
+        """A key identifying a query object of a query context"""
+        return json.dumps(
+            {
+                **{key: value for key, value in form_data.items() if key != "queries"},
+                "query": query,
+            },
+            sort_keys=True,
+            default=str,
+        )
+
+    @staticmethod
+    def _safe(
+        task: Callable[[], Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Optional[int]]:
+        """Run a task, returning its result and the status code of its failure"""
+        try:
+            return task(), None
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.exception(ex)
+            return {"error": str(ex)}, 500
+
+    def run(self) -> Iterator[Dict[str, Any]]:
+        """
+        Get the results of the query contexts, in the order they are ready in.
+
+        :return: an iterator of the results of the query contexts, with their index
+        """
+        yield from self._errors.values()
+
+        tasks: List[Callable[[], Tuple[Dict[str, Any], Optional[int]]]] = []
+        task_indexes: Dict[str, int] = {}
+        # indexes of the tasks of each query context
+        query_context_tasks: Dict[int, List[int]] = {}
+        for index, query_context in enumerate(self._query_contexts):
+            if query_context is None:
+                continue
+            query_context.load_datasource()
+            query_context_tasks[index] = []
+            for query_obj, query in zip(
+                query_context.queries, self._form_data[index]["queries"]
+            ):
+                key = self._get_query_key(self._form_data[index], query)
+                if key not in task_indexes:
+                    task_indexes[key] = len(tasks)
+                    tasks.append(
+                        partial(
+                            self._safe,
+                            partial(query_context.get_query_object_payload, query_obj),
+                        )
+                    )
+                query_context_tasks[index].append(task_indexes[key])
+
+        results: Dict[int, Tuple[Dict[str, Any], Optional[int]]] = {}
+        for task_index, result in iter_concurrently(
+            tasks, app.config["CHART_DATA_BATCH_CONCURRENCY"]
+        ):
+            results[task_index] = result
+            for index, indexes in list(query_context_tasks.items()):
+                if task_index in indexes and all(task in results for task in indexes):
+                    del query_context_tasks[index]
+                    yield self._get_query_context_result(
+                        index, [results[task] for task in indexes]
+                    )
+
+    @staticmethod
+    def _get_query_context_result(
+        index: int, results: List[Tuple[Dict[str, Any], Optional[int]]]
+    ) -> Dict[str, Any]:
+        for query, status in results:
+            if query.get("error"):
+                return {
+                    "index": index,
+                    "message": f"Error: {query['error']}",
+                    "status": status or 400,
+                }
+        return {"index": index, "result": [result[0] for result in results]}
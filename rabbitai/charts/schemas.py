@@ -1119,6 +1119,14 @@ class ChartDataResponseResult(Schema):
     rowcount = fields.Integer(
         description="Amount of rows in result set", allow_none=False,
     )
+    duration_ms = fields.Float(
+        description="Time spent getting the result, in milliseconds", allow_none=False,
+    )
+    post_processing_timings = fields.List(
+        fields.Dict(),
+        description="The post processing steps run on the result, with the time "
+        "spent in each of them, in milliseconds",
+    )
     data = fields.List(fields.Dict(), description="A list with results")
     applied_filters = fields.List(
         fields.Dict(), description="A list with applied filters"
@@ -1135,6 +1143,31 @@ class ChartDataResponseSchema(Schema):
     )
 
 
+class ChartDataBatchSchema(Schema):
+    queries = fields.List(
+        fields.Dict(),
+        description="The query contexts of the charts, see "
+        "`ChartDataQueryContextSchema`",
+        required=True,
+        validate=Length(1, app.config["CHART_DATA_BATCH_MAX_SIZE"]),
+    )
+
+
+class ChartDataBatchResponseSchema(Schema):
+    index = fields.Integer(
+        description="Index of the query context in the request", allow_none=False,
+    )
+    result = fields.List(
+        fields.Nested(ChartDataResponseResult),
+        description="A list of results for each corresponding query of the query "
+        "context",
+    )
+    message = fields.String(description="Error message", allow_none=True)
+    status = fields.Integer(
+        description="HTTP status code of the error, if any", allow_none=True,
+    )
+
+
 class ChartDataAsyncResponseSchema(Schema):
     channel_id = fields.String(
         description="Unique session async channel ID", allow_none=False,
@@ -1172,6 +1205,8 @@ class ImportV1ChartSchema(Schema):
 CHART_SCHEMAS = (
     ChartDataQueryContextSchema,
     ChartDataResponseSchema,
+    ChartDataBatchSchema,
+    ChartDataBatchResponseSchema,
     ChartDataAsyncResponseSchema,
     # TODO: These should optimally be included in the QueryContext schema as an `anyOf`
     #  in ChartDataPostPricessingOperation.options, but since `anyOf` is not
@@ -536,6 +536,36 @@ else:
         yaml.safe_dump(data, sys.stdout, default_flow_style=False)
 
 
+@rabbitai.command()
+@with_appcontext
+@click.option(
+    "--name",
+    "-n",
+    "names",
+    multiple=True,
+    help="Name of a memoized function, all of them when not set",
+)
+@click.option("--clear", "-c", is_flag=True, help="Clear the caches")
+def memoized_caches(names: List[str], clear: bool) -> None:
+    """Show or clear the caches of the memoized functions
+
+    The caches are local to each process, the command inspects the caches of
+    its own process, the caches of the web workers being exposed by the
+    /api/v1/cachekey/memoized endpoints"""
+    if clear:
+        cleared = utils.clear_memoized_caches(names or None)
+        print(Fore.GREEN + f"Cleared {cleared} memoized values" + Style.RESET_ALL)
+        return
+    for stats in utils.get_memoized_stats(names or None):
+        hit_rate = "-" if stats["hit_rate"] is None else f"{stats['hit_rate']:.1%}"
+        print(
+            f"{stats['name']}: {stats['size']}/{stats['max_size'] or '-'} values, "
+            f"{stats['instances']} instances, {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['evictions']} evictions, "
+            f"hit rate {hit_rate}"
+        )
+
+
 @rabbitai.command()
 @with_appcontext
 def update_datasources_cache() -> None:
@@ -0,0 +1,312 @@
+"""Planning of the post processing operations of query objects.
+
+The operations of a query object are validated at once before any of them runs,
+then consecutive operations are fused to avoid copying the whole DataFrame at each
+of them:
+
+- operations adding columns computed from other columns (``diff``, ``cum`` and
+  ``rolling`` without ``min_periods``) compute their columns on a DataFrame of their
+  source columns only, and the columns of all of them are added at once;
+- consecutive ``select`` and ``sort`` operations are resolved to a single selection
+  of the rows and columns of the DataFrame.
+
+A leading ``sort`` is also pushed down to the query when it sorts metrics and
+columns of the query, for the row limit to keep the first rows, and the metrics not
+selected by a leading ``select`` aren't queried at all.
+"""
+import logging
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from flask_babel import gettext as _
+from pandas import DataFrame
+
+from rabbitai.exceptions import QueryObjectValidationError
+from rabbitai.typing import Metric, OrderBy
+from rabbitai.utils import pandas_postprocessing
+from rabbitai.utils.core import get_metric_name
+
+if TYPE_CHECKING:
+    from rabbitai.common.query_object import QueryObject
+
+logger = logging.getLogger(__name__)
+
+# the operations adding columns computed from source columns, the `columns` of
+# their options mapping source columns to target columns
+COLUMN_OPERATIONS = {"cum", "diff", "rolling"}
+# the operations selecting the rows and columns of the DataFrame
+SELECTION_OPERATIONS = {"select", "sort"}
+# the operations caching state per query, given the identity of the query and the
+# uid of its datasource
+QUERY_KEY_OPERATIONS = {"prophet"}
+
+Operation = Tuple[str, Dict[str, Any]]
+
+
+class PostProcessingStep:
+    """One or more fused post processing operations"""
+
+    def __init__(
+        self, operations: List[Operation], func: Callable[[DataFrame], DataFrame]
+    ) -> None:
+        self.operations = operations
+        self.func = func
+
+    @property
+    def name(self) -> str:
+        return "+".join(operation[0] for operation in self.operations)
+
+
+def _is_column_operation(operation: str, options: Dict[str, Any]) -> bool:
+    return operation in COLUMN_OPERATIONS and not (
+        operation == "rolling" and options.get("min_periods")
+    )
+
+
+def _get_operation_func(operation: str) -> Callable[..., DataFrame]:
+    return getattr(pandas_postprocessing, operation)
+
+
+def _run_column_operations(df: DataFrame, operations: List[Operation]) -> DataFrame:
+    """Add the columns of operations adding columns to a DataFrame, at once"""
+    columns: Dict[str, Any] = {}
+    for operation, options in operations:
+        source_columns = list(options.get("columns") or {})
+        source_df = DataFrame(
+            {
+                column: columns[column] if column in columns else df[column]
+                for column in source_columns
+                if column in columns or column in df.columns
+            },
+            index=df.index,
+        )
+        result_df = _get_operation_func(operation)(source_df, **options)
+        for target in (options.get("columns") or {}).values():
+            columns[target] = result_df[target]
+    return df.assign(**columns)
+
+
+def _run_selection_operations(df: DataFrame, operations: List[Operation]) -> DataFrame:
+    """Select the rows and columns of a DataFrame of select and sort operations"""
+    labels: List[Any] = df.columns.tolist()
+    sources = {label: label for label in labels}
+    sort_keys: List[Tuple[Any, bool]] = []
+    for operation, options in operations:
+        referenced = list(options.get("columns") or [])
+        if operation == "select":
+            referenced += list(options.get("exclude") or [])
+            referenced += list(options.get("rename") or {})
+        if any(label not in sources for label in referenced):
+            raise QueryObjectValidationError(
+                _("Referenced columns not available in DataFrame.")
+            )
+
+        if operation == "sort":
+            keys = [
+                (sources[label], ascending)
+                for label, ascending in options["columns"].items()
+            ]
+            # the previous sorts order the rows with equal keys
+            sort_keys = keys + [
+                key for key in sort_keys if key[0] not in dict(keys).keys()
+            ]
+            continue
+
+        if options.get("columns"):
+            labels = list(options["columns"])
+        exclude = options.get("exclude") or []
+        labels = [label for label in labels if label not in exclude]
+        rename = options.get("rename") or {}
+        sources = {rename.get(label, label): sources[label] for label in labels}
+        labels = [rename.get(label, label) for label in labels]
+
+    rows: Any = slice(None)
+    if sort_keys:
+        keys = dict(sort_keys)
+        rows = (
+            df[list(keys)]
+            .reset_index(drop=True)
+            .sort_values(by=list(keys), ascending=list(keys.values()))
+            .index
+        )
+    columns = df.columns.get_indexer([sources[label] for label in labels])
+    result = df.iloc[rows, columns]
+    result.columns = labels
+    return result
+
+
+class PostProcessingPlan:
+    """
+    The post processing operations of a query object, validated and fused.
+    """
+
+    def __init__(
+        self,
+        post_processing: List[Dict[str, Any]],
+        query_key: Optional[str] = None,
+        datasource_uid: Optional[str] = None,
+    ) -> None:
+        self.post_processing = post_processing
+        self.query_key = query_key
+        self.datasource_uid = datasource_uid
+
+    @property
+    def uses_query_key(self) -> bool:
+        return any(
+            post_process.get("operation") in QUERY_KEY_OPERATIONS
+            for post_process in self.post_processing
+        )
+
+    def get_operations(self) -> List[Operation]:
+        """
+        Validate the post processing operations.
+
+        :returns: The name and options of the operations
+        :raises QueryObjectValidationError: If an operation is incorrect
+        """
+        operations = []
+        for post_process in self.post_processing:
+            operation = post_process.get("operation")
+            if not operation:
+                raise QueryObjectValidationError(
+                    _("`operation` property of post processing object undefined")
+                )
+            if operation.startswith("_") or not hasattr(
+                pandas_postprocessing, operation
+            ):
+                raise QueryObjectValidationError(
+                    _(
+                        "Unsupported post processing operation: %(operation)s",
+                        operation=operation,
+                    )
+                )
+            options = post_process.get("options") or {}
+            if operation in QUERY_KEY_OPERATIONS:
+                options = {
+                    **options,
+                    "query_key": self.query_key,
+                    "datasource_uid": self.datasource_uid,
+                }
+            operations.append((operation, options))
+        return operations
+
+    def get_steps(self) -> List[PostProcessingStep]:
+        """
+        Fuse the post processing operations into steps.
+
+        :returns: The steps running the operations
+        :raises QueryObjectValidationError: If an operation is incorrect
+        """
+        groups: List[List[Operation]] = []
+        for operation, options in self.get_operations():
+            previous = groups[-1][-1] if groups else None
+            if previous and (
+                (
+                    _is_column_operation(operation, options)
+                    and _is_column_operation(*previous)
+                )
+                or (
+                    operation in SELECTION_OPERATIONS
+                    and previous[0] in SELECTION_OPERATIONS
+                )
+            ):
+                groups[-1].append((operation, options))
+            else:
+                groups.append([(operation, options)])
+
+        steps = []
+        for group in groups:
+            operation, options = group[0]
+            func: Callable[[DataFrame], DataFrame]
+            if len(group) > 1 and _is_column_operation(operation, options):
+                func = partial(_run_column_operations, operations=group)
+            elif len(group) > 1:
+                func = partial(_run_selection_operations, operations=group)
+            else:
+                func = partial(_get_operation_func(operation), **options)
+            steps.append(PostProcessingStep(group, func))
+        return steps
+
+    def execute(self, df: DataFrame) -> Tuple[DataFrame, List[Dict[str, Any]]]:
+        """
+        Run the post processing operations on a DataFrame.
+
+        :param df: DataFrame returned from database model
+        :returns: The post processed DataFrame, and the time spent in each step
+        :raises QueryObjectValidationError: If an operation is incorrect
+        """
+        timings = []
+        for step in self.get_steps():
+            start = time.perf_counter()
+            df = step.func(df)
+            timings.append(
+                {
+                    "operation": step.name,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                }
+            )
+        return df, timings
+
+    def push_down(self, query_object: "QueryObject") -> None:
+        """
+        Push the leading operations which can be run by the database down to the
+        query of the query object.
+
+        :param query_object: The query object
+        """
+        operations = [
+            (post_process.get("operation"), post_process.get("options") or {})
+            for post_process in self.post_processing
+        ]
+        sorted_labels: List[str] = []
+        if operations and operations[0][0] == "sort":
+            orderby = self._get_orderby(query_object, operations[0][1])
+            if orderby:
+                # the DataFrame is still sorted, the databases order nulls differently
+                query_object.orderby = orderby
+            sorted_labels = list(operations[0][1].get("columns") or [])
+            operations = operations[1:]
+
+        if operations and operations[0][0] == "select":
+            selected = operations[0][1].get("columns")
+            # the series limit orders the series by the first metric by default
+            ranked = (
+                query_object.is_timeseries
+                and query_object.timeseries_limit
+                and not query_object.timeseries_limit_metric
+            )
+            metrics = [
+                metric
+                for i, metric in enumerate(query_object.metrics or [])
+                if not selected
+                or get_metric_name(metric) in selected
+                or get_metric_name(metric) in sorted_labels
+                or (ranked and i == 0)
+            ]
+            if metrics and len(metrics) < len(query_object.metrics or []):
+                query_object.metrics = metrics
+
+    @staticmethod
+    def _get_orderby(
+        query_object: "QueryObject", options: Dict[str, Any]
+    ) -> Optional[List[OrderBy]]:
+        if (
+            query_object.is_timeseries
+            or query_object.orderby
+            or not isinstance(options.get("columns"), dict)
+        ):
+            return None
+        metrics: Dict[str, Metric] = {
+            get_metric_name(metric): metric for metric in query_object.metrics or []
+        }
+        columns = set(query_object.columns + query_object.groupby)
+        orderby: List[OrderBy] = []
+        for label, ascending in options["columns"].items():
+            if label in metrics:
+                orderby.append((metrics[label], bool(ascending)))
+            elif label in columns:
+                orderby.append((label, bool(ascending)))
+            else:
+                return None
+        return orderby
@@ -1,4 +1,8 @@
+import copy
 import logging
+import time
+from contextlib import nullcontext
+from functools import partial
 from typing import Any, ClassVar, Dict, List, Optional, Union
 
 import numpy as np
@@ -12,6 +16,7 @@ from rabbitai.common.query_actions import get_query_results
 from rabbitai.common.query_object import QueryObject
 from rabbitai.connectors.base.models import BaseDatasource
 from rabbitai.connectors.connector_registry import ConnectorRegistry
+from rabbitai.dataframe import df_to_columns
 from rabbitai.exceptions import (
     CacheLoadError,
     QueryObjectValidationError,
@@ -20,7 +25,13 @@ from rabbitai.exceptions import (
 from rabbitai.extensions import cache_manager, security_manager
 from rabbitai.stats_logger import BaseStatsLogger
 from rabbitai.utils import csv
-from rabbitai.utils.cache import generate_cache_key, set_and_log_cache
+from rabbitai.utils.cache import generate_cache_key, set_and_log_cache, single_flight
+from rabbitai.utils.concurrency import (
+    attach_to_thread_session,
+    database_slot,
+    get_database_id,
+    run_concurrently,
+)
 from rabbitai.utils.core import (
     ChartDataResultFormat,
     ChartDataResultType,
@@ -32,6 +43,11 @@ from rabbitai.utils.core import (
     normalize_dttm_col,
     QueryStatus,
 )
+from rabbitai.utils.incremental_cache import (
+    get_incremental_result,
+    get_partitions,
+    Partition,
+)
 from rabbitai.views.utils import get_viz
 
 config = app.config
@@ -48,7 +64,6 @@ class QueryContext:
     cache_type: ClassVar[str] = "df"
     enforce_numerical_metrics: ClassVar[bool] = True
 
-    datasource: BaseDatasource
     queries: List[QueryObject]
     force: bool
     custom_cache_timeout: Optional[int]
@@ -66,7 +81,7 @@ class QueryContext:
         result_type: Optional[ChartDataResultType] = None,
         result_format: Optional[ChartDataResultFormat] = None,
     ) -> None:
-        self.datasource = ConnectorRegistry.get_datasource(
+        self._datasource = ConnectorRegistry.get_datasource(
             str(datasource["type"]), int(datasource["id"]), db.session
         )
         self.queries = [QueryObject(**query_obj) for query_obj in queries]
@@ -81,6 +96,11 @@ class QueryContext:
             "result_format": self.result_format,
         }
 
+    @property
+    def datasource(self) -> BaseDatasource:
+        """The datasource, in the database session of the current thread"""
+        return attach_to_thread_session(self._datasource)
+
     def get_query_result(self, query_object: QueryObject) -> Dict[str, Any]:
         """Returns a pandas dataframe based on the query object"""
 
@@ -95,7 +115,8 @@ class QueryContext:
                 timestamp_format = dttm_col.python_date_format
 
         # The datasource here can be different backend but the interface is common
-        result = self.datasource.query(query_object.to_dict())
+        with database_slot(get_database_id(self.datasource)):
+            result = self.datasource.query(query_object.to_dict())
 
         df = result.df
         # Transform the timestamp we received from database to pandas supported
@@ -115,7 +136,7 @@ class QueryContext:
                 self.df_metrics_to_num(df, query_object)
 
             df.replace([np.inf, -np.inf], np.nan, inplace=True)
-            df = query_object.exec_post_processing(df)
+            df = query_object.exec_post_processing(df, self.datasource.uid)
 
         return {
             "query": result.query,
@@ -124,6 +145,60 @@ class QueryContext:
             "df": df,
         }
 
+    def get_incremental_query_result(self, query_object: QueryObject) -> Dict[str, Any]:
+        """
+        Returns the result of the query object, from the cached data of the days of
+        its time range when it can be cached incrementally.
+        """
+        partitions = (
+            None
+            if self.force
+            else get_partitions(query_object.to_dict(), self.datasource)
+        )
+        if partitions:
+            self.load_datasource()
+            result = get_incremental_result(
+                partitions,
+                partial(self.partition_cache_key, query_object),
+                lambda partition: self.get_query_result(
+                    self.get_partition_query_object(query_object, partition)
+                ),
+                self.datasource.uid,
+                query_object.row_limit,
+                config["CHART_DATA_QUERY_CONCURRENCY"],
+            )
+            if result:
+                if result["status"] != QueryStatus.FAILED and not result["df"].empty:
+                    result["df"] = query_object.exec_post_processing(
+                        result["df"], self.datasource.uid
+                    )
+                return result
+        return self.get_query_result(query_object)
+
+    @staticmethod
+    def get_partition_query_object(
+        query_object: QueryObject, partition: Partition
+    ) -> QueryObject:
+        """Returns the query object of a partition of the time range of a query"""
+        partition_query_object = copy.copy(query_object)
+        partition_query_object.from_dttm = partition.from_dttm
+        partition_query_object.to_dttm = partition.to_dttm
+        # the data of the partition is shared by all the time ranges including it,
+        # and is post processed once concatenated
+        partition_query_object.time_range = None
+        partition_query_object.post_processing = []
+        partition_query_object.annotation_layers = []
+        return partition_query_object
+
+    def partition_cache_key(
+        self, query_object: QueryObject, partition: Partition
+    ) -> Optional[str]:
+        """Returns the cache key of a partition of the time range of a query"""
+        return self.query_cache_key(
+            self.get_partition_query_object(query_object, partition),
+            partition=[partition.from_dttm, partition.to_dttm],
+        )
+
     @staticmethod
     def df_metrics_to_num(df: pd.DataFrame, query_object: QueryObject) -> None:
         """Converting metrics to numeric when pandas.read_sql cannot"""
@@ -133,7 +208,9 @@ class QueryContext:
                 # will stay as strings if conversion fails
                 df[col] = df[col].infer_objects()
 
-    def get_data(self, df: pd.DataFrame,) -> Union[str, List[Dict[str, Any]]]:
+    def get_data(
+        self, df: pd.DataFrame,
+    ) -> Union[str, List[Dict[str, Any]], Dict[str, Any]]:
         if self.result_format == ChartDataResultFormat.CSV:
             include_index = not isinstance(df.index, pd.RangeIndex)
             result = csv.df_to_escaped_csv(
@@ -141,6 +218,9 @@ class QueryContext:
             )
             return result or ""
 
+        if self.result_format == ChartDataResultFormat.COLUMNAR:
+            return df_to_columns(df)
+
         return df.to_dict(orient="records")
 
     def get_payload(
@@ -148,13 +228,17 @@ class QueryContext:
     ) -> Dict[str, Any]:
         """Returns the query results with both metadata and data"""
 
+        if len(self.queries) > 1:
+            self.load_datasource()
+
         # Get all the payloads from the QueryObjects
-        query_results = [
-            get_query_results(
-                query_obj.result_type or self.result_type, self, query_obj, force_cached
-            )
-            for query_obj in self.queries
-        ]
+        query_results = run_concurrently(
+            [
+                partial(self.get_query_object_payload, query_obj, force_cached)
+                for query_obj in self.queries
+            ],
+            config["CHART_DATA_QUERY_CONCURRENCY"],
+        )
         return_value = {"queries": query_results}
 
         if cache_query_context:
@@ -169,6 +253,28 @@ class QueryContext:
 
         return return_value
 
+    def load_datasource(self) -> None:
+        """
+        Load the lazy attributes of the datasource before running the queries
+        concurrently, for them to be copied to the sessions of the threads running
+        the queries rather than loaded again by each of them.
+        """
+        _ = self.datasource.column_names, self.datasource.metrics
+        get_database_id(self.datasource)
+
+    def get_query_object_payload(
+        self, query_obj: QueryObject, force_cached: bool = False
+    ) -> Dict[str, Any]:
+        """Returns the result of a query object, with the time spent getting it"""
+        start = time.perf_counter()
+        result = get_query_results(
+            query_obj.result_type or self.result_type, self, query_obj, force_cached
+        )
+        duration_ms = (time.perf_counter() - start) * 1000
+        stats_logger.timing("chart_data.query_object", duration_ms)
+        result["duration_ms"] = round(duration_ms, 2)
+        return result
+
     @property
     def cache_timeout(self) -> int:
         if self.custom_cache_timeout is not None:
@@ -265,7 +371,8 @@ class QueryContext:
                 form_data=form_data,
                 force=force,
             )
-            payload = viz_obj.get_payload()
+            with database_slot(get_database_id(chart.datasource)):
+                payload = viz_obj.get_payload()
             return payload["data"]
         except RabbitaiException as ex:
             raise QueryObjectValidationError(error_msg_from_exception(ex))
@@ -277,15 +384,23 @@ class QueryContext:
         :return:
         """
         annotation_data: Dict[str, Any] = self.get_native_annotation_data(query_obj)
-        for annotation_layer in [
+        annotation_layers = [
             layer
             for layer in query_obj.annotation_layers
             if layer["sourceType"] in ("line", "table")
-        ]:
-            name = annotation_layer["name"]
-            annotation_data[name] = self.get_viz_annotation_data(
-                annotation_layer, self.force
+        ]
+        annotation_data.update(
+            zip(
+                [layer["name"] for layer in annotation_layers],
+                run_concurrently(
+                    [
+                        partial(self.get_viz_annotation_data, layer, self.force)
+                        for layer in annotation_layers
+                    ],
+                    config["CHART_DATA_QUERY_CONCURRENCY"],
+                ),
             )
+        )
         return annotation_data
 
     def get_df_payload(  # pylint: disable=too-many-statements,too-many-locals
@@ -303,7 +418,7 @@ class QueryContext:
         annotation_data = {}
         error_message = None
         if cache_key and cache_manager.data_cache and not self.force:
-            cache_value = cache_manager.data_cache.get(cache_key)
+            cache_value = cache_manager.get_data(cache_key, self.datasource.uid)
             if cache_value:
                 stats_logger.incr("loading_from_cache")
                 try:
@@ -329,51 +444,79 @@ class QueryContext:
             raise CacheLoadError("Error loading data from cache")
 
         if query_obj and not is_loaded:
-            try:
-                invalid_columns = [
-                    col
-                    for col in query_obj.columns
-                    + query_obj.groupby
-                    + get_column_names_from_metrics(query_obj.metrics or [])
-                    if col not in self.datasource.column_names and col != DTTM_ALIAS
-                ]
-                if invalid_columns:
-                    raise QueryObjectValidationError(
-                        _(
-                            "Columns missing in datasource: %(invalid_columns)s",
-                            invalid_columns=invalid_columns,
-                        )
-                    )
-                query_result = self.get_query_result(query_obj)
-                status = query_result["status"]
-                query = query_result["query"]
-                error_message = query_result["error_message"]
-                df = query_result["df"]
-                annotation_data = self.get_annotation_data(query_obj)
-
-                if status != QueryStatus.FAILED:
-                    stats_logger.incr("loaded_from_source")
-                    if not self.force:
-                        stats_logger.incr("loaded_from_source_without_force")
+            with (
+                single_flight(cache_manager.data_cache, cache_key)
+                if cache_key and cache_manager.data_cache and not self.force
+                else nullcontext()
+            ) as coalesced_value:
+                if coalesced_value:
+                    # computed by a concurrent request while waiting for the lock
+                    cache_value = coalesced_value
+                    df = cache_value["df"]
+                    query = cache_value["query"]
+                    annotation_data = cache_value.get("annotation_data", {})
+                    status = QueryStatus.SUCCESS
                     is_loaded = True
-            except QueryObjectValidationError as ex:
-                error_message = str(ex)
-                status = QueryStatus.FAILED
-            except Exception as ex:  # pylint: disable=broad-except
-                logger.exception(ex)
-                if not error_message:
-                    error_message = str(ex)
-                status = QueryStatus.FAILED
-                stacktrace = get_stacktrace()
-
-            if is_loaded and cache_key and status != QueryStatus.FAILED:
-                set_and_log_cache(
-                    cache_manager.data_cache,
-                    cache_key,
-                    {"df": df, "query": query, "annotation_data": annotation_data},
-                    self.cache_timeout,
-                    self.datasource.uid,
-                )
+                    stats_logger.incr("loaded_from_cache")
+                else:
+                    try:
+                        invalid_columns = [
+                            col
+                            for col in query_obj.columns
+                            + query_obj.groupby
+                            + get_column_names_from_metrics(query_obj.metrics or [])
+                            if col not in self.datasource.column_names
+                            and col != DTTM_ALIAS
+                        ]
+                        if invalid_columns:
+                            raise QueryObjectValidationError(
+                                _(
+                                    "Columns missing in datasource: "
+                                    "%(invalid_columns)s",
+                                    invalid_columns=invalid_columns,
+                                )
+                            )
+                        # the annotation layers are fetched while the query runs
+                        query_result, annotation_data = run_concurrently(
+                            [
+                                partial(self.get_incremental_query_result, query_obj),
+                                partial(self.get_annotation_data, query_obj),
+                            ],
+                            config["CHART_DATA_QUERY_CONCURRENCY"],
+                        )
+                        status = query_result["status"]
+                        query = query_result["query"]
+                        error_message = query_result["error_message"]
+                        df = query_result["df"]
+
+                        if status != QueryStatus.FAILED:
+                            stats_logger.incr("loaded_from_source")
+                            if not self.force:
+                                stats_logger.incr("loaded_from_source_without_force")
+                            is_loaded = True
+                    except QueryObjectValidationError as ex:
+                        error_message = str(ex)
+                        status = QueryStatus.FAILED
+                    except Exception as ex:  # pylint: disable=broad-except
+                        logger.exception(ex)
+                        if not error_message:
+                            error_message = str(ex)
+                        status = QueryStatus.FAILED
+                        stacktrace = get_stacktrace()
+
+                    if is_loaded and cache_key and status != QueryStatus.FAILED:
+                        set_and_log_cache(
+                            cache_manager.data_cache,
+                            cache_key,
+                            {
+                                "df": df,
+                                "query": query,
+                                "annotation_data": annotation_data,
+                            },
+                            self.cache_timeout,
+                            self.datasource.uid,
+                        )
+
         return {
             "cache_key": cache_key,
             "cached_dttm": cache_value["dttm"] if cache_value is not None else None,
@@ -386,6 +529,9 @@ class QueryContext:
             "status": status,
             "stacktrace": stacktrace,
             "rowcount": len(df.index),
+            "post_processing_timings": query_obj.post_processing_timings
+            if query_obj and cache_value is None
+            else [],
         }
 
     def raise_for_access(self) -> None:
@@ -7,11 +7,11 @@ from flask_babel import gettext as _
 from pandas import DataFrame
 
 from rabbitai import app, db
+from rabbitai.common.post_processing import PostProcessingPlan
 from rabbitai.connectors.base.models import BaseDatasource
 from rabbitai.connectors.connector_registry import ConnectorRegistry
 from rabbitai.exceptions import QueryObjectValidationError
 from rabbitai.typing import Metric, OrderBy
-from rabbitai.utils import pandas_postprocessing
 from rabbitai.utils.core import (
     ChartDataResultType,
     DatasourceDict,
@@ -217,6 +217,10 @@ class QueryObject:
                         )
                     self.extras[field.new_name] = value
 
+        # the time spent in the post processing steps, once run
+        self.post_processing_timings: List[Dict[str, Any]] = []
+        PostProcessingPlan(self.post_processing).push_down(self)
+
     @property
     def metric_names(self) -> List[str]:
         """Return metrics names (labels), coerce adhoc metrics to strings."""
@@ -318,29 +322,22 @@ class QueryObject:
 
         return md5_sha_from_dict(cache_dict, default=json_int_dttm_ser, ignore_nan=True)
 
-    def exec_post_processing(self, df: DataFrame) -> DataFrame:
+    def exec_post_processing(
+        self, df: DataFrame, datasource_uid: Optional[str] = None
+    ) -> DataFrame:
         """
         Perform post processing operations on DataFrame.
 
         :param df: DataFrame returned from database model.
+        :param datasource_uid: The uid of the datasource of the query, identifying
+                 the query of the operations caching state per query
         :return: new DataFrame to which all post processing operations have been
                  applied
         :raises QueryObjectValidationError: If the post processing operation
                  is incorrect
         """
-        for post_process in self.post_processing:
-            operation = post_process.get("operation")
-            if not operation:
-                raise QueryObjectValidationError(
-                    _("`operation` property of post processing object undefined")
-                )
-            if not hasattr(pandas_postprocessing, operation):
-                raise QueryObjectValidationError(
-                    _(
-                        "Unsupported post processing operation: %(operation)s",
-                        type=operation,
-                    )
-                )
-            options = post_process.get("options", {})
-            df = getattr(pandas_postprocessing, operation)(df, **options)
+        plan = PostProcessingPlan(self.post_processing, datasource_uid=datasource_uid)
+        if plan.uses_query_key:
+            plan.query_key = self.cache_key(datasource=datasource_uid)
+        df, self.post_processing_timings = plan.execute(df)
         return df
@@ -44,10 +44,15 @@ if TYPE_CHECKING:
 
     from rabbitai.connectors.sqla.models import (SqlaTable,)
     from rabbitai.models.core import Database
+    from rabbitai.utils.cache_codec import DataCacheCodec
 
 # Realtime stats logger, a StatsD implementation exists
 STATS_LOGGER = DummyStatsLogger()
 EVENT_LOGGER = DBEventLogger()
+# To commit the logs in batches from a background thread instead of from the
+# requests being logged:
+# from rabbitai.utils.log import BufferedDBEventLogger
+# EVENT_LOGGER = BufferedDBEventLogger(max_queue_size=10000, batch_size=100)
 
 RABBITAI_LOG_VIEW = True
 
@@ -508,12 +513,105 @@ CACHE_DEFAULT_TIMEOUT = 60 * 60 * 24  # 1 day
 # Default cache for Rabbitai objects
 CACHE_CONFIG: CacheConfig = {"CACHE_TYPE": "null"}
 
+# Number of seconds the row level security filters of a user and a table are kept
+# in the cache above, shared by all the requests. The cached filters are
+# invalidated when filters, users or roles change. When None the filters are only
+# memoized for the duration of a request.
+RLS_FILTERS_CACHE_TIMEOUT: Optional[int] = None
+
+# Number of seconds the compiled permissions of a user, checked by every access
+# check, are kept in the cache above, shared by all the requests. They are
+# invalidated when roles, users or permissions change. When None the permissions are
+# only memoized for the duration of a request.
+PERMISSIONS_CACHE_TIMEOUT: Optional[int] = None
+
 # Cache for datasource metadata and query results
 DATA_CACHE_CONFIG: CacheConfig = {"CACHE_TYPE": "null"}
 
+# Maximum size in bytes of the in-process cache placed in front of the data cache,
+# which keeps the most recently used query results of each worker process in
+# memory. The in-process cache is disabled when set to 0.
+DATA_CACHE_LOCAL_MAX_BYTES = 0
+# Number of seconds a query result is kept in the in-process cache. Results
+# refreshed (with `force`) by another process can be served for up to this long.
+DATA_CACHE_LOCAL_TIMEOUT = 60
+
+# Codec of the values stored in the data cache, an instance of
+# rabbitai.utils.cache_codec.DataCacheCodec. By default the values are pickled,
+# ArrowDataCacheCodec stores the DataFrames as compressed Arrow IPC instead:
+#
+# from rabbitai.utils.cache_codec import ArrowDataCacheCodec
+# DATA_CACHE_CODEC = ArrowDataCacheCodec(compression="zstd")
+DATA_CACHE_CODEC: Optional["DataCacheCodec"] = None
+# Values encoded by the codec larger than this number of bytes are not cached
+# (e.g. 512 MB for Redis, 1 MB for Memcached by default). No limit when None.
+DATA_CACHE_MAX_VALUE_SIZE: Optional[int] = None
+
 # store cache keys by datasource UID (via CacheKey) for custom processing/invalidation
 STORE_CACHE_KEYS_IN_METADATA_DB = False
 
+# Index the data cache keys by datasource UID in the data cache itself, as sets
+# expiring with their keys, to invalidate the data of datasources in one round trip.
+# Requires a Redis data cache, other than a Redis Cluster whose scripts can't access
+# the keys of many hash slots. The keys are indexed in batches of
+# DATA_CACHE_KEY_INDEX_BATCH_SIZE, or every DATA_CACHE_KEY_INDEX_FLUSH_INTERVAL
+# seconds, from a background thread.
+DATA_CACHE_KEY_INDEX = False
+DATA_CACHE_KEY_INDEX_BATCH_SIZE = 500
+DATA_CACHE_KEY_INDEX_FLUSH_INTERVAL = 1
+
+# Coalesce concurrent chart data requests for the same data cache key: only one
+# request at a time queries the database, the others wait for its result. The lock
+# is stored in the data cache, which must support atomic `add` (e.g. Redis or
+# Memcached) for requests served by different processes to be coalesced.
+DATA_CACHE_SINGLE_FLIGHT = False
+# Number of seconds after which the lock of a cache key expires
+DATA_CACHE_SINGLE_FLIGHT_LOCK_TIMEOUT = RABBITAI_WEBSERVER_TIMEOUT
+# Maximum number of seconds a request waits for the result of another request
+DATA_CACHE_SINGLE_FLIGHT_WAIT_TIMEOUT = 30
+# Number of seconds between checks of the cache while waiting
+DATA_CACHE_SINGLE_FLIGHT_POLL_INTERVAL = 0.1
+
+# Cache the data of time series charts per day, for a chart over a rolling time
+# range (e.g. "Last week") to only query the days missing from the cache, and the
+# days which are still open, when its cached data expires. Only time series without
+# series limit nor ordering, with a time grain of at most a day, and with the
+# [start, end) time range endpoints of SIP-15 are cached incrementally.
+INCREMENTAL_TIMESERIES_CACHE = False
+# Number of seconds after their end during which the days are considered open, i.e.
+# still receiving data, and are queried each time
+INCREMENTAL_CACHE_OPEN_PARTITION_DELAY = 60 * 60
+# Number of seconds the data of the closed days is cached for
+INCREMENTAL_CACHE_PARTITION_TIMEOUT = 60 * 60 * 24 * 7
+# Time ranges spanning more days than this are queried at once
+INCREMENTAL_CACHE_MAX_PARTITIONS = 92
+
+# Maximum number of threads running the query objects of a chart data request
+# concurrently, and fetching the annotation layers of a query object while its
+# query runs. With 1 everything runs in the thread of the request.
+CHART_DATA_QUERY_CONCURRENCY = 1
+# Maximum number of chart data queries a web server process runs concurrently
+# against the same database. No limit when None.
+CHART_DATA_MAX_CONCURRENT_QUERIES_PER_DATABASE: Optional[int] = None
+# Maximum number of distinct query objects of a batch chart data request (e.g.
+# all the charts of a dashboard) computed concurrently
+CHART_DATA_BATCH_CONCURRENCY = 4
+# Maximum number of query contexts of a batch chart data request
+CHART_DATA_BATCH_MAX_SIZE = 100
+
+# Number of charts the cache warm up task computes the data of concurrently, and
+# maximum number of them querying the same database at once
+CACHE_WARMUP_CONCURRENCY = 4
+CACHE_WARMUP_MAX_CONCURRENT_QUERIES_PER_DATABASE: Optional[int] = 2
+
+# Maximum number of processes fitting the forecasting models of the series of a
+# chart concurrently. With 1 they are fitted one after the other in the request.
+PROPHET_PROCESSES = 1
+# Number of seconds the forecast and the fitted parameters of a series are cached
+# for, to reuse the forecast while the series doesn't change, and to start fitting
+# the model of the series from its last parameters once it does.
+PROPHET_MODEL_CACHE_TIMEOUT = 60 * 60 * 24
+
 # CORS Options
 ENABLE_CORS = False
 CORS_OPTIONS: Dict[Any, Any] = {}
@@ -534,6 +632,8 @@ ALLOWED_EXTENSIONS = {*EXCEL_EXTENSIONS, *CSV_EXTENSIONS}
 # method.
 # note: index option should not be overridden
 CSV_EXPORT = {"encoding": "utf-8"}
+# Maximum number of rows encoded at once when streaming a CSV export
+CSV_EXPORT_CHUNK_ROWS = 10000
 
 # endregion
 
@@ -635,6 +735,12 @@ MAPBOX_API_KEY = os.environ.get("MAPBOX_API_KEY", "")
 # in the results backend. This also becomes the limit when exporting CSVs
 SQL_MAX_ROW = 100000
 
+# Number of rows fetched from the cursor at a time when running SQL Lab queries.
+# When set, results are streamed from the cursor in chunks of this size and
+# converted to Arrow as they arrive, so that peak memory scales with the chunk size
+# rather than with the size of the result. When unset, all rows are fetched at once.
+SQLLAB_FETCH_BATCH_SIZE: Optional[int] = None
+
 # Maximum number of rows displayed in SQL Lab UI
 # Is set to avoid out of memory/localstorage issues in browsers. Does not affect
 # exported CSVs
@@ -793,6 +899,16 @@ RESULTS_BACKEND: Optional[BaseCache] = None
 # in order to disable should breaking issues be discovered.
 RESULTS_BACKEND_USE_MSGPACK = True
 
+# Format used to store SQL Lab results in the results backend. "arrow" stores the
+# data as compressed Arrow IPC batches, separately from the query metadata, so that
+# the results and CSV endpoints only read the batches they need. "legacy" stores the
+# whole payload as a single blob, serialized according to RESULTS_BACKEND_USE_MSGPACK.
+RESULTS_BACKEND_FORMAT = "legacy"
+# Compression codec of the Arrow IPC buffers: "lz4", "zstd" or None
+RESULTS_BACKEND_ARROW_COMPRESSION: Optional[str] = "zstd"
+# Maximum number of rows stored in a single Arrow batch
+RESULTS_BACKEND_ARROW_BATCH_ROWS = 10000
+
 # The S3 bucket where you want to store your external hive tables created
 # from CSV files. For example, 'companyname-rabbitai'
 CSV_TO_HIVE_UPLOAD_S3_BUCKET = None
@@ -914,6 +1030,13 @@ HIVE_POLL_INTERVAL = 5
 # See here: https://github.com/dropbox/PyHive/blob/8eb0aeab8ca300f3024655419b93dad926c1a351/pyhive/presto.py#L93
 PRESTO_POLL_INTERVAL = 1
 
+# Minimum number of seconds between the writes of the progress of a running Hive or
+# Presto query to the metadata database, which are also when the status of the query
+# is read to know whether it was stopped, unless the cache flags it right away.
+SQLLAB_PROGRESS_UPDATE_INTERVAL = 5
+# Minimum increase of the progress of a query, in percent, worth writing it
+SQLLAB_PROGRESS_MIN_DELTA = 1
+
 # Allow for javascript controls components
 # this enables programmers to customize certain charts (like the
 # geospatial ones) by inputing javascript in controls. This exposes
@@ -940,6 +1063,25 @@ DASHBOARD_TEMPLATE_ID = None
 # as such `create_engine(url, **params)`
 DB_CONNECTION_MUTATOR = None
 
+# The SQLAlchemy engines of the databases are kept in a process wide registry,
+# one per database, effective user, schema, source and connection parameters.
+# Maximum number of engines in the registry, set to 0 to create a new engine
+# every time one is needed
+SQLALCHEMY_ENGINE_CACHE_SIZE = 100
+# Engines that were not used for this number of seconds are disposed of
+SQLALCHEMY_ENGINE_IDLE_TIMEOUT = 600
+# By default the engines don't pool their connections (`NullPool`). Set this to
+# the pool parameters of `create_engine` to pool the connections of the engines
+# that don't explicitly ask for a `NullPool` (SQL Lab queries run in Celery
+# workers always do). Example:
+# SQLALCHEMY_ENGINE_POOL_CONFIG = {
+#     "pool_size": 5,
+#     "max_overflow": 10,
+#     "pool_recycle": 3600,
+#     "pool_pre_ping": True,
+# }
+SQLALCHEMY_ENGINE_POOL_CONFIG: Optional[Dict[str, Any]] = None
+
 # A function that intercepts the SQL to be executed and can alter it.
 # The use case is can be around adding some sort of comment header
 # with information such as the username and worker node information
@@ -50,11 +50,11 @@ class ConnectorRegistry:
         if datasource_type not in cls.sources:
             raise DatasetNotFoundError()
 
-        # 从数据库中查询数据源
+        # 从数据库中查询数据源，已加载到会话中的数据源也刷新其属性，以获取其它进程的修改
         datasource = (
             session.query(cls.sources[datasource_type])
-            .filter_by(id=datasource_id)
-            .one_or_none()
+            .populate_existing()
+            .get(datasource_id)
         )
 
         if not datasource:
@@ -1659,3 +1659,34 @@ class RowLevelSecurityFilter(Model, AuditMixinNullable):
     )
 
     clause = Column(Text, nullable=False)
+
+
+# the cached row level security filters change with the filters and role memberships
+for event_name in ("after_insert", "after_update", "after_delete"):
+    sa.event.listen(
+        RowLevelSecurityFilter, event_name, security_manager.invalidate_rls_filters
+    )
+sa.event.listen(
+    security_manager.user_model, "after_update", security_manager.invalidate_user_roles
+)
+sa.event.listen(
+    security_manager.user_model, "after_delete", security_manager.invalidate_rls_filters
+)
+sa.event.listen(
+    security_manager.role_model, "after_delete", security_manager.invalidate_rls_filters
+)
+
+# the compiled permissions change with the roles, their permissions and the role
+# memberships, invalidated by `invalidate_user_roles` for the latter
+for event_name in ("after_update", "after_delete"):
+    sa.event.listen(
+        security_manager.role_model, event_name, security_manager.invalidate_permissions
+    )
+sa.event.listen(
+    security_manager.user_model, "after_delete", security_manager.invalidate_permissions
+)
+sa.event.listen(
+    security_manager.permissionview_model,
+    "after_delete",
+    security_manager.invalidate_permissions,
+)
@@ -98,6 +98,7 @@ MODEL_API_RW_METHOD_PERMISSION_MAP = {
     "screenshot": "read",
     "data": "read",
     "data_from_cache": "read",
+    "data_batch": "read",
     "get_charts": "read",
     "get_datasets": "read",
     "function_names": "read",
@@ -3,7 +3,9 @@
 import warnings
 from typing import Any, Dict, List
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
 
 from rabbitai.utils.core import JS_MAX_INTEGER
 
@@ -19,6 +21,32 @@ def _convert_big_integers(val: Any) -> Any:
     return str(val) if isinstance(val, int) and abs(val) > JS_MAX_INTEGER else val
 
 
+def _column_to_list(series: pd.Series) -> List[Any]:
+    """
+    Convert a column to a list of Python objects, casting integers larger than
+    ``JS_MAX_INTEGER`` to strings.
+
+    Numeric columns are converted with vectorized operations, only object
+    columns are processed value by value.
+
+    :param series: the column to convert
+    :returns: the values of the column
+    """
+    # only plain numpy dtypes, nullable extension dtypes are processed as objects
+    kind = series.dtype.kind if isinstance(series.dtype, np.dtype) else "O"
+    if kind in "iu":
+        values = series.to_numpy()
+        big = (values > JS_MAX_INTEGER) | (values < -JS_MAX_INTEGER)
+        if big.any():
+            converted = values.astype(object)
+            converted[big] = values[big].astype(str)
+            return converted.tolist()
+        return values.tolist()
+    if kind in "fb":
+        return series.tolist()
+    return list(map(_convert_big_integers, series.tolist()))
+
+
 def df_to_records(dframe: pd.DataFrame) -> List[Dict[str, Any]]:
     """
     Convert a DataFrame to a set of records.
@@ -33,7 +61,66 @@ def df_to_records(dframe: pd.DataFrame) -> List[Dict[str, Any]]:
             stacklevel=2,
         )
     columns = dframe.columns
-    return list(
-        dict(zip(columns, map(_convert_big_integers, row)))
-        for row in zip(*[dframe[col] for col in columns])
-    )
+    data = [_column_to_list(dframe.iloc[:, i]) for i in range(len(columns))]
+    return [dict(zip(columns, row)) for row in zip(*data)]
+
+
+def _column_to_json_list(series: pd.Series) -> List[Any]:
+    """
+    Convert a column to a list of JSON serializable values: timestamps are
+    converted to milliseconds since epoch, missing values to ``None`` and integers
+    larger than ``JS_MAX_INTEGER`` to strings.
+
+    :param series: the column to convert
+    :returns: the values of the column
+    """
+    if is_datetime64_any_dtype(series.dtype):
+        if getattr(series.dtype, "tz", None) is not None:
+            # same as `datetime_to_epoch`, which ignores the UTC offset
+            series = series.dt.tz_localize(None)
+        missing = series.isna().to_numpy()
+        epoch = series.to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e6
+        if missing.any():
+            converted = epoch.astype(object)
+            converted[missing] = None
+            return converted.tolist()
+        return epoch.tolist()
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind == "f":
+        values = series.to_numpy()
+        missing = np.isnan(values)
+        if missing.any():
+            converted = values.astype(object)
+            converted[missing] = None
+            return converted.tolist()
+        return values.tolist()
+    values = _column_to_list(series)
+    if not isinstance(series.dtype, np.dtype) or series.dtype == object:
+        missing = series.isna().to_numpy()
+        if missing.any():
+            return [None if miss else val for val, miss in zip(values, missing)]
+    return values
+
+
+def df_to_columns(dframe: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Convert a DataFrame to a columnar payload, which is much cheaper to build and
+    to serialize than records for large results.
+
+    :param dframe: the DataFrame to convert
+    :returns: a dictionary with the column names under ``columns`` and the values
+        of each column, keyed by column name, under ``data``
+    """
+    if not dframe.columns.is_unique:
+        warnings.warn(
+            "DataFrame columns are not unique, some columns will be omitted.",
+            UserWarning,
+            stacklevel=2,
+        )
+    columns = list(dframe.columns)
+    return {
+        "columns": columns,
+        "data": {
+            column: _column_to_json_list(dframe.iloc[:, i])
+            for i, column in enumerate(columns)
+        },
+    }
@@ -7,6 +7,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Match,
     NamedTuple,
@@ -20,6 +21,7 @@ from typing import (
 )
 
 import pandas as pd
+import pyarrow as pa
 import sqlparse
 from apispec import APISpec
 from apispec.ext.marshmallow import MarshmallowPlugin
@@ -55,6 +57,9 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger()
 
+# a chunk of a query result, either DBAPI rows or a natively fetched Arrow batch
+FetchedBatch = Union[List[Tuple[Any, ...]], pa.RecordBatch]
+
 
 class TimeGrain(NamedTuple):
     name: str
@@ -478,6 +483,37 @@ class BaseEngineSpec:
         except Exception as ex:
             raise cls.get_dbapi_mapped_exception(ex)
 
+    @classmethod
+    def fetch_data_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[FetchedBatch]:
+        """
+        Fetch the results of a query in chunks of at most `batch_size` rows, so the
+        full result never has to be held as a list of Python tuples.
+
+        Engines whose drivers can fetch results natively as Arrow can override this
+        method and yield `pyarrow.RecordBatch` instances instead of lists of rows.
+
+        :param cursor: Cursor instance
+        :param limit: Maximum number of rows to be returned by the cursor
+        :param batch_size: Maximum number of rows per chunk
+        :return: Iterator over the chunks of the result
+        """
+        if cls.arraysize:
+            cursor.arraysize = cls.arraysize
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            try:
+                data = cursor.fetchmany(size)
+            except Exception as ex:
+                raise cls.get_dbapi_mapped_exception(ex)
+            if not data:
+                return
+            yield data
+            if remaining is not None:
+                remaining -= len(data)
+
     @classmethod
     def expand_data(
         cls, columns: List[Dict[Any, Any]], data: List[Dict[Any, Any]]
@@ -1,6 +1,6 @@
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Pattern, Tuple, TYPE_CHECKING
+from typing import Any, Dict, Iterator, List, Optional, Pattern, Tuple, TYPE_CHECKING
 
 import pandas as pd
 from apispec import APISpec
@@ -12,7 +12,7 @@ from sqlalchemy.sql.expression import ColumnClause
 from typing_extensions import TypedDict
 
 from rabbitai.databases.schemas import encrypted_field_properties, EncryptedField
-from rabbitai.db_engine_specs.base import BaseEngineSpec
+from rabbitai.db_engine_specs.base import BaseEngineSpec, FetchedBatch
 from rabbitai.errors import RabbitaiErrorType
 from rabbitai.exceptions import RabbitaiGenericDBErrorException
 from rabbitai.sql_parse import Table
@@ -137,6 +137,17 @@ class BigQueryEngineSpec(BaseEngineSpec):
             data = [r.values() for r in data]  # type: ignore
         return data
 
+    @classmethod
+    def fetch_data_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[FetchedBatch]:
+        for data in super().fetch_data_batches(cursor, limit, batch_size):
+            # Support type BigQuery Row, introduced here PR #4071
+            # google.cloud.bigquery.table.Row
+            if type(data[0]).__name__ == "Row":
+                data = [r.values() for r in data]  # type: ignore
+            yield data
+
     @staticmethod
     def _mutate_label(label: str) -> str:
         """
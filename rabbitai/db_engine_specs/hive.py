@@ -4,7 +4,7 @@ import re
 import tempfile
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
 from urllib import parse
 
 import numpy as np
@@ -19,13 +19,14 @@ from sqlalchemy.engine.url import make_url, URL
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.expression import ColumnClause, Select
 
-from rabbitai.db_engine_specs.base import BaseEngineSpec
+from rabbitai.db_engine_specs.base import BaseEngineSpec, FetchedBatch
 from rabbitai.db_engine_specs.presto import PrestoEngineSpec
 from rabbitai.exceptions import RabbitaiException
 from rabbitai.extensions import cache_manager
 from rabbitai.models.sql_lab import Query
 from rabbitai.sql_parse import ParsedQuery, Table
 from rabbitai.utils import core as utils
+from rabbitai.utils.query_progress import QueryProgressTracker
 
 if TYPE_CHECKING:
     # prevent circular imports
@@ -147,6 +148,21 @@ class HiveEngineSpec(PrestoEngineSpec):
         except pyhive.exc.ProgrammingError:
             return []
 
+    @classmethod
+    def fetch_data_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[FetchedBatch]:
+        import pyhive
+        from TCLIService import ttypes
+
+        state = cursor.poll()
+        if state.operationState == ttypes.TOperationState.ERROR_STATE:
+            raise Exception("Query error", state.errorMessage)
+        try:
+            yield from super().fetch_data_batches(cursor, limit, batch_size)
+        except pyhive.exc.ProgrammingError:
+            return
+
     @classmethod
     def df_to_sql(
         cls,
@@ -309,9 +325,9 @@ class HiveEngineSpec(PrestoEngineSpec):
         tracking_url = None
         job_id = None
         query_id = query.id
+        tracker = QueryProgressTracker(query, session)
         while polled.operationState in unfinished_states:
-            query = session.query(type(query)).filter_by(id=query_id).one()
-            if query.status == QueryStatus.STOPPED:
+            if tracker.is_stopped():
                 cursor.cancel()
                 break
 
@@ -322,10 +338,7 @@ class HiveEngineSpec(PrestoEngineSpec):
                 logger.info(
                     "Query %s: Progress total: %s", str(query_id), str(progress)
                 )
-                needs_commit = False
-                if progress > query.progress:
-                    query.progress = progress
-                    needs_commit = True
+                tracker.update(progress=progress)
                 if not tracking_url:
                     tracking_url = cls.get_tracking_url(log_lines)
                     if tracking_url:
@@ -335,15 +348,16 @@ class HiveEngineSpec(PrestoEngineSpec):
                             str(query_id),
                             tracking_url,
                         )
-                        tracking_url = current_app.config["TRACKING_URL_TRANSFORMER"]
+                        tracking_url = current_app.config["TRACKING_URL_TRANSFORMER"](
+                            tracking_url
+                        )
                         logger.info(
                             "Query %s: Transformation applied: %s",
                             str(query_id),
                             tracking_url,
                         )
-                        query.tracking_url = tracking_url
+                        tracker.update(tracking_url=tracking_url)
                         logger.info("Query %s: Job id: %s", str(query_id), str(job_id))
-                        needs_commit = True
                 if job_id and len(log_lines) > last_log_line:
                     # Wait for job id before logging things out
                     # this allows for prefixing all log lines and becoming
@@ -351,10 +365,9 @@ class HiveEngineSpec(PrestoEngineSpec):
                     for l in log_lines[last_log_line:]:
                         logger.info("Query %s: [%s] %s", str(query_id), str(job_id), l)
                     last_log_line = len(log_lines)
-                if needs_commit:
-                    session.commit()
             time.sleep(current_app.config["HIVE_POLL_INTERVAL"])
             polled = cursor.poll()
+        tracker.flush()
 
     @classmethod
     def get_columns(
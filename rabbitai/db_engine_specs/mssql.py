@@ -1,11 +1,11 @@
 import logging
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Pattern, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Pattern, Tuple
 
 from flask_babel import gettext as __
 
-from rabbitai.db_engine_specs.base import BaseEngineSpec, LimitMethod
+from rabbitai.db_engine_specs.base import BaseEngineSpec, FetchedBatch, LimitMethod
 from rabbitai.errors import RabbitaiErrorType
 from rabbitai.utils import core as utils
 
@@ -102,6 +102,14 @@ class MssqlEngineSpec(BaseEngineSpec):
         # Lists of `pyodbc.Row` need to be unpacked further
         return cls.pyodbc_rows_to_tuples(data)
 
+    @classmethod
+    def fetch_data_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[FetchedBatch]:
+        for data in super().fetch_data_batches(cursor, limit, batch_size):
+            # Lists of `pyodbc.Row` need to be unpacked further
+            yield cls.pyodbc_rows_to_tuples(data)
+
     @classmethod
     def extract_error_message(cls, ex: Exception) -> str:
         if str(ex).startswith("(8155,"):
@@ -6,6 +6,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Match,
     Optional,
@@ -21,7 +22,11 @@ from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION, ENUM, JSON
 from sqlalchemy.dialects.postgresql.base import PGInspector
 from sqlalchemy.types import String, TypeEngine
 
-from rabbitai.db_engine_specs.base import BaseEngineSpec, BasicParametersMixin
+from rabbitai.db_engine_specs.base import (
+    BaseEngineSpec,
+    BasicParametersMixin,
+    FetchedBatch,
+)
 from rabbitai.errors import RabbitaiErrorType
 from rabbitai.exceptions import RabbitaiException
 from rabbitai.utils import core as utils
@@ -134,6 +139,15 @@ class PostgresBaseEngineSpec(BaseEngineSpec):
             return []
         return super().fetch_data(cursor, limit)
 
+    @classmethod
+    def fetch_data_batches(
+        cls, cursor: Any, limit: Optional[int] = None, batch_size: int = 10000
+    ) -> Iterator[FetchedBatch]:
+        cursor.tzinfo_factory = FixedOffsetTimezone
+        if not cursor.description:
+            return iter([])
+        return super().fetch_data_batches(cursor, limit, batch_size)
+
     @classmethod
     def epoch_to_dttm(cls) -> str:
         return "(timestamp 'epoch' + {col} * interval '1 second')"
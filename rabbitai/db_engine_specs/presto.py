@@ -50,6 +50,7 @@ from rabbitai.result_set import destringify
 from rabbitai.sql_parse import ParsedQuery
 from rabbitai.utils import core as utils
 from rabbitai.utils.core import ColumnSpec, GenericDataType
+from rabbitai.utils.query_progress import QueryProgressTracker
 
 if TYPE_CHECKING:
     # prevent circular imports
@@ -934,6 +935,7 @@ class PrestoEngineSpec(BaseEngineSpec):  # pylint: disable=too-many-public-metho
         poll_interval = query.database.connect_args.get(
             "poll_interval", current_app.config["PRESTO_POLL_INTERVAL"]
         )
+        tracker = QueryProgressTracker(query, session)
         logger.info("Query %i: Polling the cursor for progress", query_id)
         polled = cursor.poll()
         # poll returns dict -- JSON status information or ``None``
@@ -944,8 +946,7 @@ class PrestoEngineSpec(BaseEngineSpec):  # pylint: disable=too-many-public-metho
             # Update the object and wait for the kill signal.
             stats = polled.get("stats", {})
 
-            query = session.query(type(query)).filter_by(id=query_id).one()
-            if query.status in [QueryStatus.STOPPED, QueryStatus.TIMED_OUT]:
+            if tracker.is_stopped():
                 cursor.cancel()
                 break
 
@@ -964,12 +965,11 @@ class PrestoEngineSpec(BaseEngineSpec):  # pylint: disable=too-many-public-metho
                         "Query {} progress: {} / {} "  # pylint: disable=logging-format-interpolation
                         "splits".format(query_id, completed_splits, total_splits)
                     )
-                    if progress > query.progress:
-                        query.progress = progress
-                    session.commit()
+                    tracker.update(progress=progress)
             time.sleep(poll_interval)
             logger.info("Query %i: Polling the cursor for progress", query_id)
             polled = cursor.poll()
+        tracker.flush()
 
     @classmethod
     def _extract_error_message(cls, ex: Exception) -> str:
@@ -14,8 +14,10 @@ from flask_wtf.csrf import CSRFProtect
 from werkzeug.local import LocalProxy
 
 from rabbitai.utils.async_query_manager import AsyncQueryManager
+from rabbitai.utils.cache_key_index import CacheKeyIndex
 from rabbitai.utils.cache_manager import CacheManager
 from rabbitai.utils.encrypt import EncryptedFieldFactory
+from rabbitai.utils.engine_registry import EngineRegistry
 from rabbitai.utils.feature_flag_manager import FeatureFlagManager
 from rabbitai.utils.machine_auth import MachineAuthProviderFactory
 
@@ -87,12 +89,14 @@ class UIManifestProcessor:
 APP_DIR = os.path.dirname(__file__)
 appbuilder = AppBuilder(update_perms=False)
 async_query_manager = AsyncQueryManager()
+cache_key_index = CacheKeyIndex()
 cache_manager = CacheManager()
 celery_app = celery.Celery()
 csrf = CSRFProtect()
 db = SQLA()
 _event_logger: Dict[str, Any] = {}
 encrypted_field_factory = EncryptedFieldFactory()
+engine_registry = EngineRegistry()
 event_logger = LocalProxy(lambda: _event_logger.get("event_logger"))
 feature_flag_manager = FeatureFlagManager()
 machine_auth_provider_factory = MachineAuthProviderFactory()
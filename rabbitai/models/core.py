@@ -18,7 +18,6 @@ from flask_appbuilder import Model
 from sqlalchemy import (
     Boolean,
     Column,
-    create_engine,
     DateTime,
     ForeignKey,
     Integer,
@@ -28,18 +27,24 @@ from sqlalchemy import (
     Text,
 )
 from sqlalchemy.engine import Dialect, Engine, url
+from sqlalchemy.engine.base import Connection
 from sqlalchemy.engine.reflection import Inspector
 from sqlalchemy.engine.url import make_url, URL
 from sqlalchemy.exc import ArgumentError
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
-from sqlalchemy.pool import NullPool
+from sqlalchemy.orm.mapper import Mapper
 from sqlalchemy.schema import UniqueConstraint
 from sqlalchemy.sql import expression, Select
 
 from rabbitai import app, db_engine_specs, is_feature_enabled
 from rabbitai.db_engine_specs.base import TimeGrain
-from rabbitai.extensions import cache_manager, encrypted_field_factory, security_manager
+from rabbitai.extensions import (
+    cache_manager,
+    encrypted_field_factory,
+    engine_registry,
+    security_manager,
+)
 from rabbitai.models.helpers import AuditMixinNullable, ImportExportMixin
 from rabbitai.models.tags import FavStarUpdater
 from rabbitai.result_set import RabbitaiResultSet
@@ -359,19 +364,18 @@ class Database(Model, AuditMixinNullable, ImportExportMixin):
                 effective_username = g.user.username
         return effective_username
 
-    @utils.memoized(watch=("impersonate_user", "sqlalchemy_uri_decrypted", "extra"))
     def get_sqla_engine(
         self,
         schema: Optional[str] = None,
-        nullpool: bool = True,
+        nullpool: Optional[bool] = None,
         user_name: Optional[str] = None,
         source: Optional[utils.QuerySource] = None,
     ) -> Engine:
         """
-        获取数据库引擎。
+        获取数据库引擎，引擎按数据库、有效用户、模式、来源和连接参数缓存在引擎注册表中。
 
         :param schema:
-        :param nullpool:
+        :param nullpool: 是否不使用连接池，为 `None` 时依据配置 SQLALCHEMY_ENGINE_POOL_CONFIG 决定。
         :param user_name:
         :param source:
         :return:
@@ -392,8 +396,6 @@ class Database(Model, AuditMixinNullable, ImportExportMixin):
         logger.debug("Database.get_sqla_engine(). Masked URL: %s", str(masked_url))
 
         params = extra.get("engine_params", {})
-        if nullpool:
-            params["poolclass"] = NullPool
 
         connect_args = params.get("connect_args", {})
         if self.impersonate_user:
@@ -419,7 +421,15 @@ class Database(Model, AuditMixinNullable, ImportExportMixin):
                 sqlalchemy_url, params, effective_username, security_manager, source
             )
 
-        return create_engine(sqlalchemy_url, **params)
+        return engine_registry.get_engine(
+            self.id,
+            sqlalchemy_url,
+            params,
+            effective_username=effective_username,
+            schema=schema,
+            source=source,
+            nullpool=nullpool,
+        )
 
     def get_reserved_words(self) -> Set[str]:
         """获取保留字。"""
@@ -890,6 +900,16 @@ sqla.event.listen(Database, "after_insert", security_manager.set_perm)
 sqla.event.listen(Database, "after_update", security_manager.set_perm)
 
 
+def invalidate_database_engines(
+    _mapper: Mapper, connection: Connection, target: Database
+) -> None:
+    engine_registry.invalidate(target.id)
+
+
+sqla.event.listen(Database, "after_update", invalidate_database_engines)
+sqla.event.listen(Database, "after_delete", invalidate_database_engines)
+
+
 class Log(Model):
     """日志对象关系模型，用于记录 Rabbitai 操作到数据库。"""
 
@@ -3,18 +3,45 @@
 import datetime
 import json
 import logging
-from typing import Any, Dict, List, Optional, Tuple, Type
+from itertools import chain
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import numpy as np
 import pandas as pd
 import pyarrow as pa
+from sqlalchemy import types
 
-from rabbitai import db_engine_specs
+from rabbitai import app, db_engine_specs
 from rabbitai.typing import DbapiDescription, DbapiResult
 from rabbitai.utils import core as utils
+from rabbitai.utils.decorators import stats_timing
 
+config = app.config
+stats_logger = config["STATS_LOGGER"]
 logger = logging.getLogger(__name__)
 
+# errors raised by `pa.array` when values can't be converted to the requested
+# (or inferred) Arrow type
+ARROW_CONVERSION_ERRORS = (
+    pa.lib.ArrowInvalid,
+    pa.lib.ArrowTypeError,
+    pa.lib.ArrowNotImplementedError,
+    OverflowError,
+    TypeError,  # this is super hackey,
+    # https://issues.apache.org/jira/browse/ARROW-7855
+)
+
 
 def dedup(l: List[str], suffix: str = "__", case_sensitive: bool = True) -> List[str]:
     """De-duplicates a list of string by suffixing a counter
@@ -62,86 +89,247 @@ class RabbitaiResultSet:
         cursor_description: DbapiDescription,
         db_engine_spec: Type[db_engine_specs.BaseEngineSpec],
     ):
-        self.db_engine_spec = db_engine_spec
+        self._set_cursor_description(cursor_description, db_engine_spec)
         data = data or []
-        column_names: List[str] = []
-        pa_data: List[pa.Array] = []
-        deduped_cursor_desc: List[Tuple[Any, ...]] = []
-        numpy_dtype: List[Tuple[str, ...]] = []
-        stringified_arr: np.ndarray
+        with stats_timing("result_set.build_arrow_table", stats_logger):
+            self.table = self._build_table([data] if data else [])
+        self._log_build_stats()
+
+    @classmethod
+    def from_batches(
+        cls,
+        batches: Iterable[Union[DbapiResult, pa.RecordBatch]],
+        cursor_description: DbapiDescription,
+        db_engine_spec: Type[db_engine_specs.BaseEngineSpec],
+    ) -> "RabbitaiResultSet":
+        """
+        Build a result set incrementally from chunks of rows.
+
+        Each chunk is converted to Arrow arrays as soon as it is received, so the
+        full result never exists as Python objects at once. Chunks can either be
+        sequences of DBAPI rows or `pa.RecordBatch` instances produced by drivers
+        that fetch Arrow natively.
+
+        :param batches: iterable of row chunks or record batches
+        :param cursor_description: DBAPI cursor description
+        :param db_engine_spec: engine spec of the database the data came from
+        :return: the result set
+        """
+        result_set = cls.__new__(cls)
+        result_set._set_cursor_description(cursor_description, db_engine_spec)
+        with stats_timing("result_set.build_arrow_table", stats_logger):
+            result_set.table = result_set._build_table(batches)
+        result_set._log_build_stats()
+        return result_set
+
+    def _set_cursor_description(
+        self,
+        cursor_description: DbapiDescription,
+        db_engine_spec: Type[db_engine_specs.BaseEngineSpec],
+    ) -> None:
+        self.db_engine_spec = db_engine_spec
+        self._column_names: List[str] = []
+        self._deduped_cursor_desc: List[Tuple[Any, ...]] = []
 
         if cursor_description:
             # get deduped list of column names
-            column_names = dedup([col[0] for col in cursor_description])
+            self._column_names = dedup([col[0] for col in cursor_description])
 
             # fix cursor descriptor with the deduped names
-            deduped_cursor_desc = [
+            self._deduped_cursor_desc = [
                 tuple([column_name, *list(description)[1:]])
-                for column_name, description in zip(column_names, cursor_description)
+                for column_name, description in zip(
+                    self._column_names, cursor_description
+                )
             ]
 
-            # generate numpy structured array dtype
-            numpy_dtype = [(column_name, "object") for column_name in column_names]
-
-        # only do expensive recasting if datatype is not standard list of tuples
-        if data and (not isinstance(data, list) or not isinstance(data[0], tuple)):
-            data = [tuple(row) for row in data]
-        array = np.array(data, dtype=numpy_dtype)
-        if array.size > 0:
-            for column in column_names:
-                try:
-                    pa_data.append(pa.array(array[column].tolist()))
-                except (
-                    pa.lib.ArrowInvalid,
-                    pa.lib.ArrowTypeError,
-                    pa.lib.ArrowNotImplementedError,
-                    TypeError,  # this is super hackey,
-                    # https://issues.apache.org/jira/browse/ARROW-7855
-                ):
-                    # attempt serialization of values as strings
-                    stringified_arr = stringify_values(array[column])
-                    pa_data.append(pa.array(stringified_arr.tolist()))
-
-        if pa_data:  # pylint: disable=too-many-nested-blocks
-            for i, column in enumerate(column_names):
-                if pa.types.is_nested(pa_data[i].type):
-                    # TODO: revisit nested column serialization once nested types
-                    #  are added as a natively supported column type in Rabbitai
-                    #  (rabbitai.utils.core.GenericDataType).
-                    stringified_arr = stringify_values(array[column])
-                    pa_data[i] = pa.array(stringified_arr.tolist())
-
-                elif pa.types.is_temporal(pa_data[i].type):
-                    # workaround for bug converting
-                    # `psycopg2.tz.FixedOffsetTimezone` tzinfo values.
-                    # related: https://issues.apache.org/jira/browse/ARROW-5248
-                    sample = self.first_nonempty(array[column])
-                    if sample and isinstance(sample, datetime.datetime):
-                        try:
-                            if sample.tzinfo:
-                                tz = sample.tzinfo
-                                series = pd.Series(
-                                    array[column], dtype="datetime64[ns]"
-                                )
-                                series = pd.to_datetime(series).dt.tz_localize(tz)
-                                pa_data[i] = pa.Array.from_pandas(
-                                    series, type=pa.timestamp("ns", tz=tz)
-                                )
-                        except Exception as ex:  # pylint: disable=broad-except
-                            logger.exception(ex)
-
-        self.table = pa.Table.from_arrays(pa_data, names=column_names)
         self._type_dict: Dict[str, Any] = {}
         try:
             # The driver may not be passing a cursor.description
             self._type_dict = {
-                col: db_engine_spec.get_datatype(deduped_cursor_desc[i][1])
-                for i, col in enumerate(column_names)
-                if deduped_cursor_desc
+                col: db_engine_spec.get_datatype(self._deduped_cursor_desc[i][1])
+                for i, col in enumerate(self._column_names)
+                if self._deduped_cursor_desc
             }
         except Exception as ex:
             logger.exception(ex)
 
+    def _build_table(
+        self, batches: Iterable[Union[DbapiResult, pa.RecordBatch]]
+    ) -> pa.Table:
+        allocated_bytes = pa.total_allocated_bytes()
+        self._arrow_peak_bytes = 0
+        pa_types: List[Optional[pa.DataType]] = []
+        for description in self._deduped_cursor_desc:
+            type_code = description[1] if len(description) > 1 else None
+            pa_types.append(self._get_pa_type(self.db_engine_spec, type_code))
+        chunks: List[List[pa.Array]] = [[] for _ in self._column_names]
+        stringified: Set[int] = set()
+
+        for batch in batches:
+            if isinstance(batch, pa.RecordBatch):
+                arrays: List[pa.Array] = [
+                    self._stringify_column(array.to_pylist())
+                    if i in stringified
+                    else array
+                    for i, array in enumerate(batch.columns)
+                ]
+            elif batch:
+                # transpose the rows into one sequence per column; this is the only
+                # copy of the cell references made before handing them to Arrow
+                arrays = []
+                for i, column_values in enumerate(zip(*batch)):
+                    if i >= len(chunks):
+                        break
+                    if i in stringified:
+                        arrays.append(self._stringify_column(column_values))
+                        continue
+                    array = self._build_column(column_values, pa_types[i])
+                    if array is None:
+                        # stringify the whole column, including earlier chunks
+                        stringified.add(i)
+                        array = self._stringify_column(column_values)
+                        chunks[i] = [
+                            self._stringify_column(chunk.to_pylist())
+                            for chunk in chunks[i]
+                        ]
+                    elif pa_types[i] is None and not (
+                        pa.types.is_null(array.type) or pa.types.is_integer(array.type)
+                    ):
+                        # later chunks are built with the type of the first one
+                        pa_types[i] = array.type
+                    arrays.append(array)
+            else:
+                continue
+            for column_chunks, array in zip(chunks, arrays):
+                column_chunks.append(array)
+            self._arrow_peak_bytes = max(
+                self._arrow_peak_bytes, pa.total_allocated_bytes() - allocated_bytes
+            )
+
+        pa_data = [
+            self._combine_chunks(column_chunks)
+            for column_chunks in chunks
+            if column_chunks
+        ]
+        return pa.Table.from_arrays(pa_data, names=self._column_names[: len(pa_data)])
+
+    def _combine_chunks(self, chunks: List[pa.Array]) -> pa.ChunkedArray:
+        """
+        Combine the chunks of a column into a single chunked array, casting them to
+        a common type if the type inferred for some of the chunks differs.
+        """
+        chunk_types = {
+            chunk.type for chunk in chunks if not pa.types.is_null(chunk.type)
+        }
+        if len(chunk_types) > 1:
+            values = list(chain.from_iterable(chunk.to_pylist() for chunk in chunks))
+            array = self._build_column(values, None)
+            if array is None:
+                array = self._stringify_column(values)
+            return pa.chunked_array([array])
+        if chunk_types:
+            chunk_type = chunk_types.pop()
+            chunks = [
+                chunk if chunk.type == chunk_type else chunk.cast(chunk_type)
+                for chunk in chunks
+            ]
+        return pa.chunked_array(chunks)
+
+    def _log_build_stats(self) -> None:
+        stats_logger.gauge("result_set.arrow_peak_bytes", self._arrow_peak_bytes)
+        stats_logger.gauge("result_set.arrow_table_bytes", self.table.nbytes)
+
+    @staticmethod
+    def _get_pa_type(
+        db_engine_spec: Type[db_engine_specs.BaseEngineSpec], type_code: Any
+    ) -> Optional[pa.DataType]:
+        """
+        Derive the Arrow type of a column from its cursor description type code.
+
+        Only types that can be built without loss of information are returned;
+        for anything else (integers, which Arrow would silently truncate floats to,
+        decimals, temporal types etc) `None` is returned and the type is inferred by
+        Arrow from the values.
+
+        :param db_engine_spec: engine spec of the database the data came from
+        :param type_code: type code from the cursor description
+        :return: Arrow type to build the column with, if known
+        """
+        try:
+            native_type = db_engine_spec.get_datatype(type_code)
+            if not native_type:
+                return None
+            column_spec = db_engine_spec.get_column_spec(
+                native_type, source=utils.ColumnTypeSource.CURSOR_DESCRIPION
+            )
+        except Exception:  # pylint: disable=broad-except
+            return None
+        if column_spec is None:
+            return None
+        if column_spec.generic_type == utils.GenericDataType.STRING:
+            return pa.string()
+        if column_spec.generic_type == utils.GenericDataType.BOOLEAN:
+            return pa.bool_()
+        if column_spec.generic_type == utils.GenericDataType.NUMERIC and isinstance(
+            column_spec.sqla_type, types.Float
+        ):
+            return pa.float64()
+        return None
+
+    def _build_column(
+        self, values: Sequence[Any], pa_type: Optional[pa.DataType]
+    ) -> Optional[pa.Array]:
+        """
+        Build a single Arrow column from a sequence of cell values.
+
+        The column is first built with the type derived from the cursor
+        description, then with the type inferred by Arrow. If both fail, or the
+        column holds nested values, `None` is returned and the caller is expected
+        to serialize the values of this column as strings.
+
+        :param values: the values of the column
+        :param pa_type: Arrow type derived from the cursor description, if any
+        :return: Arrow array holding the column
+        """
+        array: Optional[pa.Array] = None
+        for candidate_type in (pa_type, None) if pa_type else (None,):
+            try:
+                array = pa.array(values, type=candidate_type)
+                break
+            except ARROW_CONVERSION_ERRORS:
+                continue
+
+        if array is None or pa.types.is_nested(array.type):
+            # TODO: revisit nested column serialization once nested types
+            #  are added as a natively supported column type in Rabbitai
+            #  (rabbitai.utils.core.GenericDataType).
+            return None
+
+        if pa.types.is_temporal(array.type):
+            # workaround for bug converting
+            # `psycopg2.tz.FixedOffsetTimezone` tzinfo values.
+            # related: https://issues.apache.org/jira/browse/ARROW-5248
+            sample = self.first_nonempty(values)
+            if sample and isinstance(sample, datetime.datetime):
+                try:
+                    if sample.tzinfo:
+                        tz = sample.tzinfo
+                        series = pd.Series(values, dtype="datetime64[ns]")
+                        series = pd.to_datetime(series).dt.tz_localize(tz)
+                        array = pa.Array.from_pandas(
+                            series, type=pa.timestamp("ns", tz=tz)
+                        )
+                except Exception as ex:  # pylint: disable=broad-except
+                    logger.exception(ex)
+        return array
+
+    @staticmethod
+    def _stringify_column(values: Sequence[Any]) -> pa.Array:
+        # attempt serialization of values as strings
+        stats_logger.incr("result_set.stringified_column")
+        return pa.array([stringify(value) for value in values])
+
     @staticmethod
     def convert_pa_dtype(pa_dtype: pa.DataType) -> Optional[str]:
         if pa.types.is_boolean(pa_dtype):
@@ -2,7 +2,21 @@
 """A set of constants and methods to manage permissions and security"""
 import logging
 import re
-from typing import Any, Callable, cast, List, Optional, Set, Tuple, TYPE_CHECKING, Union
+import uuid
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
 
 from flask import current_app, g
 from flask_appbuilder import Model
@@ -24,11 +38,10 @@ from flask_appbuilder.security.views import (
 )
 from flask_appbuilder.widgets import ListWidget
 from flask_login import AnonymousUserMixin
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, inspect, or_
 from sqlalchemy.engine.base import Connection
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.mapper import Mapper
-from sqlalchemy.orm.query import Query as SqlaQuery
 
 from rabbitai import sql_parse
 from rabbitai.connectors.connector_registry import ConnectorRegistry
@@ -49,6 +62,30 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# cache key of the version of the cached row level security filters, which changes
+# when they are invalidated
+RLS_FILTERS_VERSION_CACHE_KEY = "rls_filters_version"
+
+
+class RLSFilter(NamedTuple):
+    id: int
+    group_key: Optional[str]
+    clause: str
+
+
+# cache key of the version of the cached compiled permissions, which changes when
+# they are invalidated
+PERMISSIONS_VERSION_CACHE_KEY = "permissions_version"
+
+
+class CompiledPermissions(NamedTuple):
+    # the (permission, view menu) pairs granted by the roles which are not builtin
+    permission_views: FrozenSet[Tuple[str, str]]
+    # the view menus granted with each permission by all the roles
+    view_menus: Dict[str, FrozenSet[str]]
+    # the builtin roles, whose permissions are patterns checked on access
+    builtin_roles: Tuple[str, ...]
+
 
 class RabbitaiSecurityListWidget(ListWidget):
     """
@@ -144,6 +181,7 @@ class RabbitaiSecurityManager(  # pylint: disable=too-many-public-methods
         "can_approve",
         "can_update_role",
         "all_query_access",
+        "can_memoized",
     }
 
     READ_ONLY_PERMISSION = {
@@ -233,6 +271,160 @@ class RabbitaiSecurityManager(  # pylint: disable=too-many-public-methods
             return self.is_item_public(permission_name, view_name)
         return self._has_view_access(user, permission_name, view_name)
 
+    def _has_view_access(
+        self, user: User, permission_name: str, view_name: str
+    ) -> bool:
+        """
+        Return True if the user can access the FAB permission/view, False otherwise.
+
+        Overrides the FAB method to check the compiled permissions of the user
+        instead of querying its roles.
+
+        :param user: The FAB user
+        :param permission_name: The FAB permission name
+        :param view_name: The FAB view-menu name
+        :returns: Whether the user can access the FAB permission/view
+        """
+
+        return self._is_permission_granted(
+            self.get_compiled_permissions(user.get_id()), permission_name, view_name
+        )
+
+    def is_item_public(self, permission_name: str, view_name: str) -> bool:
+        """
+        Return True if the FAB permission/view is granted to the public role, False
+        otherwise.
+
+        :param permission_name: The FAB permission name
+        :param view_name: The FAB view-menu name
+        :returns: Whether the FAB permission/view is public
+        """
+
+        return self._is_permission_granted(
+            self.get_compiled_permissions(None), permission_name, view_name
+        )
+
+    def _is_permission_granted(
+        self, permissions: CompiledPermissions, permission_name: str, view_name: str
+    ) -> bool:
+        if (permission_name, view_name) in permissions.permission_views:
+            return True
+        for role_name in permissions.builtin_roles:
+            for view_name_regex, permission_name_regex in self.builtin_roles[role_name]:
+                if re.match(view_name_regex, view_name) and re.match(
+                    permission_name_regex, permission_name
+                ):
+                    return True
+        return False
+
+    def get_compiled_permissions(self, user_id: Optional[int]) -> CompiledPermissions:
+        """
+        Return the permissions granted to the user by all its roles.
+
+        The permissions are memoized for the lifetime of the session, i.e. the
+        request, and, when ``PERMISSIONS_CACHE_TIMEOUT`` is set, cached across
+        requests.
+
+        :param user_id: The id of the user, None for the anonymous user
+        :returns: The compiled permissions of the user
+        """
+
+        request_permissions = self.get_session.info.setdefault(
+            "compiled_permissions", {}
+        )
+        if user_id not in request_permissions:
+            request_permissions[user_id] = self._get_cached_permissions(user_id)
+        return request_permissions[user_id]
+
+    def _get_cached_permissions(self, user_id: Optional[int]) -> CompiledPermissions:
+        from rabbitai.extensions import cache_manager
+
+        timeout = current_app.config["PERMISSIONS_CACHE_TIMEOUT"]
+        if timeout is None:
+            return self._compile_permissions(user_id)
+
+        version = self._get_cache_version(PERMISSIONS_VERSION_CACHE_KEY)
+        if version is None:
+            return self._compile_permissions(user_id)
+
+        cache_key = f"permissions_{version}_{user_id}"
+        permissions = cache_manager.cache.get(cache_key)
+        if permissions is None:
+            permissions = self._compile_permissions(user_id)
+            cache_manager.cache.set(cache_key, permissions, timeout=timeout)
+        return permissions
+
+    def invalidate_permissions(  # pylint: disable=unused-argument
+        self,
+        mapper: Optional[Mapper] = None,
+        connection: Optional[Connection] = None,
+        target: Optional[Any] = None,
+    ) -> None:
+        """
+        Invalidate the compiled permissions, e.g. after roles, users or permissions
+        changed.
+
+        :param mapper: The mapper of the changed object, if called by an event
+        :param connection: The DB-API connection, if called by an event
+        :param target: The changed object, if called by an event
+        """
+        from rabbitai.extensions import cache_manager
+
+        if current_app.config["PERMISSIONS_CACHE_TIMEOUT"] is not None:
+            cache_manager.cache.set(
+                PERMISSIONS_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=0
+            )
+        self.get_session.info.pop("compiled_permissions", None)
+
+    def _compile_permissions(self, user_id: Optional[int]) -> CompiledPermissions:
+        query = self.get_session.query(self.role_model.id, self.role_model.name)
+        if user_id is None:
+            # like FAB, only the stored permissions of the public role are granted
+            roles = query.filter(self.role_model.name == self.auth_role_public).all()
+            builtin_roles: Tuple[str, ...] = ()
+        else:
+            roles = (
+                query.join(assoc_user_role)
+                .filter(assoc_user_role.c.user_id == user_id)
+                .all()
+            )
+            builtin_roles = tuple(
+                role.name for role in roles if role.name in self.builtin_roles
+            )
+
+        rows = (
+            self.get_session.query(
+                self.role_model.name,
+                self.permission_model.name,
+                self.viewmenu_model.name,
+            )
+            .select_from(self.viewmenu_model)
+            .join(self.permissionview_model)
+            .join(self.permission_model)
+            .join(assoc_permissionview_role)
+            .join(self.role_model)
+            .filter(self.role_model.id.in_([role.id for role in roles]))
+            .all()
+            if roles
+            else []
+        )
+
+        view_menus: Dict[str, Set[str]] = {}
+        for _, permission_name, view_menu_name in rows:
+            view_menus.setdefault(permission_name, set()).add(view_menu_name)
+        return CompiledPermissions(
+            permission_views=frozenset(
+                (permission_name, view_menu_name)
+                for role_name, permission_name, view_menu_name in rows
+                if role_name not in builtin_roles
+            ),
+            view_menus={
+                permission_name: frozenset(names)
+                for permission_name, names in view_menus.items()
+            },
+            builtin_roles=builtin_roles,
+        )
+
     def can_access_all_queries(self) -> bool:
         """
         Return True if the user can access all SQL Lab queries, False otherwise.
@@ -420,35 +612,16 @@ class RabbitaiSecurityManager(  # pylint: disable=too-many-public-methods
         return True
 
     def user_view_menu_names(self, permission_name: str) -> Set[str]:
-        base_query = (
-            self.get_session.query(self.viewmenu_model.name)
-            .join(self.permissionview_model)
-            .join(self.permission_model)
-            .join(assoc_permissionview_role)
-            .join(self.role_model)
-        )
+        """
+        Return the names of the view menus granted to the user with the permission.
 
-        if not g.user.is_anonymous:
-            # filter by user id
-            view_menu_names = (
-                base_query.join(assoc_user_role)
-                .join(self.user_model)
-                .filter(self.user_model.id == g.user.get_id())
-                .filter(self.permission_model.name == permission_name)
-            ).all()
-            return {s.name for s in view_menu_names}
-
-        # Properly treat anonymous user
-        public_role = self.get_public_role()
-        if public_role:
-            # filter by public role
-            view_menu_names = (
-                base_query.filter(self.role_model.id == public_role.id).filter(
-                    self.permission_model.name == permission_name
-                )
-            ).all()
-            return {s.name for s in view_menu_names}
-        return set()
+        :param permission_name: The FAB permission name
+        :returns: The names of the FAB view menus
+        """
+
+        user_id = None if g.user.is_anonymous else g.user.get_id()
+        view_menus = self.get_compiled_permissions(user_id).view_menus
+        return set(view_menus.get(permission_name, ()))
 
     def get_schemas_accessible_by_user(
         self, database: "Database", schemas: List[str], hierarchical: bool = True
@@ -640,6 +813,7 @@ class RabbitaiSecurityManager(  # pylint: disable=too-many-public-methods
         # commit role and view menu updates
         self.get_session.commit()
         self.clean_perms()
+        self.invalidate_permissions()
 
     def _get_pvms_from_builtin_role(self, role_name: str) -> List[PermissionView]:
         """
@@ -906,6 +1080,7 @@ class RabbitaiSecurityManager(  # pylint: disable=too-many-public-methods
                         permission_id=permission.id, view_menu_id=view_menu.id
                     )
                 )
+                self.invalidate_permissions()
 
     def raise_for_access(
         # pylint: disable=too-many-arguments,too-many-branches,
@@ -1012,75 +1187,159 @@ class RabbitaiSecurityManager(  # pylint: disable=too-many-public-methods
     def get_anonymous_user(self) -> User:  # pylint: disable=no-self-use
         return AnonymousUserMixin()
 
-    def get_rls_filters(self, table: "BaseDatasource") -> List[SqlaQuery]:
+    def get_rls_filters(self, table: "BaseDatasource") -> List[RLSFilter]:
         """
         Retrieves the appropriate row level security filters for the current user and
         the passed table.
 
+        The filters are memoized for the request and, when
+        ``RLS_FILTERS_CACHE_TIMEOUT`` is set, cached across requests.
+
         :param table: The table to check against
         :returns: A list of filters
         """
-        if hasattr(g, "user") and hasattr(g.user, "id"):
-            from rabbitai.connectors.sqla.models import (
-                RLSFilterRoles,
-                RLSFilterTables,
-                RowLevelSecurityFilter,
-            )
+        if not (hasattr(g, "user") and hasattr(g.user, "id")):
+            return []
+
+        key = (g.user.get_id(), table.id)
+        request_filters = g.setdefault("rls_filters", {})
+        if key not in request_filters:
+            request_filters[key] = self._get_cached_rls_filters(*key)
+        return request_filters[key]
+
+    def _get_cached_rls_filters(self, user_id: int, table_id: int) -> List[RLSFilter]:
+        from rabbitai.extensions import cache_manager
+
+        timeout = current_app.config["RLS_FILTERS_CACHE_TIMEOUT"]
+        if timeout is None:
+            return self._query_rls_filters(user_id, table_id)
+
+        version = self._get_cache_version(RLS_FILTERS_VERSION_CACHE_KEY)
+        if version is None:
+            return self._query_rls_filters(user_id, table_id)
+
+        cache_key = f"rls_filters_{version}_{user_id}_{table_id}"
+        filters = cache_manager.cache.get(cache_key)
+        if filters is None:
+            filters = self._query_rls_filters(user_id, table_id)
+            cache_manager.cache.set(cache_key, filters, timeout=timeout)
+        return filters
+
+    @staticmethod
+    def _get_cache_version(version_key: str) -> Optional[str]:
+        """
+        Get the version of a family of cached entries, which changes when they are
+        invalidated.
 
-            user_roles = (
-                self.get_session.query(assoc_user_role.c.role_id)
-                .filter(assoc_user_role.c.user_id == g.user.get_id())
-                .subquery()
+        :param version_key: The cache key of the version
+        :returns: The version, None if the cache does not keep it
+        """
+        from rabbitai.extensions import cache_manager
+
+        cache = cache_manager.cache
+        version = cache.get(version_key)
+        if version is None:
+            # entries cached with an evicted version must not be read again
+            cache.add(version_key, uuid.uuid4().hex, timeout=0)
+            version = cache.get(version_key)
+        return version
+
+    def invalidate_rls_filters(  # pylint: disable=unused-argument
+        self,
+        mapper: Optional[Mapper] = None,
+        connection: Optional[Connection] = None,
+        target: Optional[Any] = None,
+    ) -> None:
+        """
+        Invalidate the cached row level security filters, e.g. after filters,
+        users or roles changed.
+
+        :param mapper: The mapper of the changed object, if called by an event
+        :param connection: The DB-API connection, if called by an event
+        :param target: The changed object, if called by an event
+        """
+        from rabbitai.extensions import cache_manager
+
+        if current_app.config["RLS_FILTERS_CACHE_TIMEOUT"] is not None:
+            cache_manager.cache.set(
+                RLS_FILTERS_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=0
             )
-            regular_filter_roles = (
-                self.get_session.query(RLSFilterRoles.c.rls_filter_id)
-                .join(RowLevelSecurityFilter)
-                .filter(
-                    RowLevelSecurityFilter.filter_type
-                    == RowLevelSecurityFilterType.REGULAR
-                )
-                .filter(RLSFilterRoles.c.role_id.in_(user_roles))
-                .subquery()
+        g.pop("rls_filters", None)
+
+    def invalidate_user_roles(
+        self, mapper: Mapper, connection: Connection, target: Any
+    ) -> None:
+        """
+        Invalidate the cached row level security filters and compiled permissions
+        after the roles of a user changed, and not after e.g. its login statistics
+        were updated.
+
+        :param mapper: The mapper of the changed user
+        :param connection: The DB-API connection
+        :param target: The changed user
+        """
+        if inspect(target).attrs.roles.history.has_changes():
+            self.invalidate_rls_filters(mapper, connection, target)
+            self.invalidate_permissions(mapper, connection, target)
+
+    def _query_rls_filters(self, user_id: int, table_id: int) -> List[RLSFilter]:
+        from rabbitai.connectors.sqla.models import (
+            RLSFilterRoles,
+            RLSFilterTables,
+            RowLevelSecurityFilter,
+        )
+
+        user_roles = (
+            self.get_session.query(assoc_user_role.c.role_id)
+            .filter(assoc_user_role.c.user_id == user_id)
+            .subquery()
+        )
+        regular_filter_roles = (
+            self.get_session.query(RLSFilterRoles.c.rls_filter_id)
+            .join(RowLevelSecurityFilter)
+            .filter(
+                RowLevelSecurityFilter.filter_type == RowLevelSecurityFilterType.REGULAR
             )
-            base_filter_roles = (
-                self.get_session.query(RLSFilterRoles.c.rls_filter_id)
-                .join(RowLevelSecurityFilter)
-                .filter(
-                    RowLevelSecurityFilter.filter_type
-                    == RowLevelSecurityFilterType.BASE
-                )
-                .filter(RLSFilterRoles.c.role_id.in_(user_roles))
-                .subquery()
+            .filter(RLSFilterRoles.c.role_id.in_(user_roles))
+            .subquery()
+        )
+        base_filter_roles = (
+            self.get_session.query(RLSFilterRoles.c.rls_filter_id)
+            .join(RowLevelSecurityFilter)
+            .filter(
+                RowLevelSecurityFilter.filter_type == RowLevelSecurityFilterType.BASE
             )
-            filter_tables = (
-                self.get_session.query(RLSFilterTables.c.rls_filter_id)
-                .filter(RLSFilterTables.c.table_id == table.id)
-                .subquery()
+            .filter(RLSFilterRoles.c.role_id.in_(user_roles))
+            .subquery()
+        )
+        filter_tables = (
+            self.get_session.query(RLSFilterTables.c.rls_filter_id)
+            .filter(RLSFilterTables.c.table_id == table_id)
+            .subquery()
+        )
+        query = (
+            self.get_session.query(
+                RowLevelSecurityFilter.id,
+                RowLevelSecurityFilter.group_key,
+                RowLevelSecurityFilter.clause,
             )
-            query = (
-                self.get_session.query(
-                    RowLevelSecurityFilter.id,
-                    RowLevelSecurityFilter.group_key,
-                    RowLevelSecurityFilter.clause,
-                )
-                .filter(RowLevelSecurityFilter.id.in_(filter_tables))
-                .filter(
-                    or_(
-                        and_(
-                            RowLevelSecurityFilter.filter_type
-                            == RowLevelSecurityFilterType.REGULAR,
-                            RowLevelSecurityFilter.id.in_(regular_filter_roles),
-                        ),
-                        and_(
-                            RowLevelSecurityFilter.filter_type
-                            == RowLevelSecurityFilterType.BASE,
-                            RowLevelSecurityFilter.id.notin_(base_filter_roles),
-                        ),
-                    )
+            .filter(RowLevelSecurityFilter.id.in_(filter_tables))
+            .filter(
+                or_(
+                    and_(
+                        RowLevelSecurityFilter.filter_type
+                        == RowLevelSecurityFilterType.REGULAR,
+                        RowLevelSecurityFilter.id.in_(regular_filter_roles),
+                    ),
+                    and_(
+                        RowLevelSecurityFilter.filter_type
+                        == RowLevelSecurityFilterType.BASE,
+                        RowLevelSecurityFilter.id.notin_(base_filter_roles),
+                    ),
                 )
             )
-            return query.all()
-        return []
+        )
+        return [RLSFilter(*row) for row in query.all()]
 
     def get_rls_ids(self, table: "BaseDatasource") -> List[int]:
         """
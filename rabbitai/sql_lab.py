@@ -2,6 +2,7 @@ import logging
 import uuid
 from contextlib import closing
 from datetime import datetime
+from itertools import chain
 from sys import getsizeof
 from typing import Any, cast, Dict, List, Optional, Tuple, Union
 
@@ -32,6 +33,7 @@ from rabbitai.utils.core import (
 )
 from rabbitai.utils.dates import now_as_float
 from rabbitai.utils.decorators import stats_timing
+from rabbitai.utils.results_backend import write_arrow_results
 
 
 def dummy_sql_query_mutator(
@@ -49,6 +51,8 @@ stats_logger = config["STATS_LOGGER"]
 SQLLAB_TIMEOUT = config["SQLLAB_ASYNC_TIME_LIMIT_SEC"]
 SQLLAB_HARD_TIMEOUT = SQLLAB_TIMEOUT + 60
 SQL_MAX_ROW = config["SQL_MAX_ROW"]
+SQLLAB_FETCH_BATCH_SIZE = config["SQLLAB_FETCH_BATCH_SIZE"]
+RESULTS_BACKEND_FORMAT = config["RESULTS_BACKEND_FORMAT"]
 SQLLAB_CTAS_NO_LIMIT = config["SQLLAB_CTAS_NO_LIMIT"]
 SQL_QUERY_MUTATOR = config.get("SQL_QUERY_MUTATOR") or dummy_sql_query_mutator
 log_query = config["QUERY_LOGGER"]
@@ -293,6 +297,17 @@ def execute_sql_statement(
                 query.id,
                 str(query.to_dict()),
             )
+            if SQLLAB_FETCH_BATCH_SIZE:
+                result_set = _fetch_result_set_in_batches(
+                    query, cursor, db_engine_spec, increased_limit
+                )
+                if query.limit is None or result_set.size <= query.limit:
+                    query.limiting_factor = LimitingFactor.NOT_LIMITED
+                else:
+                    # return 1 row less than increased_query
+                    result_set.table = result_set.table.slice(0, query.limit)
+                return result_set
+
             data = db_engine_spec.fetch_data(cursor, increased_limit)
             if query.limit is None or len(data) <= query.limit:
                 query.limiting_factor = LimitingFactor.NOT_LIMITED
@@ -309,6 +324,33 @@ def execute_sql_statement(
     return RabbitaiResultSet(data, cursor_description, db_engine_spec)
 
 
+def _fetch_result_set_in_batches(
+    query: Query, cursor: Any, db_engine_spec: BaseEngineSpec, limit: Optional[int],
+) -> RabbitaiResultSet:
+    """
+    以 SQLLAB_FETCH_BATCH_SIZE 行为一批从游标获取数据，并逐批转换为 Arrow，避免在内存中保存全部行。
+
+    :param query: 查询对象。
+    :param cursor: 游标对象。
+    :param db_engine_spec: 数据库引擎规范。
+    :param limit: 最多获取的行数。
+    :return:
+    """
+    batches = db_engine_spec.fetch_data_batches(
+        cursor, limit, batch_size=SQLLAB_FETCH_BATCH_SIZE
+    )
+    # some drivers only populate the cursor description once the first rows
+    # have been fetched
+    first_batch = next(batches, None)
+    logger.debug("Query %d: Fetching cursor description", query.id)
+    cursor_description = cursor.description
+    return RabbitaiResultSet.from_batches(
+        chain([first_batch], batches) if first_batch is not None else [],
+        cursor_description,
+        db_engine_spec,
+    )
+
+
 def _serialize_payload(
     payload: Dict[Any, Any], use_msgpack: Optional[bool] = False
 ) -> Union[bytes, str]:
@@ -517,12 +559,32 @@ def execute_sql_statements(
         )
     query.end_time = now_as_float()
 
-    use_arrow_data = store_results and cast(bool, results_backend_use_msgpack)
-    data, selected_columns, all_columns, expanded_columns = _serialize_and_expand_data(
-        result_set, db_engine_spec, use_arrow_data, expand_data
+    # the Arrow IPC format stores the data separately from the metadata
+    store_arrow_ipc = bool(
+        store_results and results_backend and RESULTS_BACKEND_FORMAT == "arrow"
     )
+    use_arrow_data = (
+        store_results
+        and cast(bool, results_backend_use_msgpack)
+        and not store_arrow_ipc
+    )
+    if store_arrow_ipc:
+        data, selected_columns, all_columns, expanded_columns = (
+            [],
+            result_set.columns,
+            result_set.columns,
+            [],
+        )
+    else:
+        (
+            data,
+            selected_columns,
+            all_columns,
+            expanded_columns,
+        ) = _serialize_and_expand_data(
+            result_set, db_engine_spec, use_arrow_data, expand_data
+        )
 
-    # TODO: data should be saved separately from metadata (likely in Parquet)
     payload.update(
         {
             "status": QueryStatus.SUCCESS,
@@ -541,22 +603,37 @@ def execute_sql_statements(
             "Query %s: Storing results in results backend, key: %s", str(query_id), key
         )
         with stats_timing("sqllab.query.results_backend_write", stats_logger):
-            with stats_timing(
-                "sqllab.query.results_backend_write_serialization", stats_logger
-            ):
-                serialized_payload = _serialize_payload(
-                    payload, cast(bool, results_backend_use_msgpack)
-                )
             cache_timeout = database.cache_timeout
             if cache_timeout is None:
                 cache_timeout = config["CACHE_DEFAULT_TIMEOUT"]
 
-            compressed = zlib_compress(serialized_payload)
-            logger.debug(
-                "*** serialized payload size: %i", getsizeof(serialized_payload)
-            )
-            logger.debug("*** compressed payload size: %i", getsizeof(compressed))
-            results_backend.set(key, compressed, cache_timeout)
+            if store_arrow_ipc:
+                with stats_timing(
+                    "sqllab.query.results_backend_write_serialization", stats_logger
+                ):
+                    write_arrow_results(
+                        results_backend,
+                        key,
+                        {k: v for k, v in payload.items() if k != "data"},
+                        result_set.pa_table,
+                        cache_timeout,
+                        batch_rows=config["RESULTS_BACKEND_ARROW_BATCH_ROWS"],
+                        compression=config["RESULTS_BACKEND_ARROW_COMPRESSION"],
+                    )
+            else:
+                with stats_timing(
+                    "sqllab.query.results_backend_write_serialization", stats_logger
+                ):
+                    serialized_payload = _serialize_payload(
+                        payload, cast(bool, results_backend_use_msgpack)
+                    )
+
+                compressed = zlib_compress(serialized_payload)
+                logger.debug(
+                    "*** serialized payload size: %i", getsizeof(serialized_payload)
+                )
+                logger.debug("*** compressed payload size: %i", getsizeof(compressed))
+                results_backend.set(key, compressed, cache_timeout)
         query.results_key = key
 
     query.status = QueryStatus.SUCCESS
@@ -564,7 +641,7 @@ def execute_sql_statements(
 
     if return_results:
         # since we're returning results we need to create non-arrow data
-        if use_arrow_data:
+        if use_arrow_data or store_arrow_ipc:
             (
                 data,
                 selected_columns,
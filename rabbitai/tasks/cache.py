@@ -2,21 +2,31 @@
 
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from urllib import request
 from urllib.error import URLError
 
 from celery.utils.log import get_task_logger
-from sqlalchemy import and_, func
+from flask import g
+from sqlalchemy import and_, extract, func
 
 from rabbitai import app, db
-from rabbitai.extensions import celery_app
+from rabbitai.extensions import cache_manager, celery_app
+from rabbitai.models.cache import CacheKey
 from rabbitai.models.core import Log
 from rabbitai.models.dashboard import Dashboard
 from rabbitai.models.slice import Slice
 from rabbitai.models.tags import Tag, TaggedObject
+from rabbitai.utils.concurrency import get_database_id, run_concurrently
+from rabbitai.utils.core import error_msg_from_exception, QueryStatus
 from rabbitai.utils.date_parser import parse_human_datetime
-from rabbitai.views.utils import build_extra_filters
+from rabbitai.views.utils import build_extra_filters, get_viz
+from rabbitai.viz import BaseViz
 
 logger = get_task_logger(__name__)
 logger.setLevel(logging.INFO)
@@ -73,8 +83,10 @@ class Strategy:
     """
     A cache warm up strategy.
 
-    Each strategy defines a `get_urls` method that returns a list of URLs to
-    be fetched from the `/rabbitai/warm_up_cache/` endpoint.
+    Each strategy defines a `get_charts` method that returns the charts to warm
+    up, whose data is computed in process by `warm_up_charts`. Strategies which
+    only define a `get_urls` method returning a list of URLs have them fetched
+    instead.
 
     Strategies can be configured in `rabbitai/config.py`:
 
@@ -92,11 +104,22 @@ class Strategy:
 
     """
 
+    # whether the data of the charts is computed even when it is cached
+    force_refresh = False
+
     def __init__(self) -> None:
-        pass
+        # counters describing the last run, reported by the task
+        self.stats: Dict[str, int] = {}
+
+    def get_charts(self) -> List[Tuple[Slice, Optional[Dict[str, Any]]]]:
+        """
+        Return the charts to warm up, with the `form_data` overriding theirs, e.g.
+        the default filters of their dashboard.
+        """
+        raise NotImplementedError("Subclasses must implement get_charts!")
 
     def get_urls(self) -> List[str]:
-        raise NotImplementedError("Subclasses must implement get_urls!")
+        return [get_url(chart, overrides) for chart, overrides in self.get_charts()]
 
 
 class DummyStrategy(Strategy):
@@ -117,11 +140,11 @@ class DummyStrategy(Strategy):
 
     name = "dummy"
 
-    def get_urls(self) -> List[str]:
+    def get_charts(self) -> List[Tuple[Slice, Optional[Dict[str, Any]]]]:
         session = db.create_scoped_session()
         charts = session.query(Slice).all()
 
-        return [get_url(chart) for chart in charts]
+        return [(chart, None) for chart in charts]
 
 
 class TopNDashboardsStrategy(Strategy):
@@ -149,8 +172,8 @@ class TopNDashboardsStrategy(Strategy):
         self.top_n = top_n
         self.since = parse_human_datetime(since) if since else None
 
-    def get_urls(self) -> List[str]:
-        urls = []
+    def get_charts(self) -> List[Tuple[Slice, Optional[Dict[str, Any]]]]:
+        charts: List[Tuple[Slice, Optional[Dict[str, Any]]]] = []
         session = db.create_scoped_session()
 
         records = (
@@ -166,9 +189,9 @@ class TopNDashboardsStrategy(Strategy):
         for dashboard in dashboards:
             for chart in dashboard.slices:
                 form_data_with_filters = get_form_data(chart.id, dashboard)
-                urls.append(get_url(chart, form_data_with_filters))
+                charts.append((chart, form_data_with_filters))
 
-        return urls
+        return charts
 
 
 class DashboardTagsStrategy(Strategy):
@@ -193,8 +216,8 @@ class DashboardTagsStrategy(Strategy):
         super(DashboardTagsStrategy, self).__init__()
         self.tags = tags or []
 
-    def get_urls(self) -> List[str]:
-        urls = []
+    def get_charts(self) -> List[Tuple[Slice, Optional[Dict[str, Any]]]]:
+        charts: List[Tuple[Slice, Optional[Dict[str, Any]]]] = []
         session = db.create_scoped_session()
 
         tags = session.query(Tag).filter(Tag.name.in_(self.tags)).all()
@@ -215,7 +238,7 @@ class DashboardTagsStrategy(Strategy):
         tagged_dashboards = session.query(Dashboard).filter(Dashboard.id.in_(dash_ids))
         for dashboard in tagged_dashboards:
             for chart in dashboard.slices:
-                urls.append(get_url(chart))
+                charts.append((chart, None))
 
         # add charts that are tagged
         tagged_objects = (
@@ -231,22 +254,290 @@ class DashboardTagsStrategy(Strategy):
         chart_ids = [tagged_object.object_id for tagged_object in tagged_objects]
         tagged_charts = session.query(Slice).filter(Slice.id.in_(chart_ids))
         for chart in tagged_charts:
-            urls.append(get_url(chart))
+            charts.append((chart, None))
+
+        return charts
 
-        return urls
 
+class PredictiveRefreshStrategy(Strategy):
+    """
+    Refresh the charts most viewed at this time of the day before their data
+    expires from the cache.
 
-strategies = [DummyStrategy, TopNDashboardsStrategy, DashboardTagsStrategy]
+    The views of the charts since `since` are read from the logs. The `top_n`
+    charts viewed the most during the next `horizon` hours of the day, on those
+    days, are refreshed when their data is missing from the cache or expires
+    within `lead_time` seconds. `lead_time` should be longer than the interval
+    between the runs of the task. The time the data of a chart was cached at is
+    read from the `CacheKey` records when ``STORE_CACHE_KEYS_IN_METADATA_DB`` is
+    set, from the cached value otherwise.
+
+    The charts refreshed before their data expired are counted as
+    `prevented_misses` in the stats of the run.
+
+        CELERYBEAT_SCHEDULE = {
+            'cache-warmup-predictive': {
+                'task': 'cache-warmup',
+                'schedule': crontab(minute='*/5'),
+                'kwargs': {
+                    'strategy_name': 'predictive_refresh',
+                    'top_n': 50,
+                    'since': '7 days ago',
+                    'lead_time': 600,
+                },
+            },
+        }
+
+    """
+
+    name = "predictive_refresh"
+    force_refresh = True
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        top_n: int = 50,
+        since: str = "7 days ago",
+        lead_time: int = 600,
+        horizon: int = 1,
+        min_views: int = 1,
+    ) -> None:
+        super(PredictiveRefreshStrategy, self).__init__()
+        self.top_n = top_n
+        self.since = parse_human_datetime(since) if since else None
+        self.lead_time = timedelta(seconds=lead_time)
+        self.horizon = horizon
+        self.min_views = min_views
+
+    def get_hot_chart_ids(self, now: datetime) -> List[int]:
+        """
+        Return the ids of the charts viewed the most during the next hours of the
+        day, by decreasing number of views.
+
+        :param now: The current UTC time, the logs are in UTC
+        :returns: The ids of the charts
+        """
+        session = db.create_scoped_session()
+        query = session.query(Log.slice_id).filter(Log.slice_id > 0)
+        if self.since:
+            query = query.filter(Log.dttm >= self.since)
+        # only the charts viewed the most overall are candidates
+        candidates = (
+            query.add_columns(func.count(Log.slice_id))
+            .group_by(Log.slice_id)
+            .order_by(func.count(Log.slice_id).desc())
+            .limit(self.top_n * 5)
+            .all()
+        )
+        total_views = {chart_id: count for chart_id, count in candidates}
+        if not total_views:
+            return []
+
+        hours = sorted({(now.hour + i) % 24 for i in range(self.horizon)})
+        # the views are counted by the database, compiling the extraction of the
+        # hour for its dialect
+        hour = extract("hour", Log.dttm)
+        views: Dict[int, int] = defaultdict(int)
+        for chart_id, _, count in (
+            query.add_columns(hour, func.count(Log.slice_id))
+            .filter(Log.slice_id.in_(list(total_views)), hour.in_(hours))
+            .group_by(Log.slice_id, hour)
+        ):
+            views[chart_id] += count
+
+        chart_ids = sorted(
+            (chart_id for chart_id, count in views.items() if count >= self.min_views),
+            key=lambda chart_id: (views[chart_id], total_views[chart_id]),
+            reverse=True,
+        )
+        return chart_ids[: self.top_n]
+
+    def get_expiration(self, chart: Slice) -> Optional[datetime]:
+        """
+        Return when the cached data of a chart expires, in UTC.
+
+        :param chart: The chart
+        :returns: The expiration of the data, None if it is not cached
+        """
+        viz_obj = get_viz(chart.form_data, chart.datasource_type, chart.datasource_id)
+        cache_key = get_cache_key(viz_obj)
+        if not cache_key or not cache_manager.data_cache.has(cache_key):
+            return None
+
+        if app.config["STORE_CACHE_KEYS_IN_METADATA_DB"]:
+            record = (
+                db.session.query(CacheKey)
+                .filter_by(cache_key=cache_key)
+                .order_by(CacheKey.created_on.desc())
+                .first()
+            )
+            if record and record.created_on:
+                # the records are created in local time
+                cached_on = record.created_on - (datetime.now() - datetime.utcnow())
+                timeout = record.cache_timeout or viz_obj.cache_timeout
+                return cached_on + timedelta(seconds=timeout)
+
+        value = cache_manager.get_data(cache_key, viz_obj.datasource.uid)
+        if not value or not value.get("dttm"):
+            return None
+        cached_on = datetime.strptime(value["dttm"], "%Y-%m-%dT%H:%M:%S")
+        return cached_on + timedelta(seconds=viz_obj.cache_timeout)
+
+    def get_charts(self) -> List[Tuple[Slice, Optional[Dict[str, Any]]]]:
+        now = datetime.utcnow()
+        chart_ids = self.get_hot_chart_ids(now)
+        charts = {
+            chart.id: chart
+            for chart in db.session.query(Slice).filter(Slice.id.in_(chart_ids))
+        }
+
+        self.stats = {"hot": 0, "fresh": 0, "prevented_misses": 0, "misses": 0}
+        expiring_charts: List[Tuple[Slice, Optional[Dict[str, Any]]]] = []
+        for chart_id in chart_ids:
+            chart = charts.get(chart_id)
+            if not chart or not chart.datasource:
+                continue
+            self.stats["hot"] += 1
+            try:
+                expiration = self.get_expiration(chart)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Error reading the cache of chart %i", chart_id)
+                continue
+            if expiration is None or expiration <= now:
+                self.stats["misses"] += 1
+            elif expiration <= now + self.lead_time:
+                self.stats["prevented_misses"] += 1
+            else:
+                self.stats["fresh"] += 1
+                continue
+            expiring_charts.append((chart, None))
+
+        stats_logger = app.config["STATS_LOGGER"]
+        for stat, count in self.stats.items():
+            stats_logger.gauge(f"cache_warmup.{self.name}.{stat}", count)
+        return expiring_charts
+
+
+strategies = [
+    DummyStrategy,
+    TopNDashboardsStrategy,
+    DashboardTagsStrategy,
+    PredictiveRefreshStrategy,
+]
+
+
+def get_cache_key(viz_obj: BaseViz) -> Optional[str]:
+    """Return the data cache key of the main query of a viz"""
+    query_obj = viz_obj.query_obj()
+    return viz_obj.cache_key(query_obj) if query_obj else None
+
+
+def warm_up_chart(
+    chart_id: int,
+    form_data: Dict[str, Any],
+    datasource_type: str,
+    datasource_id: int,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Compute and cache the data of a chart, unless it is already cached.
+
+    :param chart_id: The id of the chart
+    :param form_data: The `form_data` of the chart
+    :param datasource_type: The type of the datasource of the chart
+    :param datasource_id: The id of the datasource of the chart
+    :param force: Whether to compute the data even when it is cached
+    :returns: The report of the warm up of the chart, with its status, duration,
+        number of rows and size in the cache
+    """
+    report: Dict[str, Any] = {"chart_id": chart_id}
+    start = time.perf_counter()
+    try:
+        viz_obj = get_viz(form_data, datasource_type, datasource_id, force=force)
+        cache_key = get_cache_key(viz_obj)
+        report["cache_key"] = cache_key
+        if not force and cache_key and cache_manager.data_cache.has(cache_key):
+            report["status"] = "cached"
+        else:
+            g.form_data = form_data
+            viz_obj.run_extra_queries()
+            payload = viz_obj.get_df_payload()
+            report["status"] = payload["status"]
+            report["rows"] = payload["rowcount"]
+            if payload["errors"]:
+                report["error"] = payload["errors"]
+            value = (
+                cache_manager.data_cache.get(cache_key)
+                if cache_key and payload["status"] != QueryStatus.FAILED
+                else None
+            )
+            if isinstance(value, bytes):
+                report["cache_size"] = len(value)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.exception("Error warming up the cache of chart %i", chart_id)
+        report["status"] = QueryStatus.FAILED
+        report["error"] = error_msg_from_exception(ex)
+    report["duration_ms"] = round((time.perf_counter() - start) * 1000)
+    return report
+
+
+def warm_up_charts(
+    charts: List[Tuple[Slice, Optional[Dict[str, Any]]]], force: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Warm up the cache of charts in process, running up to
+    ``CACHE_WARMUP_CONCURRENCY`` of them concurrently, and at most
+    ``CACHE_WARMUP_MAX_CONCURRENT_QUERIES_PER_DATABASE`` of them per database.
+
+    :param charts: The charts with the `form_data` overriding theirs
+    :param force: Whether to compute the data of the charts even when it is cached
+    :returns: The reports of the warm up of the charts
+    """
+    limit = app.config["CACHE_WARMUP_MAX_CONCURRENT_QUERIES_PER_DATABASE"]
+    semaphores: Dict[Optional[int], threading.BoundedSemaphore] = {}
+    tasks: List[Callable[[], Dict[str, Any]]] = []
+    keys = set()
+    for chart, overrides in charts:
+        form_data = {**chart.form_data, **(overrides or {}), "slice_id": chart.id}
+        key = json.dumps(form_data, sort_keys=True, default=str)
+        if key in keys or not chart.datasource:
+            continue
+        keys.add(key)
+
+        database_id = get_database_id(chart.datasource)
+        if database_id not in semaphores:
+            semaphores[database_id] = threading.BoundedSemaphore(limit or len(charts))
+        tasks.append(
+            partial(
+                _warm_up_chart_in_slot,
+                semaphores[database_id],
+                chart.id,
+                form_data,
+                chart.datasource_type,
+                chart.datasource_id,
+                force,
+            )
+        )
+
+    with app.test_request_context():
+        return run_concurrently(tasks, app.config["CACHE_WARMUP_CONCURRENCY"])
+
+
+def _warm_up_chart_in_slot(
+    semaphore: threading.BoundedSemaphore, *args: Any
+) -> Dict[str, Any]:
+    with semaphore:
+        return warm_up_chart(*args)
 
 
 @celery_app.task(name="cache-warmup")
 def cache_warmup(
     strategy_name: str, *args: Any, **kwargs: Any
-) -> Union[Dict[str, List[str]], str]:
+) -> Union[Dict[str, Any], str]:
     """
     Warm up cache.
 
-    This task periodically hits charts to warm up the cache.
+    This task periodically computes the data of charts to warm up the cache, or
+    hits their URLs for strategies which only provide them.
 
     """
     logger.info("Loading strategy")
@@ -268,7 +559,22 @@ def cache_warmup(
         logger.exception(message)
         return message
 
-    results: Dict[str, List[str]] = {"success": [], "errors": []}
+    results: Dict[str, Any] = {"success": [], "errors": []}
+    try:
+        charts = strategy.get_charts()
+    except NotImplementedError:
+        charts = None
+    if charts is not None:
+        for report in warm_up_charts(charts, force=strategy.force_refresh):
+            logger.info("Warmed up %s", report)
+            if report["status"] == QueryStatus.FAILED:
+                results["errors"].append(report)
+            else:
+                results["success"].append(report)
+        if strategy.stats:
+            results["stats"] = strategy.stats
+        return results
+
     for url in strategy.get_urls():
         try:
             logger.info("Fetching %s", url)
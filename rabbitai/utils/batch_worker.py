@@ -0,0 +1,113 @@
+"""Batching of items processed off the requests, from a background thread.
+
+The items are queued in a bounded queue and processed in batches by a thread
+started once per process, the forked processes starting their own thread. The
+items still queued when the process exits are processed before it does.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from queue import Empty, Full, Queue
+from typing import Callable, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BatchWorker(Generic[T]):
+    """
+    Process items in batches from a background thread.
+
+    The items are processed when ``batch_size`` of them are queued, or
+    ``flush_interval`` seconds after the first of them was. When
+    ``max_queue_size`` items are queued, e.g. because their processing is slow,
+    new items are dropped.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        process_batch: Callable[[List[T]], None],
+        name: str,
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+    ) -> None:
+        self.process_batch = process_batch
+        self.name = name
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "Queue[T]" = Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    def put(self, item: T) -> bool:
+        """
+        Queue an item, starting the thread processing the items if needed.
+
+        :param item: The item
+        :returns: Whether the item was queued, or dropped as the queue is full
+        """
+        self.start()
+        try:
+            self._queue.put_nowait(item)
+        except Full:
+            return False
+        return True
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Start the thread processing the items of the process, once"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is None:
+                atexit.register(self.flush)
+            # forked processes inherit the queued items but not the thread
+            self._queue = Queue(maxsize=self.max_queue_size)
+            threading.Thread(target=self._run, name=self.name, daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            self._process(self._get_batch())
+
+    def _get_batch(self) -> List[T]:
+        """Wait for a batch of items"""
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(items) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=timeout))
+            except Empty:
+                break
+        return items
+
+    def _process(self, items: List[T]) -> None:
+        try:
+            self.process_batch(items)
+        except Exception as ex:  # pylint: disable=broad-except
+            # the thread keeps processing the next batches
+            logger.warning("%s failed to process %i items", self.name, len(items))
+            logger.exception(ex)
+
+    def flush(self) -> None:
+        """Process the queued items, e.g. before the process exits"""
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except Empty:
+                break
+        for i in range(0, len(items), self.batch_size):
+            self._process(items[i : i + self.batch_size])
@@ -1,19 +1,24 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, Union
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
 
 from flask import current_app as app, request
 from flask_caching import Cache
 from werkzeug.wrappers import ETagResponseMixin  # .etag
 
 from rabbitai import db
-from rabbitai.extensions import cache_manager
+from rabbitai.extensions import cache_key_index, cache_manager
 from rabbitai.models.cache import CacheKey
 from rabbitai.stats_logger import BaseStatsLogger
 from rabbitai.utils.core import json_int_dttm_ser
+from rabbitai.utils.dates import now_as_float
 from rabbitai.utils.hashing import md5_sha_from_dict
 
 config = app.config
@@ -37,8 +42,34 @@ def set_and_log_cache(
     try:
         dttm = datetime.utcnow().isoformat().split(".")[0]
         value = {**cache_value, "dttm": dttm}
-        cache_instance.set(cache_key, value, timeout=timeout)
+        is_data_cache = cache_instance is cache_manager.data_cache
+        stored_value = (
+            cache_manager.data_codec.encode(value) if is_data_cache else value
+        )
+        if isinstance(stored_value, bytes):
+            if datasource_uid:
+                stats_logger.gauge(
+                    f"data_cache.value_size.{datasource_uid}", len(stored_value)
+                )
+            max_size = config["DATA_CACHE_MAX_VALUE_SIZE"]
+            if max_size and len(stored_value) > max_size:
+                stats_logger.incr("set_cache_key.too_large")
+                logger.warning(
+                    "Not caching key %s, its value is too large (%i bytes)",
+                    cache_key,
+                    len(stored_value),
+                )
+                return
+        if cache_instance.set(cache_key, stored_value, timeout=timeout) is False:
+            # e.g. Memcached refuses values larger than its item size limit
+            stats_logger.incr("set_cache_key.failed")
+            logger.warning("Could not cache key %s", cache_key)
+            return
         stats_logger.incr("set_cache_key")
+        if is_data_cache:
+            cache_manager.set_local_data(cache_key, value, datasource_uid)
+            if datasource_uid:
+                cache_key_index.register(cache_key, datasource_uid, timeout)
 
         if datasource_uid and config["STORE_CACHE_KEYS_IN_METADATA_DB"]:
             ck = CacheKey(
@@ -50,10 +81,116 @@ def set_and_log_cache(
     except Exception as ex:
         # cache.set call can fail if the backend is down or if
         # the key is too large or whatever other reasons
+        stats_logger.incr("set_cache_key.failed")
         logger.warning("Could not cache key %s", cache_key)
         logger.exception(ex)
 
 
+# in-process locks of the cache keys being computed, with their number of users
+_single_flight_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+_single_flight_guard = threading.Lock()
+
+
+@contextmanager
+def _local_lock(cache_key: str) -> Iterator[threading.Lock]:
+    with _single_flight_guard:
+        lock, users = _single_flight_locks.get(cache_key, (threading.Lock(), 0))
+        _single_flight_locks[cache_key] = (lock, users + 1)
+    try:
+        yield lock
+    finally:
+        with _single_flight_guard:
+            lock, users = _single_flight_locks[cache_key]
+            if users == 1:
+                del _single_flight_locks[cache_key]
+            else:
+                _single_flight_locks[cache_key] = (lock, users - 1)
+
+
+@contextmanager
+def single_flight(  # pylint: disable=too-many-branches
+    cache_instance: Cache, cache_key: str
+) -> Iterator[Optional[Dict[str, Any]]]:
+    """
+    Coalesce concurrent computations of the same cache key.
+
+    Only one request at a time computes a given key: requests of the same process
+    are serialized by an in-process lock, and requests of different processes by a
+    lock stored in the cache backend. Requests that had to wait re-read the cache
+    and get the value computed by the request that held the lock.
+
+    Yields the cached value when it was computed by a concurrent request, otherwise
+    ``None``, in which case the caller is expected to compute the value and cache
+    it before leaving the context. When waiting for the lock times out, ``None`` is
+    yielded as well and the value is computed without coordination.
+
+    :param cache_instance: the cache holding the values and the locks
+    :param cache_key: the cache key of the value being computed
+    """
+    if not config["DATA_CACHE_SINGLE_FLIGHT"]:
+        yield None
+        return
+
+    wait_timeout = config["DATA_CACHE_SINGLE_FLIGHT_WAIT_TIMEOUT"]
+    poll_interval = config["DATA_CACHE_SINGLE_FLIGHT_POLL_INTERVAL"]
+    deadline = time.monotonic() + wait_timeout
+    start = now_as_float()
+    lock_key = f"{cache_key}__lock"
+    token = uuid.uuid4().hex
+    lock_timeout = config["DATA_CACHE_SINGLE_FLIGHT_LOCK_TIMEOUT"]
+    value: Optional[Dict[str, Any]] = None
+    waited = held = False
+
+    with _local_lock(cache_key) as local_lock:
+        locked = local_lock.acquire(blocking=False)
+        if not locked:
+            waited = True
+            stats_logger.incr("single_flight.contended")
+            locked = local_lock.acquire(timeout=wait_timeout)
+        try:
+            try:
+                if waited:
+                    value = cache_manager.data_codec.decode(
+                        cache_instance.get(cache_key)
+                    )
+                if not value:
+                    held = cache_instance.add(lock_key, token, timeout=lock_timeout)
+                    while not held and not value and time.monotonic() < deadline:
+                        if not waited:
+                            waited = True
+                            stats_logger.incr("single_flight.contended")
+                        time.sleep(poll_interval)
+                        value = cache_manager.data_codec.decode(
+                            cache_instance.get(cache_key)
+                        )
+                        if not value:
+                            held = cache_instance.add(
+                                lock_key, token, timeout=lock_timeout
+                            )
+            except Exception as ex:  # pylint: disable=broad-except
+                # the cache backend is down, compute the value without coordination
+                logger.warning("Could not lock cache key %s", cache_key)
+                logger.exception(ex)
+
+            if waited:
+                stats_logger.timing("single_flight.wait_time", now_as_float() - start)
+                if value:
+                    stats_logger.incr("single_flight.coalesced")
+                elif not held:
+                    stats_logger.incr("single_flight.wait_timeout")
+            yield value or None
+        finally:
+            if held:
+                try:
+                    if cache_instance.get(lock_key) == token:
+                        cache_instance.delete(lock_key)
+                except Exception as ex:  # pylint: disable=broad-except
+                    logger.warning("Could not unlock cache key %s", cache_key)
+                    logger.exception(ex)
+            if locked:
+                local_lock.release()
+
+
 # If a user sets `max_age` to 0, for long the browser should cache the
 # resource? Flask-Caching will cache forever, but for the HTTP header we need
 # to specify a "far future" date.
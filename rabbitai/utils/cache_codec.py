@@ -0,0 +1,109 @@
+"""Codecs of the values stored in the data cache.
+
+By default the values are pickled by Flask-Caching. `ArrowDataCacheCodec` stores
+the DataFrames of a value as Arrow IPC streams instead, which are faster to
+serialize and, when compressed, much smaller than pickled DataFrames.
+"""
+import logging
+import pickle
+import struct
+from typing import Any, Dict, List
+
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+
+class DataCacheCodec:  # pylint: disable=no-self-use
+    """
+    Base codec, storing the values as they are. Codecs must be able to decode the
+    values they didn't encode, as returned by the cache, unchanged.
+    """
+
+    def encode(self, value: Dict[str, Any]) -> Any:
+        return value
+
+    def decode(self, value: Any) -> Any:
+        return value
+
+
+class ArrowDataCacheCodec(DataCacheCodec):
+    """
+    Store the DataFrames of a cached value as Arrow IPC streams.
+
+    The encoded value is made of a header holding the pickled value without its
+    DataFrames, followed by one IPC stream per DataFrame. Values whose DataFrames
+    can't be converted to Arrow (e.g. mixed type columns) are stored unchanged.
+    """
+
+    magic = b"RBAC1:"
+    # length of the header or of a stream
+    length_format = ">Q"
+
+    def __init__(self, compression: Any = "zstd") -> None:
+        """
+        :param compression: IPC buffer compression codec (``lz4``, ``zstd`` or
+            ``None``); uncompressed streams are read without copying the buffers
+        """
+        self.options = pa.ipc.IpcWriteOptions(compression=compression)
+
+    def _pack(self, data: bytes) -> List[bytes]:
+        return [struct.pack(self.length_format, len(data)), data]
+
+    def encode(self, value: Dict[str, Any]) -> Any:
+        frame_keys = [
+            key for key, item in value.items() if isinstance(item, pd.DataFrame)
+        ]
+        if not frame_keys:
+            return value
+
+        streams: List[bytes] = []
+        try:
+            for key in frame_keys:
+                df = value[key]
+                if not all(isinstance(column, str) for column in df.columns):
+                    # Arrow only supports string field names
+                    return value
+                table = pa.Table.from_pandas(df, preserve_index=True)
+                sink = pa.BufferOutputStream()
+                with pa.ipc.new_stream(
+                    sink, table.schema, options=self.options
+                ) as writer:
+                    writer.write_table(table)
+                streams.append(sink.getvalue().to_pybytes())
+        except (pa.ArrowException, TypeError, ValueError) as ex:
+            logger.debug("Could not encode cache value with Arrow: %s", ex)
+            return value
+
+        header = pickle.dumps(
+            (
+                {key: item for key, item in value.items() if key not in frame_keys},
+                frame_keys,
+            )
+        )
+        chunks = [self.magic, *self._pack(header)]
+        for stream in streams:
+            chunks.extend(self._pack(stream))
+        return b"".join(chunks)
+
+    def decode(self, value: Any) -> Any:
+        if not isinstance(value, bytes) or not value.startswith(self.magic):
+            return value
+
+        buffer = pa.py_buffer(value)
+        length_size = struct.calcsize(self.length_format)
+        offset = len(self.magic)
+
+        def read_chunk() -> pa.Buffer:
+            nonlocal offset
+            (length,) = struct.unpack_from(self.length_format, value, offset)
+            offset += length_size + length
+            return buffer.slice(offset - length, length)
+
+        decoded, frame_keys = pickle.loads(read_chunk())
+        for key in frame_keys:
+            table = pa.ipc.open_stream(read_chunk()).read_all()
+            # as `RabbitaiResultSet.to_pandas_df`, nullable integers are objects
+            decoded[key] = table.to_pandas(integer_object_nulls=True)
+        return decoded
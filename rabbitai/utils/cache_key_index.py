@@ -0,0 +1,160 @@
+"""Index of the data cache keys of each datasource, kept in the Redis data cache.
+
+The keys cached for a datasource are members of a Redis set, which expires with
+the longest lived of them, so that they can all be deleted at once when the
+datasource is invalidated, without a lookup in the metadata database. Keys are
+added to the index in batches from a background thread, off the requests caching
+the data.
+"""
+import logging
+from typing import Any, Iterable, List, Optional, Tuple
+
+from flask import Flask
+
+from rabbitai.stats_logger import BaseStatsLogger
+from rabbitai.utils.batch_worker import BatchWorker
+
+logger = logging.getLogger(__name__)
+
+# add keys (ARGV) to sets (KEYS), extending the sets to live as long as the keys
+_REGISTER_SCRIPT = """
+for i, set_key in ipairs(KEYS) do
+    local timeout = tonumber(ARGV[2 * i])
+    local existed = redis.call('EXISTS', set_key)
+    local ttl = redis.call('TTL', set_key)
+    redis.call('SADD', set_key, ARGV[2 * i - 1])
+    if timeout <= 0 then
+        redis.call('PERSIST', set_key)
+    elseif existed == 0 or (ttl >= 0 and ttl < timeout) then
+        redis.call('EXPIRE', set_key, timeout)
+    end
+end
+"""
+
+# delete the sets (KEYS) and their members, returning the number of members
+_INVALIDATE_SCRIPT = """
+local count = 0
+for _, set_key in ipairs(KEYS) do
+    local keys = redis.call('SMEMBERS', set_key)
+    for i = 1, #keys, 1000 do
+        redis.call('DEL', unpack(keys, i, math.min(i + 999, #keys)))
+    end
+    count = count + #keys
+    redis.call('DEL', set_key)
+end
+return count
+"""
+
+
+def _is_cluster_client(client: Any) -> bool:
+    """
+    Return True if the client is a Redis Cluster client, of redis-py or
+    redis-py-cluster, False otherwise.
+
+    :param client: The Redis client
+    :returns: Whether the client is a Redis Cluster client
+    """
+    return any(cls.__name__ == "RedisCluster" for cls in type(client).__mro__)
+
+
+class CacheKeyIndex:
+    """
+    Index of the data cache keys of each datasource.
+
+    The index is enabled with ``DATA_CACHE_KEY_INDEX`` when the data cache is a
+    Redis cache. A Redis Cluster isn't supported: the scripts access the sets of
+    many datasources and their keys, which are in different hash slots. Keys are queued and added to the index when
+    ``DATA_CACHE_KEY_INDEX_BATCH_SIZE`` of them are queued, or
+    ``DATA_CACHE_KEY_INDEX_FLUSH_INTERVAL`` seconds after the first of them was.
+    Keys registered while the queue is full are dropped, they are not invalidated
+    with their datasource but still expire.
+    """
+
+    max_queue_size = 100000
+
+    def __init__(self) -> None:
+        self._client: Any = None
+        self._prefix = ""
+        self._stats_logger: Optional[BaseStatsLogger] = None
+        self._worker: "BatchWorker[Tuple[str, str, int]]" = BatchWorker(
+            self._write,
+            name="cache-key-index",
+            max_queue_size=self.max_queue_size,
+            batch_size=500,
+            flush_interval=1.0,
+        )
+
+    def init_app(self, app: Flask, data_cache_backend: Any) -> None:
+        """
+        Enable the index when configured and when the data cache is a Redis cache,
+        other than a Redis Cluster.
+
+        :param app: The Flask application
+        :param data_cache_backend: The backend of the data cache
+        """
+        self._client = None
+        client = getattr(data_cache_backend, "_write_client", None)
+        if not app.config["DATA_CACHE_KEY_INDEX"]:
+            return
+        if client is None or not hasattr(client, "register_script"):
+            logger.warning("The data cache key index requires a Redis data cache")
+            return
+        if _is_cluster_client(client):
+            logger.warning("The data cache key index doesn't support Redis Cluster")
+            return
+
+        prefix = getattr(data_cache_backend, "key_prefix", "") or ""
+        self._prefix = prefix if isinstance(prefix, str) else prefix()
+        self._worker.batch_size = app.config["DATA_CACHE_KEY_INDEX_BATCH_SIZE"]
+        self._worker.flush_interval = app.config["DATA_CACHE_KEY_INDEX_FLUSH_INTERVAL"]
+        self._stats_logger = app.config["STATS_LOGGER"]
+        self._register = client.register_script(_REGISTER_SCRIPT)
+        self._invalidate = client.register_script(_INVALIDATE_SCRIPT)
+        self._client = client
+
+    @property
+    def enabled(self) -> bool:
+        return self._client is not None
+
+    def _get_set_key(self, datasource_uid: str) -> str:
+        return f"{self._prefix}cache_keys_{datasource_uid}"
+
+    def register(self, cache_key: str, datasource_uid: str, timeout: int) -> None:
+        """
+        Add a data cache key to the index of its datasource, in the background.
+
+        :param cache_key: The data cache key
+        :param datasource_uid: The uid of the datasource of the cached data
+        :param timeout: The number of seconds the data is cached for
+        """
+        if not self.enabled:
+            return
+        entry = (self._get_set_key(datasource_uid), self._prefix + cache_key, timeout)
+        if not self._worker.put(entry) and self._stats_logger:
+            self._stats_logger.incr("cache_key_index.dropped")
+
+    def _write(self, entries: List[Tuple[str, str, int]]) -> None:
+        args: List[Any] = []
+        for _, cache_key, timeout in entries:
+            args.extend((cache_key, timeout))
+        try:
+            self._register(keys=[entry[0] for entry in entries], args=args)
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning("Could not index %i data cache keys", len(entries))
+            logger.exception(ex)
+
+    def flush(self) -> None:
+        """Add the queued keys to the index"""
+        self._worker.flush()
+
+    def invalidate(self, datasource_uids: Iterable[str]) -> int:
+        """
+        Delete the cached data of datasources, in one round trip.
+
+        :param datasource_uids: The uids of the datasources
+        :returns: The number of deleted keys, including the expired ones
+        """
+        set_keys = [self._get_set_key(uid) for uid in datasource_uids]
+        if not self.enabled or not set_keys:
+            return 0
+        return int(self._invalidate(keys=set_keys))
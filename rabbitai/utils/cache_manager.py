@@ -1,8 +1,151 @@
 # -*- coding: utf-8 -*-
 
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
 from flask import Flask
 from flask_caching import Cache
 
+from rabbitai.stats_logger import BaseStatsLogger
+from rabbitai.utils.cache_codec import DataCacheCodec
+
+
+def _get_value_size(value: Any) -> int:
+    """
+    估算缓存值占用的内存字节数，数据帧按其深度内存占用计算。
+
+    :param value: 缓存值。
+    :return: 字节数。
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _get_value_size(item) for item in value.values()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_get_value_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _copy_value(value: Any) -> Any:
+    """复制缓存值中的数据帧，避免调用者修改进程内缓存的数据。"""
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, dict):
+        return {key: _copy_value(item) for key, item in value.items()}
+    return value
+
+
+class LocalDataCache:
+    """
+    进程内数据缓存，按字节数限制大小的最近最少使用（LRU）缓存，位于数据缓存之前，
+    避免同一工作进程重复从数据缓存读取和反序列化相同的数据帧。
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        timeout: int,
+        stats_logger: Optional[BaseStatsLogger] = None,
+    ) -> None:
+        """
+        :param max_bytes: 缓存值占用的最大字节数。
+        :param timeout: 缓存值的过期时间（秒）。
+        :param stats_logger: 统计日志记录器，记录命中、未命中和逐出次数。
+        """
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.stats_logger = stats_logger
+        self.size = 0
+        # cache key -> (value, size, expiration time, datasource uid)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float, Optional[str]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.RLock()
+
+    def _incr(self, key: str) -> None:
+        if self.stats_logger:
+            self.stats_logger.incr(f"local_data_cache.{key}")
+
+    def _pop(self, key: str) -> None:
+        _, size, _, _ = self._entries.pop(key)
+        self.size -= size
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        获取缓存值的副本，不存在或已过期时返回 `None`。
+
+        :param key: 缓存键。
+        :return:
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] < time.monotonic():
+                self._pop(key)
+                entry = None
+            if entry is None:
+                self._incr("miss")
+                return None
+            self._entries.move_to_end(key)
+            self._incr("hit")
+            value = entry[0]
+        return _copy_value(value)
+
+    def set(self, key: str, value: Any, datasource_uid: Optional[str] = None) -> bool:
+        """
+        设置缓存值，按最近最少使用的顺序逐出其它缓存值直到总大小不超过限制。
+
+        :param key: 缓存键。
+        :param value: 缓存值。
+        :param datasource_uid: 缓存值所属数据源的唯一标识，用于按数据源失效。
+        :return: 缓存值大于缓存总大小限制时返回 `False`。
+        """
+        size = _get_value_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            if size > self.max_bytes:
+                return False
+            while self._entries and self.size + size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self._incr("eviction")
+            self._entries[key] = (
+                _copy_value(value),
+                size,
+                time.monotonic() + self.timeout,
+                datasource_uid,
+            )
+            self.size += size
+            if self.stats_logger:
+                self.stats_logger.gauge("local_data_cache.bytes", self.size)
+        return True
+
+    def delete(self, key: str) -> None:
+        """删除缓存值。"""
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+
+    def delete_datasources(self, datasource_uids: Iterable[str]) -> None:
+        """删除给定数据源的全部缓存值。"""
+        uids = set(datasource_uids)
+        with self._lock:
+            for key in [
+                key for key, entry in self._entries.items() if entry[3] in uids
+            ]:
+                self._pop(key)
+
+    def clear(self) -> None:
+        """删除全部缓存值。"""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
 
 class CacheManager:
     """缓存管理器，依据Flask应用配置信息，创建缓存、数据缓存、THUMBNAIL缓存。"""
@@ -13,6 +156,8 @@ class CacheManager:
         self._cache = Cache()
         self._data_cache = Cache()
         self._thumbnail_cache = Cache()
+        self._local_data_cache: Optional[LocalDataCache] = None
+        self._data_codec = DataCacheCodec()
 
     def init_app(self, app: Flask) -> None:
         """
@@ -43,11 +188,29 @@ class CacheManager:
                 **app.config["THUMBNAIL_CACHE_CONFIG"],
             },
         )
+        self._local_data_cache = (
+            LocalDataCache(
+                app.config["DATA_CACHE_LOCAL_MAX_BYTES"],
+                app.config["DATA_CACHE_LOCAL_TIMEOUT"],
+                app.config["STATS_LOGGER"],
+            )
+            if app.config["DATA_CACHE_LOCAL_MAX_BYTES"]
+            else None
+        )
+        self._data_codec = app.config["DATA_CACHE_CODEC"] or DataCacheCodec()
 
     @property
     def data_cache(self) -> Cache:
         return self._data_cache
 
+    @property
+    def local_data_cache(self) -> Optional[LocalDataCache]:
+        return self._local_data_cache
+
+    @property
+    def data_codec(self) -> DataCacheCodec:
+        return self._data_codec
+
     @property
     def cache(self) -> Cache:
         return self._cache
@@ -55,3 +218,46 @@ class CacheManager:
     @property
     def thumbnail_cache(self) -> Cache:
         return self._thumbnail_cache
+
+    def get_data(
+        self, key: str, datasource_uid: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        从数据缓存获取缓存值，先查找进程内数据缓存，未命中时再查找数据缓存，
+        并将找到的缓存值存入进程内数据缓存。
+
+        :param key: 缓存键。
+        :param datasource_uid: 缓存值所属数据源的唯一标识。
+        :return:
+        """
+        if self._local_data_cache:
+            value = self._local_data_cache.get(key)
+            if value is not None:
+                return value
+        value = self._data_codec.decode(self._data_cache.get(key))
+        if value and self._local_data_cache:
+            self._local_data_cache.set(key, value, datasource_uid)
+        return value
+
+    def set_local_data(
+        self, key: str, value: Any, datasource_uid: Optional[str] = None
+    ) -> None:
+        """将已存入数据缓存的缓存值存入进程内数据缓存。"""
+        if self._local_data_cache:
+            self._local_data_cache.set(key, value, datasource_uid)
+
+    def delete_local_data(
+        self, key: Optional[str] = None, datasource_uids: Iterable[str] = (),
+    ) -> None:
+        """
+        从进程内数据缓存删除给定缓存键或给定数据源的缓存值。
+
+        :param key: 缓存键。
+        :param datasource_uids: 数据源唯一标识列表。
+        :return:
+        """
+        if self._local_data_cache:
+            if key:
+                self._local_data_cache.delete(key)
+            if datasource_uids:
+                self._local_data_cache.delete_datasources(datasource_uids)
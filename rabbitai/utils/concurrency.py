@@ -0,0 +1,228 @@
+"""Helpers to run the independent parts of a request concurrently.
+
+The tasks run in worker threads with a copy of the request context, or a new
+application context outside of requests, as the user of the request. Each task
+uses its own database session, committed once the task is done: the objects loaded
+by the request must be attached to it with `attach_to_thread_session` before being
+used by the task.
+
+The tasks running concurrently may run tasks concurrently themselves, e.g. the
+query objects of a query context run the queries of the days of their time range.
+The worker threads of all the levels are taken from the ``max_workers`` threads of
+the outermost level, the nested tasks running one after the other in the thread
+of their parent task when there are none left.
+"""
+import threading
+from concurrent.futures import as_completed, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from flask import _request_ctx_stack, current_app, g, has_request_context
+from sqlalchemy import inspect
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.exc import UnmappedInstanceError
+
+from rabbitai import db
+
+T = TypeVar("T")
+
+_database_semaphores: Dict[int, threading.BoundedSemaphore] = {}
+_database_semaphores_lock = threading.Lock()
+
+# the workers of the tasks the worker threads are running
+_local = threading.local()
+
+
+class _Workers:
+    """The worker threads available to the tasks of a request, at all levels"""
+
+    def __init__(self, available: int) -> None:
+        self._available = available
+        self._lock = threading.Lock()
+
+    def acquire(self, count: int) -> int:
+        with self._lock:
+            acquired = min(count, self._available)
+            self._available -= acquired
+            return acquired
+
+    def release(self, count: int) -> None:
+        with self._lock:
+            self._available += count
+
+
+@contextmanager
+def _acquire_workers(count: int, max_workers: int) -> Iterator[Tuple[int, _Workers]]:
+    """
+    Acquire at most `count` worker threads, from the workers of the running task,
+    or from new workers outside of the tasks. None are acquired if less than 2 are
+    available.
+    """
+    workers: Optional[_Workers] = getattr(_local, "workers", None)
+    if workers is None:
+        workers = _Workers(max_workers)
+    acquired = workers.acquire(min(count, max_workers))
+    if acquired < 2:
+        # the tasks run in the current thread, the worker is left to the others
+        workers.release(acquired)
+        acquired = 0
+    try:
+        yield acquired, workers
+    finally:
+        workers.release(acquired)
+
+
+def _in_current_context(func: Callable[[], T], workers: _Workers) -> Callable[[], T]:
+    """Wrap a function to run in a copy of the current context, as the same user"""
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+    request_ctx = _request_ctx_stack.top.copy() if has_request_context() else None
+    user = getattr(g, "user", None)
+
+    def wrapper() -> T:
+        with request_ctx or app.app_context():
+            if user is not None:
+                g.user = user
+            _local.workers = workers
+            try:
+                result = func()
+                # e.g. the cache keys stored in the metadata database by the task
+                db.session.commit()
+                return result
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                _local.workers = None
+                db.session.remove()
+
+    return wrapper
+
+
+def attach_to_thread_session(instance: T) -> T:
+    """
+    Get an ORM instance loaded by another thread, e.g. by the request running the
+    tasks, attached to the database session of the current thread. The loaded
+    attributes of the instance are copied without querying the database, the
+    others being loaded through the session of the current thread rather than the
+    session of the other thread, which isn't thread safe.
+
+    :param instance: the instance loaded by another thread
+    :return: the instance attached to the session of the current thread
+    """
+    try:
+        owner = object_session(instance)
+    except UnmappedInstanceError:
+        return instance
+    session = db.session()
+    if owner is None or owner is session:
+        return instance
+    instances = session.info.setdefault("thread_instances", {})
+    key = (type(instance), inspect(instance).identity)
+    if key not in instances:
+        instances[key] = session.merge(instance, load=False)
+    return instances[key]
+
+
+def run_concurrently(tasks: Sequence[Callable[[], T]], max_workers: int) -> List[T]:
+    """
+    Run tasks using at most `max_workers` threads and return their results, in
+    order. The first exception raised by a task, in order, is raised once all
+    of them are done.
+
+    With a single task, `max_workers` lower than 2, or less than 2 worker threads
+    left by the outer tasks, the tasks are run one after the other in the current
+    thread.
+
+    :param tasks: the functions to call
+    :param max_workers: maximum number of tasks to run concurrently
+    :return: the results of the tasks
+    """
+    if max_workers < 2 or len(tasks) < 2:
+        return [task() for task in tasks]
+
+    with _acquire_workers(len(tasks), max_workers) as (acquired, workers):
+        if not acquired:
+            return [task() for task in tasks]
+        with ThreadPoolExecutor(max_workers=acquired) as executor:
+            futures = [
+                executor.submit(_in_current_context(task, workers)) for task in tasks
+            ]
+    return [future.result() for future in futures]
+
+
+def iter_concurrently(
+    tasks: Sequence[Callable[[], T]], max_workers: int
+) -> Iterator[Tuple[int, T]]:
+    """
+    Run tasks using at most `max_workers` threads and yield their index and
+    result as soon as each of them is done. Exceptions raised by the tasks are
+    raised by the iterator. The tasks that didn't start yet are cancelled when the
+    iterator is closed.
+
+    :param tasks: the functions to call
+    :param max_workers: maximum number of tasks to run concurrently
+    :return: an iterator of the indexes and results of the tasks
+    """
+    if max_workers < 2 or len(tasks) < 2:
+        for index, task in enumerate(tasks):
+            yield index, task()
+        return
+
+    with _acquire_workers(len(tasks), max_workers) as (acquired, workers):
+        if not acquired:
+            for index, task in enumerate(tasks):
+                yield index, task()
+            return
+
+        with ThreadPoolExecutor(max_workers=acquired) as executor:
+            futures = {
+                executor.submit(_in_current_context(task, workers)): index
+                for index, task in enumerate(tasks)
+            }
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+@contextmanager
+def database_slot(database_id: Optional[int]) -> Iterator[None]:
+    """
+    Wait for one of the ``CHART_DATA_MAX_CONCURRENT_QUERIES_PER_DATABASE`` slots
+    of a database in this process to be free before running a query against it.
+
+    :param database_id: id of the database, there's no limit if `None`
+    """
+    limit: Optional[int] = current_app.config[
+        "CHART_DATA_MAX_CONCURRENT_QUERIES_PER_DATABASE"
+    ]
+    if not limit or database_id is None:
+        yield
+        return
+
+    with _database_semaphores_lock:
+        semaphore = _database_semaphores.get(database_id)
+        if semaphore is None:
+            semaphore = _database_semaphores[database_id] = threading.BoundedSemaphore(
+                limit
+            )
+    with semaphore:
+        yield
+
+
+def get_database_id(datasource: Any) -> Optional[int]:
+    """Get the id of the database of a datasource, `None` if it doesn't have one"""
+    database = getattr(datasource, "database", None)
+    return getattr(database, "id", None)
@@ -17,6 +17,7 @@ import tempfile
 import threading
 import traceback
 import uuid
+import weakref
 import zlib
 from datetime import date, datetime, time, timedelta
 from distutils.util import strtobool
@@ -52,6 +53,7 @@ import bleach
 import markdown as md
 import numpy as np
 import pandas as pd
+import simplejson
 import sqlalchemy as sa
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
@@ -92,6 +94,11 @@ try:
 except ImportError:
     pass
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 if TYPE_CHECKING:
     from rabbitai.connectors.base.models import BaseColumn, BaseDatasource
     from rabbitai.models.core import Database
@@ -153,6 +160,8 @@ class ChartDataResultFormat(str, Enum):
 
     CSV = "csv"
     JSON = "json"
+    # JSON with the data of each query laid out by column
+    COLUMNAR = "columnar"
 
 
 class ChartDataResultType(str, Enum):
@@ -357,7 +366,16 @@ def flasher(msg: str, severity: str = "message") -> None:
             logger.info(msg)
 
 
-class _memoized:
+# the default maximum number of entries of a memoized function
+MEMOIZED_MAX_SIZE = 1024
+
+
+def _is_method(func: Callable[..., Any]) -> bool:
+    code = getattr(func, "__code__", None)
+    return bool(code and code.co_argcount and code.co_varnames[0] in ("self", "cls"))
+
+
+class _memoized:  # pylint: disable=too-many-instance-attributes
     """Decorator that caches a function's return value each time it is called
 
     If called later with the same arguments, the cached value is returned, and
@@ -365,32 +383,131 @@ class _memoized:
 
     Define ``watch`` as a tuple of attribute names if this Decorator
     should account for instance variable changes.
+
+    The cache is bounded: it keeps at most ``max_size`` entries, evicting the
+    least recently used ones, and its entries expire after ``ttl`` seconds when
+    set. The instances of memoized methods are referenced weakly, their entries
+    being dropped once they are garbage collected.
     """
 
     def __init__(
-        self, func: Callable[..., Any], watch: Optional[Tuple[str, ...]] = None
+        self,
+        func: Callable[..., Any],
+        watch: Optional[Tuple[str, ...]] = None,
+        max_size: Optional[int] = MEMOIZED_MAX_SIZE,
+        ttl: Optional[float] = None,
     ) -> None:
         self.func = func
-        self.cache: Dict[Any, Any] = {}
-        self.is_method = False
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        # the values and their expiration times, in least recently used order
+        self.cache: "collections.OrderedDict[Any, Tuple[Any, Optional[float]]]" = (
+            collections.OrderedDict()
+        )
+        self.is_method = _is_method(func)
         self.watch = watch or ()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # the weak reference to each instance and the keys of its entries, by id
+        self._instances: Dict[int, Tuple["weakref.ref[Any]", Set[Any]]] = {}
+        # the ids of the garbage collected instances, their entries to be dropped
+        self._collected: List[Tuple[int, "weakref.ref[Any]"]] = []
+        self._lock = threading.RLock()
+        _memoized_caches.add(self)
 
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
-        key = [args, frozenset(kwargs.items())]
-        if self.is_method:
-            key.append(tuple([getattr(args[0], v, None) for v in self.watch]))
-        key = tuple(key)  # type: ignore
-        if key in self.cache:
-            return self.cache[key]
+        instance = args[0] if self.is_method and args else None
         try:
-            value = self.func(*args, **kwargs)
-            self.cache[key] = value
-            return value
+            key = self._make_key(args, kwargs)
+            hash(key)
         except TypeError:
             # uncachable -- for instance, passing a list as an argument.
             # Better to not cache than to blow up entirely.
             return self.func(*args, **kwargs)
 
+        with self._lock:
+            self._drop_collected()
+            if key in self.cache:
+                value, expires_at = self.cache[key]
+                if expires_at is None or expires_at > default_timer():
+                    self.cache.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._delete(key)
+            self.misses += 1
+
+        value = self.func(*args, **kwargs)
+        with self._lock:
+            self._drop_collected()
+            self._set(key, value, instance)
+        return value
+
+    def _make_key(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        if not (self.is_method and args):
+            return args, frozenset(kwargs.items())
+        instance = args[0]
+        watched = tuple(getattr(instance, v, None) for v in self.watch)
+        # the instances are referenced weakly by their ids when possible
+        owner = id(instance) if hasattr(type(instance), "__weakref__") else instance
+        return owner, args[1:], frozenset(kwargs.items()), watched
+
+    def _set(self, key: Any, value: Any, instance: Any) -> None:
+        expires_at = None if self.ttl is None else default_timer() + self.ttl
+        self.cache[key] = (value, expires_at)
+        self.cache.move_to_end(key)
+        if instance is not None and key[0] == id(instance):
+            if id(instance) not in self._instances:
+                ref = weakref.ref(
+                    instance,
+                    lambda ref, owner=id(instance): self._collected.append(
+                        (owner, ref)
+                    ),
+                )
+                self._instances[id(instance)] = (ref, set())
+            self._instances[id(instance)][1].add(key)
+        while self.max_size is not None and len(self.cache) > self.max_size:
+            self._delete(next(iter(self.cache)))
+            self.evictions += 1
+
+    def _delete(self, key: Any) -> None:
+        del self.cache[key]
+        if self.is_method and key[0] in self._instances:
+            self._instances[key[0]][1].discard(key)
+
+    def _drop_collected(self) -> None:
+        """Drop the entries of the garbage collected instances"""
+        while self._collected:
+            owner, ref = self._collected.pop()
+            if owner in self._instances and self._instances[owner][0] is ref:
+                for key in self._instances.pop(owner)[1]:
+                    del self.cache[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the size and the hit rate of the cache"""
+        with self._lock:
+            self._drop_collected()
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self.cache),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "instances": len(self._instances),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+    def clear(self) -> None:
+        """Drop all the entries of the cache"""
+        with self._lock:
+            self.cache.clear()
+            self._instances.clear()
+            self._collected.clear()
+
     def __repr__(self) -> str:
         """Return the function's docstring."""
         return self.func.__doc__ or ""
@@ -398,26 +515,77 @@ class _memoized:
     def __get__(
         self, obj: Any, objtype: Type[Any]
     ) -> functools.partial:  # type: ignore
+        if obj is None:
+            return self  # type: ignore
         if not self.is_method:
             self.is_method = True
         # Support instance methods.
         return functools.partial(self.__call__, obj)
 
 
+# all the memoized functions, for them to be inspected and cleared
+_memoized_caches: "weakref.WeakSet[_memoized]" = weakref.WeakSet()
+
+
 def memoized(
-    func: Optional[Callable[..., Any]] = None, watch: Optional[Tuple[str, ...]] = None
+    func: Optional[Callable[..., Any]] = None,
+    watch: Optional[Tuple[str, ...]] = None,
+    max_size: Optional[int] = MEMOIZED_MAX_SIZE,
+    ttl: Optional[float] = None,
 ) -> Callable[..., Any]:
-    """一个缓存函数返回值的装饰器。"""
+    """
+    一个缓存函数返回值的装饰器。
+
+    :param func: 被装饰的函数。
+    :param watch: 实例方法的缓存需要考虑的实例属性名称。
+    :param max_size: 最多缓存的返回值个数，超出时淘汰最近最少使用的返回值，None 表示不限制。
+    :param ttl: 缓存的返回值的过期秒数，None 表示不过期。
+    :return:
+    """
 
     if func:
-        return _memoized(func)
+        return _memoized(func, max_size=max_size, ttl=ttl)
 
     def wrapper(f: Callable[..., Any]) -> Callable[..., Any]:
-        return _memoized(f, watch)
+        return _memoized(f, watch, max_size=max_size, ttl=ttl)
 
     return wrapper
 
 
+def get_memoized_stats(names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Return the statistics of the caches of the memoized functions.
+
+    :param names: The names of the functions, all of them when not set
+    :returns: The size, the bounds and the hit rate of each cache, by name
+    """
+    names = set(names) if names is not None else None
+    return sorted(
+        (
+            cache.stats()
+            for cache in list(_memoized_caches)
+            if names is None or cache.name in names
+        ),
+        key=lambda stats: stats["name"],
+    )
+
+
+def clear_memoized_caches(names: Optional[Iterable[str]] = None) -> int:
+    """
+    Clear the caches of the memoized functions.
+
+    :param names: The names of the functions, all of them when not set
+    :returns: The number of entries dropped
+    """
+    names = set(names) if names is not None else None
+    count = 0
+    for cache in list(_memoized_caches):
+        if names is None or cache.name in names:
+            count += len(cache.cache)
+            cache.clear()
+    return count
+
+
 def parse_js_uri_path_item(
     item: Optional[str], unquote: bool = True, eval_undefined: bool = False
 ) -> Optional[str]:
@@ -534,6 +702,8 @@ def base_json_conv(obj: Any,) -> Any:
         obj = obj.tobytes()
     if isinstance(obj, np.int64):
         return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
     if isinstance(obj, np.bool_):
         return bool(obj)
     if isinstance(obj, np.ndarray):
@@ -588,6 +758,8 @@ def json_int_dttm_ser(obj: Any) -> float:
     val = base_json_conv(obj)
     if val is not None:
         return val
+    if isinstance(obj, np.datetime64):
+        obj = pd.Timestamp(obj)
     if isinstance(obj, (datetime, pd.Timestamp)):
         obj = datetime_to_epoch(obj)
     elif isinstance(obj, date):
@@ -601,6 +773,34 @@ def json_dumps_w_dates(payload: Dict[Any, Any]) -> str:
     return json.dumps(payload, default=json_int_dttm_ser)
 
 
+def fast_json_dumps(
+    obj: Any,
+    default: Callable[[Any], Any] = json_int_dttm_ser,
+    sort_keys: bool = False,
+) -> str:
+    """
+    Serialize ``obj`` to JSON with NaN serialized as null, using orjson when it is
+    installed and falling back to simplejson otherwise (or when orjson can't
+    serialize the object, e.g. integers wider than 64 bits).
+
+    Dates and numpy values are always handed to ``default``, so that both encoders
+    produce the same output: orjson would serialize the numpy dates as RFC 3339
+    strings.
+    """
+    if orjson is not None:
+        option = (
+            orjson.OPT_NON_STR_KEYS  # pylint: disable=no-member
+            | orjson.OPT_PASSTHROUGH_DATETIME  # pylint: disable=no-member
+        )
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS  # pylint: disable=no-member
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode()
+        except TypeError:
+            pass
+    return simplejson.dumps(obj, default=default, ignore_nan=True, sort_keys=sort_keys)
+
+
 def error_msg_from_exception(ex: Exception) -> str:
     """Translate exception into error message
 
@@ -2,10 +2,11 @@
 
 import re
 import urllib.request
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, Optional
 from urllib.error import URLError
 
 import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
 
 negative_number_re = re.compile(r"^-[0-9.]+$")
 
@@ -43,6 +44,31 @@ def escape_value(value: str) -> str:
     return value
 
 
+def escape_series(series: pd.Series) -> pd.Series:
+    """
+    Vectorized version of `escape_value`, escaping the string values of a column
+    and leaving the other values untouched.
+    """
+    if not (is_object_dtype(series.dtype) or is_string_dtype(series.dtype)):
+        return series
+    try:
+        strings = series.str
+    except AttributeError:
+        # object column without any string value
+        return series
+
+    mask = strings.match(problematic_chars_re.pattern, na=False) & ~strings.match(
+        negative_number_re.pattern, na=False
+    )
+    if not mask.any():
+        return series
+
+    values = series.to_numpy(dtype=object, copy=True)
+    escaped = "'" + series[mask].str.replace("|", "\\|", regex=False)
+    values[mask.to_numpy()] = escaped.to_numpy(dtype=object)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
 def df_to_escaped_csv(df: pd.DataFrame, **kwargs: Any) -> Any:
     escape_values = lambda v: escape_value(v) if isinstance(v, str) else v
 
@@ -50,11 +76,33 @@ def df_to_escaped_csv(df: pd.DataFrame, **kwargs: Any) -> Any:
     df = df.rename(columns=escape_values)
 
     # Escape csv rows
-    df = df.applymap(escape_values)
+    df = df.apply(escape_series)
 
     return df.to_csv(**kwargs)
 
 
+def dfs_to_escaped_csv(dfs: Iterable[pd.DataFrame], **kwargs: Any) -> Iterator[str]:
+    """
+    Encode a sequence of DataFrames sharing the same columns as a single CSV,
+    one chunk per DataFrame, so that the CSV can be streamed without holding all
+    the rows in memory. The header is only written with the first chunk.
+    """
+    header = kwargs.pop("header", True)
+    for df in dfs:
+        yield df_to_escaped_csv(df, header=header, **kwargs)
+        header = False
+
+
+def df_to_escaped_csv_chunks(
+    df: pd.DataFrame, chunk_rows: int = 10000, **kwargs: Any
+) -> Iterator[str]:
+    """Encode a DataFrame as CSV in chunks of at most `chunk_rows` rows"""
+    starts = range(0, max(len(df.index), 1), chunk_rows)
+    return dfs_to_escaped_csv(
+        (df.iloc[start : start + chunk_rows] for start in starts), **kwargs
+    )
+
+
 def get_chart_csv_data(
     chart_url: str, auth_cookies: Optional[Dict[str, str]] = None
 ) -> Optional[bytes]:
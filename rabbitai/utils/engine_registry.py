@@ -0,0 +1,190 @@
+"""Process wide registry of the SQLAlchemy engines of the databases.
+
+Creating an engine initializes its dialect, and with `NullPool` every query also
+opens a new connection. The registry keeps the engines of the most recently used
+(database, effective user, schema, source, connection parameters) combinations
+so that they can be reused, optionally with a connection pool.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from flask import Flask
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import URL
+from sqlalchemy.pool import NullPool, QueuePool
+
+from rabbitai.stats_logger import BaseStatsLogger
+from rabbitai.utils.hashing import md5_sha_from_str
+
+logger = logging.getLogger(__name__)
+
+
+class _TimedPoolMixin:  # pylint: disable=too-few-public-methods
+    """Report the time spent getting a connection from the pool"""
+
+    # set by `EngineRegistry.init_app`
+    stats_logger: Optional[BaseStatsLogger] = None
+
+    def connect(self) -> Any:
+        start = time.perf_counter()
+        connection = super().connect()  # type: ignore
+        if self.stats_logger:
+            self.stats_logger.timing(
+                "engine_pool.checkout_time", (time.perf_counter() - start) * 1000
+            )
+        return connection
+
+
+class TimedNullPool(_TimedPoolMixin, NullPool):
+    pass
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class EngineRegistry:
+    """
+    LRU registry of SQLAlchemy engines.
+
+    Engines are disposed of, closing their pooled connections, when they are
+    evicted, when they have not been used for ``SQLALCHEMY_ENGINE_IDLE_TIMEOUT``
+    seconds or when the database they belong to is invalidated. Engines with
+    checked out connections are never evicted.
+    """
+
+    def __init__(self) -> None:
+        self.max_size = 0
+        self.idle_timeout: Optional[int] = None
+        self.pool_config: Optional[Dict[str, Any]] = None
+        self.stats_logger: Optional[BaseStatsLogger] = None
+        # key -> (engine, database id, last use)
+        self._engines: "OrderedDict[Hashable, Tuple[Engine, Optional[int], float]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.RLock()
+
+    def init_app(self, app: Flask) -> None:
+        self.max_size = app.config["SQLALCHEMY_ENGINE_CACHE_SIZE"]
+        self.idle_timeout = app.config["SQLALCHEMY_ENGINE_IDLE_TIMEOUT"]
+        self.pool_config = app.config["SQLALCHEMY_ENGINE_POOL_CONFIG"]
+        self.stats_logger = app.config["STATS_LOGGER"]
+        _TimedPoolMixin.stats_logger = self.stats_logger
+        self.clear()
+
+    def _incr(self, key: str) -> None:
+        if self.stats_logger:
+            self.stats_logger.incr(key)
+
+    def _create_engine(
+        self, url: URL, params: Dict[str, Any], nullpool: Optional[bool]
+    ) -> Engine:
+        params = params.copy()
+        if nullpool or not self.pool_config:
+            params["poolclass"] = TimedNullPool
+        elif "poolclass" not in params:
+            params = {**self.pool_config, **params, "poolclass": TimedQueuePool}
+        engine = create_engine(url, **params)
+        if isinstance(engine, Engine):
+            # connection churn
+            event.listen(
+                engine, "connect", lambda *args: self._incr("engine_pool.connect")
+            )
+            event.listen(engine, "close", lambda *args: self._incr("engine_pool.close"))
+        return engine
+
+    @staticmethod
+    def _is_idle(engine: Engine) -> bool:
+        checkedout: Optional[Callable[[], int]] = getattr(
+            engine.pool, "checkedout", None
+        )
+        return checkedout is None or checkedout() == 0
+
+    def _dispose(self, key: Hashable) -> None:
+        engine, _, _ = self._engines.pop(key)
+        engine.dispose()
+
+    def _evict(self, now: float) -> None:
+        if self.idle_timeout:
+            for key, (engine, _, last_use) in list(self._engines.items()):
+                if now - last_use > self.idle_timeout and self._is_idle(engine):
+                    self._dispose(key)
+                    self._incr("engine_registry.expired")
+        for key, (engine, _, _) in list(self._engines.items()):
+            if len(self._engines) <= self.max_size:
+                break
+            if self._is_idle(engine):
+                self._dispose(key)
+                self._incr("engine_registry.eviction")
+
+    def get_engine(  # pylint: disable=too-many-arguments
+        self,
+        database_id: Optional[int],
+        url: URL,
+        params: Dict[str, Any],
+        effective_username: Optional[str] = None,
+        schema: Optional[str] = None,
+        source: Optional[Any] = None,
+        nullpool: Optional[bool] = None,
+    ) -> Engine:
+        """
+        Get the engine of a database, creating it if it isn't in the registry.
+
+        :param database_id: id of the database, `None` if it isn't saved yet
+        :param url: URL of the engine
+        :param params: parameters of `create_engine`
+        :param effective_username: the user the connections are made for
+        :param schema: the schema the engine is for
+        :param source: the source of the queries run with the engine
+        :param nullpool: whether to use a `NullPool`, when `None` connections are
+            pooled if ``SQLALCHEMY_ENGINE_POOL_CONFIG`` is set
+        :return: the engine
+        """
+        if not self.max_size or database_id is None:
+            # engines that aren't reused (e.g. of databases being tested before
+            # they are saved) don't pool their connections
+            return self._create_engine(url, params, nullpool=True)
+
+        key = (
+            # engines can't be shared with forked processes
+            os.getpid(),
+            database_id,
+            effective_username,
+            schema,
+            source,
+            bool(nullpool),
+            md5_sha_from_str(f"{url!r}:{url.password}:{sorted(params.items())!r}"),
+        )
+        now = time.monotonic()
+        with self._lock:
+            if key in self._engines:
+                engine = self._engines[key][0]
+                self._engines[key] = (engine, database_id, now)
+                self._engines.move_to_end(key)
+                self._incr("engine_registry.hit")
+                return engine
+
+            self._incr("engine_registry.miss")
+            engine = self._create_engine(url, params, nullpool)
+            self._engines[key] = (engine, database_id, now)
+            self._evict(now)
+            if self.stats_logger:
+                self.stats_logger.gauge("engine_registry.engines", len(self._engines))
+            return engine
+
+    def invalidate(self, database_id: int) -> None:
+        """Dispose of the engines of a database, e.g. after it was changed"""
+        with self._lock:
+            for key, (_, engine_database_id, _) in list(self._engines.items()):
+                if engine_database_id == database_id:
+                    self._dispose(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._engines):
+                self._dispose(key)
@@ -0,0 +1,236 @@
+"""Vectorized geospatial functions.
+
+The counterparts of ``geohash.encode``, ``geohash.decode`` and of the parsing of
+``geopy.point.Point`` applied to whole columns with NumPy operations, instead of
+calling the Python functions row by row:
+
+- geohashes of up to 12 characters fit in 60 bits, their bits are interleaved and
+  deinterleaved with the bit twiddling of Morton codes;
+- geodetic points written as decimal degrees, optionally followed by an altitude
+  and its unit, are parsed with a single regular expression.
+
+The other values, such as longer geohashes or points written in degrees, minutes
+and seconds, are still handled by the ``geohash`` and ``geopy`` functions.
+"""
+import re
+from typing import Any, Tuple
+
+import geohash as geohash_lib
+import numpy as np
+import pandas as pd
+from geopy import units
+from geopy.point import Point
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# the geohashes whose bits fit in a 64 bits integer
+MAX_VECTORIZED_PRECISION = 12
+
+_BASE32_CODES = np.frombuffer(BASE32.encode(), dtype=np.uint8)
+_BASE32_VALUES = np.full(256, 255, dtype=np.uint8)
+_BASE32_VALUES[_BASE32_CODES] = np.arange(32, dtype=np.uint8)
+
+# the shifts and masks spreading the bits of 32 bits integers to the even bits of
+# 64 bits integers, and compacting them back
+_SPREAD_MASKS = [
+    (16, 0x0000FFFF0000FFFF),
+    (8, 0x00FF00FF00FF00FF),
+    (4, 0x0F0F0F0F0F0F0F0F),
+    (2, 0x3333333333333333),
+    (1, 0x5555555555555555),
+]
+_COMPACT_MASKS = [
+    (1, 0x3333333333333333),
+    (2, 0x0F0F0F0F0F0F0F0F),
+    (4, 0x00FF00FF00FF00FF),
+    (8, 0x0000FFFF0000FFFF),
+    (16, 0x00000000FFFFFFFF),
+]
+
+_NUMBER = r"[-+]?\d+(?:\.\d+)?"
+_SEPARATOR = r"\s*[,\s]\s*"
+GEODETIC_PATTERN = re.compile(
+    rf"^\s*(?P<latitude>{_NUMBER}){_SEPARATOR}(?P<longitude>{_NUMBER})"
+    rf"(?:{_SEPARATOR}(?P<altitude>{_NUMBER})\s*(?P<units>km|mi|ft|nmi|nm|m))?\s*$"
+)
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """Spread the bits of 32 bits integers to the even bits of 64 bits integers"""
+    values = values.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in _SPREAD_MASKS:
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+def _compact_bits(values: np.ndarray) -> np.ndarray:
+    """Compact the even bits of 64 bits integers, the inverse of `_spread_bits`"""
+    values = values & np.uint64(0x5555555555555555)
+    for shift, mask in _COMPACT_MASKS:
+        values = (values | (values >> np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+def _split_bits(precision: int) -> Tuple[int, int]:
+    """The number of latitude and longitude bits of geohashes of a precision"""
+    bits = 5 * precision
+    return bits // 2, bits - bits // 2
+
+
+def _decode(geohashes: np.ndarray, precision: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode geohashes of the same length"""
+    chars = np.frombuffer(geohashes.astype(f"S{precision}").tobytes(), np.uint8)
+    values = _BASE32_VALUES[chars].reshape(-1, precision)
+    if (values == 255).any():
+        raise ValueError("Invalid geohash")
+
+    code = np.zeros(len(geohashes), dtype=np.uint64)
+    for i in range(precision):
+        code = (code << np.uint64(5)) | values[:, i].astype(np.uint64)
+    lat_bits, lon_bits = _split_bits(precision)
+    # the longitude bits come first, the last bit is a longitude bit when odd
+    if (lat_bits + lon_bits) % 2:
+        lat, lon = _compact_bits(code >> np.uint64(1)), _compact_bits(code)
+    else:
+        lat, lon = _compact_bits(code), _compact_bits(code >> np.uint64(1))
+
+    def _centers(cells: np.ndarray, bits: int, extent: float) -> np.ndarray:
+        # computed as python-geohash, the numerator being an integer and the
+        # denominator a power of 2
+        numerator = 2 * cells.astype(np.int64) + 1 - (1 << bits)
+        return extent * numerator.astype(np.float64) / (1 << (bits + 1))
+
+    return _centers(lat, lat_bits, 180.0), _centers(lon, lon_bits, 360.0)
+
+
+def geohash_decode(geohashes: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode geohashes into the latitudes and longitudes of the centers of their
+    cells, as `geohash.decode`.
+
+    :param geohashes: The geohashes
+    :returns: The latitudes and the longitudes
+    :raises ValueError: If a geohash is invalid
+    """
+    values = pd.Series(geohashes, dtype=object).to_numpy()
+    latitudes = np.empty(len(values))
+    longitudes = np.empty(len(values))
+    vectorized = np.zeros(len(values), dtype=bool)
+    if pd.api.types.infer_dtype(values, skipna=False) == "string":
+        lengths = pd.Series(values).str.len().to_numpy()
+        vectorized = (lengths > 0) & (lengths <= MAX_VECTORIZED_PRECISION)
+        for length in np.unique(lengths[vectorized]):
+            rows = np.flatnonzero(lengths == length)
+            latitudes[rows], longitudes[rows] = _decode(values[rows], int(length))
+
+    for i in np.flatnonzero(~vectorized):
+        latitudes[i], longitudes[i] = geohash_lib.decode(values[i])
+    return latitudes, longitudes
+
+
+def geohash_encode(
+    latitudes: Any, longitudes: Any, precision: int = MAX_VECTORIZED_PRECISION
+) -> np.ndarray:
+    """
+    Encode latitudes and longitudes into geohashes, as `geohash.encode`.
+
+    :param latitudes: The latitudes, in [-90, 90)
+    :param longitudes: The longitudes, wrapped to [-180, 180)
+    :param precision: The number of characters of the geohashes
+    :returns: The geohashes
+    :raises ValueError: If a latitude or longitude is invalid
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    if not 0 < precision <= MAX_VECTORIZED_PRECISION:
+        return np.array(
+            [
+                geohash_lib.encode(latitude, longitude, precision)
+                for latitude, longitude in zip(latitudes, longitudes)
+            ],
+            dtype=object,
+        )
+    if not (np.isfinite(latitudes).all() and np.isfinite(longitudes).all()):
+        raise ValueError("Invalid latitude or longitude")
+    if ((latitudes < -90) | (latitudes >= 90)).any():
+        raise ValueError("Invalid latitude")
+    outside = (longitudes < -180) | (longitudes >= 180)
+    if outside.any():
+        longitudes = np.where(outside, (longitudes + 180) % 360 - 180, longitudes)
+
+    def _cells(values: np.ndarray, bits: int) -> np.ndarray:
+        # the values are scaled to [-1, 1), the scaling by a power of 2 is exact
+        return (np.floor(np.ldexp(values, bits - 1)) + (1 << (bits - 1))).astype(
+            np.uint64
+        )
+
+    lat_bits, lon_bits = _split_bits(precision)
+    lat = _spread_bits(_cells(latitudes / 90.0, lat_bits))
+    lon = _spread_bits(_cells(longitudes / 180.0, lon_bits))
+    if (lat_bits + lon_bits) % 2:
+        code = (lat << np.uint64(1)) | lon
+    else:
+        code = (lon << np.uint64(1)) | lat
+
+    chars = np.empty((len(code), precision), dtype=np.uint8)
+    for i in range(precision):
+        shift = np.uint64(5 * (precision - 1 - i))
+        chars[:, i] = _BASE32_CODES[(code >> shift) & np.uint64(31)]
+    return chars.view(f"S{precision}").ravel().astype(f"U{precision}").astype(object)
+
+
+def geodetic_parse(
+    points: Any, allow_empty: bool = False
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parse geodetic point strings into their latitudes, longitudes and altitudes
+    in kilometers, as `geopy.point.Point`.
+
+    :param points: The geodetic point strings
+    :param allow_empty: Whether null and empty values are allowed, their
+        coordinates are then NaN
+    :returns: The latitudes, the longitudes and the altitudes
+    :raises ValueError: If a value isn't a geodetic point, the value being the
+        argument of the error
+    """
+    values = pd.Series(points, dtype=object).reset_index(drop=True)
+    try:
+        parts = values.str.extract(GEODETIC_PATTERN)
+    except AttributeError:
+        # there is no string at all
+        parts = pd.DataFrame(
+            index=values.index, columns=list(GEODETIC_PATTERN.groupindex)
+        )
+    latitudes = pd.to_numeric(parts["latitude"]).to_numpy(np.float64, copy=True)
+    longitudes = pd.to_numeric(parts["longitude"]).to_numpy(np.float64, copy=True)
+    altitudes = pd.to_numeric(parts["altitude"]).fillna(0).to_numpy(np.float64)
+    altitude_units = parts["units"].to_numpy()
+    # converted to kilometers as `geopy.units.kilometers` does
+    altitudes = np.select(
+        [
+            altitude_units == "m",
+            altitude_units == "mi",
+            altitude_units == "ft",
+            np.isin(altitude_units, ["nm", "nmi"]),
+        ],
+        [
+            altitudes / 1000.0,
+            altitudes * 1.609344,
+            altitudes / units.ft(1.0),
+            altitudes / units.nm(1.0),
+        ],
+        altitudes,
+    )
+    # geopy normalizes the coordinates out of range
+    parsed = (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180)
+    empty = np.zeros(len(values), dtype=bool)
+    if allow_empty:
+        empty = (values.isna() | values.eq("")).to_numpy()
+
+    for i in np.flatnonzero(~parsed & ~empty):
+        try:
+            point = Point(values.iat[i])
+        except Exception as ex:  # pylint: disable=broad-except
+            raise ValueError(values.iat[i]) from ex
+        latitudes[i], longitudes[i], altitudes[i] = point[0], point[1], point[2]
+    latitudes[empty] = longitudes[empty] = altitudes[empty] = np.nan
+    return latitudes, longitudes, altitudes
@@ -0,0 +1,177 @@
+"""Incremental caching of the data of time series, per day.
+
+The cache key of a time series query is made of its relative time range, so that
+the data of a chart over the last week is queried in full once its cache entry
+expires. With ``INCREMENTAL_TIMESERIES_CACHE``, the time range of such queries is
+split into day partitions whose data is cached on its own: the days which are over
+are queried once, only the missing days and the days still receiving data are
+queried, and the data of the partitions is concatenated back together.
+
+The data of a time bucket only depends on the rows of the bucket, so the split is
+exact as long as the buckets don't span partitions and the series aren't limited or
+ordered over the whole time range.
+"""
+import logging
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, TYPE_CHECKING
+
+import pandas as pd
+from flask import current_app
+
+from rabbitai.extensions import cache_manager
+from rabbitai.stats_logger import BaseStatsLogger
+from rabbitai.typing import QueryObjectDict
+from rabbitai.utils.cache import set_and_log_cache
+from rabbitai.utils.concurrency import run_concurrently
+from rabbitai.utils.core import QueryStatus, TimeRangeEndpoint
+
+if TYPE_CHECKING:
+    from rabbitai.connectors.base.models import BaseDatasource
+
+logger = logging.getLogger(__name__)
+
+# the time grains whose buckets never span two days
+PARTITION_ALIGNED_TIME_GRAINS = {
+    None,
+    "PT1S",
+    "PT1M",
+    "PT5M",
+    "PT10M",
+    "PT15M",
+    "PT0.5H",
+    "PT1H",
+    "P1D",
+}
+
+
+class Partition(NamedTuple):
+    from_dttm: datetime
+    to_dttm: datetime
+    # whether the partition may still receive data
+    is_open: bool
+
+
+def get_partitions(
+    query_obj: QueryObjectDict,
+    datasource: "BaseDatasource",
+    now: Optional[datetime] = None,
+) -> Optional[List[Partition]]:
+    """
+    Split the time range of a time series query into day partitions.
+
+    :param query_obj: The query object
+    :param datasource: The datasource of the query
+    :param now: The current time, in the time zone of the time range
+    :returns: The partitions, None if the query can't be cached incrementally
+    """
+    config = current_app.config
+    if not config["INCREMENTAL_TIMESERIES_CACHE"] or datasource.type != "table":
+        return None
+
+    from_dttm = query_obj.get("from_dttm")
+    to_dttm = query_obj.get("to_dttm")
+    extras = query_obj.get("extras") or {}
+    if (
+        not query_obj.get("is_timeseries")
+        or query_obj.get("is_rowcount")
+        or not query_obj.get("granularity")
+        or not from_dttm
+        or not to_dttm
+        or query_obj.get("orderby")
+        or query_obj.get("row_offset")
+        or (
+            query_obj.get("timeseries_limit")
+            and (query_obj.get("groupby") or query_obj.get("columns"))
+        )
+        or extras.get("time_grain_sqla") not in PARTITION_ALIGNED_TIME_GRAINS
+        or tuple(extras.get("time_range_endpoints") or ())
+        != (TimeRangeEndpoint.INCLUSIVE, TimeRangeEndpoint.EXCLUSIVE)
+    ):
+        return None
+
+    now = now or datetime.now(from_dttm.tzinfo)
+    closed_until = now - timedelta(
+        seconds=config["INCREMENTAL_CACHE_OPEN_PARTITION_DELAY"]
+    )
+    partitions = []
+    start = from_dttm
+    while start < to_dttm:
+        midnight = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = min(midnight + timedelta(days=1), to_dttm)
+        partitions.append(Partition(start, end, end > closed_until))
+        start = end
+
+    if (
+        len(partitions) < 2
+        or len(partitions) > config["INCREMENTAL_CACHE_MAX_PARTITIONS"]
+        or all(partition.is_open for partition in partitions)
+    ):
+        return None
+    return partitions
+
+
+def get_incremental_result(  # pylint: disable=too-many-locals
+    partitions: List[Partition],
+    get_cache_key: Callable[[Partition], Optional[str]],
+    get_result: Callable[[Partition], Dict[str, Any]],
+    datasource_uid: str,
+    row_limit: Optional[int] = None,
+    max_workers: int = 1,
+) -> Optional[Dict[str, Any]]:
+    """
+    Get the result of a time series query from the cached data of its closed
+    partitions, querying the other partitions.
+
+    :param partitions: The partitions of the time range of the query
+    :param get_cache_key: Function returning the cache key of a partition
+    :param get_result: Function querying the data of a partition, returning a
+        dict with its ``df``, ``query``, ``status`` and ``error_message``
+    :param datasource_uid: The uid of the datasource of the query
+    :param row_limit: The row limit of the query
+    :param max_workers: Maximum number of partitions queried concurrently
+    :returns: The result of the query, None if it must be queried at once
+    """
+    stats_logger: BaseStatsLogger = current_app.config["STATS_LOGGER"]
+    cache_keys = [get_cache_key(partition) for partition in partitions]
+    results: List[Optional[Dict[str, Any]]] = [None] * len(partitions)
+    for i, (partition, cache_key) in enumerate(zip(partitions, cache_keys)):
+        if cache_key and not partition.is_open:
+            results[i] = cache_manager.get_data(cache_key, datasource_uid)
+        if results[i] is None:
+            stats_logger.incr("incremental_cache.misses")
+        else:
+            stats_logger.incr("incremental_cache.hits")
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    queried = run_concurrently(
+        [partial(get_result, partitions[i]) for i in missing], max_workers
+    )
+    for i, result in zip(missing, queried):
+        if result["status"] == QueryStatus.FAILED:
+            return result
+        results[i] = result
+        cache_key = cache_keys[i]
+        if cache_key and not partitions[i].is_open:
+            set_and_log_cache(
+                cache_manager.data_cache,
+                cache_key,
+                {"df": result["df"], "query": result["query"]},
+                current_app.config["INCREMENTAL_CACHE_PARTITION_TIMEOUT"],
+                datasource_uid,
+            )
+
+    dfs = [result["df"] for result in results if result is not None]
+    df = pd.concat([df for df in dfs if not df.empty] or dfs[:1], ignore_index=True)
+    if row_limit and len(df.index) >= row_limit:
+        # the rows of the whole time range may have been limited differently
+        logger.info("Incremental query reached the row limit, querying at once")
+        return None
+
+    queries = [result["query"] for result in results if result is not None]
+    return {
+        "df": df,
+        "query": "\n\n".join(dict.fromkeys(query for query in queries if query)),
+        "status": QueryStatus.SUCCESS,
+        "error_message": None,
+    }
@@ -5,17 +5,33 @@ import inspect
 import json
 import logging
 import textwrap
+import time
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Any, Callable, cast, Dict, Iterator, Optional, Type, Union
-
-from flask import current_app, g, request
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Type,
+    TYPE_CHECKING,
+    Union,
+)
+
+from flask import current_app, Flask, g, request
 from flask_appbuilder.const import API_URI_RIS_KEY
 from sqlalchemy.exc import SQLAlchemyError
 from typing_extensions import Literal
 
 from rabbitai.stats_logger import BaseStatsLogger
+from rabbitai.utils.batch_worker import BatchWorker
+
+if TYPE_CHECKING:
+    from rabbitai.models.core import Log
 
 
 def collect_request_payload() -> Dict[str, Any]:
@@ -283,7 +299,7 @@ def get_event_logger_from_cfg_value(cfg_value: Any) -> AbstractEventLogger:
 class DBEventLogger(AbstractEventLogger):
     """Event logger that commits logs to Rabbitai DB"""
 
-    def log(  # pylint: disable=too-many-arguments,too-many-locals
+    def log(  # pylint: disable=too-many-arguments
         self,
         user_id: Optional[int],
         action: str,
@@ -294,9 +310,31 @@ class DBEventLogger(AbstractEventLogger):
         *args: Any,
         **kwargs: Any,
     ) -> None:
+        self.save_logs(
+            self.get_logs(
+                user_id,
+                action,
+                dashboard_id,
+                duration_ms,
+                slice_id,
+                referrer,
+                kwargs.get("records", []),
+            )
+        )
+
+    @staticmethod
+    def get_logs(  # pylint: disable=too-many-arguments
+        user_id: Optional[int],
+        action: str,
+        dashboard_id: Optional[int],
+        duration_ms: Optional[int],
+        slice_id: Optional[int],
+        referrer: Optional[str],
+        records: List[Dict[str, Any]],
+        dttm: Optional[datetime] = None,
+    ) -> List["Log"]:
         from rabbitai.models.core import Log
 
-        records = kwargs.get("records", [])
         logs = []
         for record in records:
             json_string: Optional[str]
@@ -313,7 +351,13 @@ class DBEventLogger(AbstractEventLogger):
                 referrer=referrer,
                 user_id=user_id,
             )
+            if dttm:
+                log.dttm = dttm
             logs.append(log)
+        return logs
+
+    @staticmethod
+    def save_logs(logs: List["Log"]) -> None:
         try:
             sesh = current_app.appbuilder.get_session
             sesh.bulk_save_objects(logs)
@@ -321,3 +365,72 @@ class DBEventLogger(AbstractEventLogger):
         except SQLAlchemyError as ex:
             logging.error("DBEventLogger failed to log event(s)")
             logging.exception(ex)
+
+
+class BufferedDBEventLogger(DBEventLogger):
+    """
+    Event logger that commits logs to Rabbitai DB in batches, from a background
+    thread rather than from the request being logged.
+
+    The logs are queued and committed when ``batch_size`` of them are queued, or
+    ``flush_interval`` seconds after the first of them was. When ``max_queue_size``
+    logs are queued, e.g. because the database is slow, new logs are dropped and
+    counted in the ``event_logger.dropped`` stat.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1,
+    ) -> None:
+        self._app: Optional[Flask] = None
+        self._worker: "BatchWorker[Log]" = BatchWorker(
+            self._save_batch,
+            name="event-logger",
+            max_queue_size=max_queue_size,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+        )
+
+    def log(  # pylint: disable=too-many-arguments
+        self,
+        user_id: Optional[int],
+        action: str,
+        dashboard_id: Optional[int],
+        duration_ms: Optional[int],
+        slice_id: Optional[int],
+        referrer: Optional[str],
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        logs = self.get_logs(
+            user_id,
+            action,
+            dashboard_id,
+            duration_ms,
+            slice_id,
+            referrer,
+            kwargs.get("records", []),
+            # the logs are inserted later on
+            dttm=datetime.utcnow(),
+        )
+        if self._app is None:
+            # pylint: disable=protected-access
+            self._app = current_app._get_current_object()
+        for log in logs:
+            if not self._worker.put(log):
+                self.stats_logger.incr("event_logger.dropped")
+
+    def _save_batch(self, logs: List["Log"]) -> None:
+        with self._app.app_context():  # type: ignore
+            start = time.perf_counter()
+            self.save_logs(logs)
+            self.stats_logger.timing(
+                "event_logger.flush_time", (time.perf_counter() - start) * 1000
+            )
+            self.stats_logger.gauge("event_logger.queue_size", self._worker.qsize())
+
+    def flush(self) -> None:
+        """Commit the queued logs, e.g. before the process exits"""
+        self._worker.flush()
@@ -1,23 +1,36 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
 import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from decimal import Decimal
 from functools import partial
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
-import geohash as geohash_lib
 import numpy as np
+from flask import current_app, has_app_context
 from flask_babel import gettext as _
-from geopy.point import Point
-from pandas import DataFrame, NamedAgg, Series, Timestamp
+from pandas import concat, DataFrame, NamedAgg, Series, Timestamp
+from pandas.util import hash_pandas_object
 
 from rabbitai.constants import NULL_STRING
 from rabbitai.exceptions import QueryObjectValidationError
+from rabbitai.extensions import cache_manager
+from rabbitai.utils import geo
+from rabbitai.utils.cache import set_and_log_cache
 from rabbitai.utils.core import (
     DTTM_ALIAS,
     PostProcessingBoxplotWhiskerType,
     PostProcessingContributionOrientation,
 )
+from rabbitai.utils.hashing import md5_sha_from_dict
+
+logger = logging.getLogger(__name__)
 
 NUMPY_FUNCTIONS = {
     "average": np.average,
@@ -87,6 +100,10 @@ PROPHET_TIME_GRAIN_MAP = {
     "P1W/1970-01-04T00:00:00Z": "W",
 }
 
+# the pool of processes fitting the forecasting models, with the pid of its process
+_prophet_executor: Optional[Tuple[int, Executor]] = None
+_prophet_executor_lock = threading.Lock()
+
 
 def _flatten_column_after_pivot(
     column: Union[float, Timestamp, str, Tuple[str, ...]],
@@ -468,9 +485,9 @@ def geohash_decode(
     :return: DataFrame with decoded longitudes and latitudes
     """
     try:
-        lonlat_df = DataFrame()
-        lonlat_df["latitude"], lonlat_df["longitude"] = zip(
-            *df[geohash].apply(geohash_lib.decode)
+        latitudes, longitudes = geo.geohash_decode(df[geohash])
+        lonlat_df = DataFrame(
+            {"latitude": latitudes, "longitude": longitudes}, index=df.index
         )
         return _append_columns(
             df, lonlat_df, {"latitude": latitude, "longitude": longitude}
@@ -492,14 +509,13 @@ def geohash_encode(
     :return: DataFrame with decoded longitudes and latitudes
     """
     try:
-        encode_df = df[[latitude, longitude]]
-        encode_df.columns = ["latitude", "longitude"]
-        encode_df["geohash"] = encode_df.apply(
-            lambda row: geohash_lib.encode(row["latitude"], row["longitude"]), axis=1,
+        encode_df = DataFrame(
+            {"geohash": geo.geohash_encode(df[latitude], df[longitude])},
+            index=df.index,
         )
         return _append_columns(df, encode_df, {"geohash": geohash})
     except ValueError:
-        QueryObjectValidationError(_("Invalid longitude/latitude"))
+        raise QueryObjectValidationError(_("Invalid longitude/latitude"))
 
 
 def geodetic_parse(
@@ -521,21 +537,12 @@ def geodetic_parse(
     :return: DataFrame with decoded longitudes and latitudes
     """
 
-    def _parse_location(location: str) -> Tuple[float, float, float]:
-        """
-        Parse a string containing a geodetic point and return latitude, longitude
-        and altitude
-        """
-        point = Point(location)
-        return point[0], point[1], point[2]
-
     try:
-        geodetic_df = DataFrame()
-        (
-            geodetic_df["latitude"],
-            geodetic_df["longitude"],
-            geodetic_df["altitude"],
-        ) = zip(*df[geodetic].apply(_parse_location))
+        latitudes, longitudes, altitudes = geo.geodetic_parse(df[geodetic])
+        geodetic_df = DataFrame(
+            {"latitude": latitudes, "longitude": longitudes, "altitude": altitudes},
+            index=df.index,
+        )
         columns = {"latitude": latitude, "longitude": longitude}
         if altitude:
             columns["altitude"] = altitude
@@ -607,7 +614,7 @@ def _prophet_parse_seasonality(
         return input_value
 
 
-def _prophet_fit_and_predict(  # pylint: disable=too-many-arguments
+def _prophet_fit_and_predict(  # pylint: disable=too-many-arguments,too-many-locals
     df: DataFrame,
     confidence_interval: float,
     yearly_seasonality: Union[bool, str, int],
@@ -615,9 +622,13 @@ def _prophet_fit_and_predict(  # pylint: disable=too-many-arguments
     daily_seasonality: Union[bool, str, int],
     periods: int,
     freq: str,
-) -> DataFrame:
+    init: Optional[Dict[str, Any]] = None,
+) -> Tuple[DataFrame, Dict[str, Any], float]:
     """
-    Fit a prophet model and return a DataFrame with predicted results.
+    Fit a prophet model and return a DataFrame with predicted results, the fitted
+    parameters of the model and the time spent fitting it, in milliseconds. The
+    fitting starts from the parameters in `init` when given, e.g. the parameters
+    of an earlier fit on similar data.
     """
     try:
         prophet_logger = logging.getLogger("prophet.plot")
@@ -628,18 +639,177 @@ def _prophet_fit_and_predict(  # pylint: disable=too-many-arguments
         prophet_logger.setLevel(logging.NOTSET)
     except ModuleNotFoundError:
         raise QueryObjectValidationError(_("`prophet` package not installed"))
-    model = Prophet(
-        interval_width=confidence_interval,
-        yearly_seasonality=yearly_seasonality,
-        weekly_seasonality=weekly_seasonality,
-        daily_seasonality=daily_seasonality,
-    )
+
+    def get_model() -> Any:
+        return Prophet(
+            interval_width=confidence_interval,
+            yearly_seasonality=yearly_seasonality,
+            weekly_seasonality=weekly_seasonality,
+            daily_seasonality=daily_seasonality,
+        )
+
     if df["ds"].dt.tz:
         df["ds"] = df["ds"].dt.tz_convert(None)
-    model.fit(df)
+    start = time.perf_counter()
+    model = get_model()
+    if init:
+        try:
+            model.fit(df, init=init)
+        except Exception:  # pylint: disable=broad-except
+            # e.g. fewer changepoints than in the earlier fit
+            model = get_model().fit(df)
+    else:
+        model.fit(df)
+    fit_time = (time.perf_counter() - start) * 1000
     future = model.make_future_dataframe(periods=periods, freq=freq)
     forecast = model.predict(future)[["ds", "yhat", "yhat_lower", "yhat_upper"]]
-    return forecast.join(df.set_index("ds"), on="ds").set_index(["ds"])
+    params = {name: model.params[name][0][0] for name in ("k", "m", "sigma_obs")}
+    params.update({name: model.params[name][0] for name in ("delta", "beta")})
+    forecast = forecast.join(df.set_index("ds"), on="ds").set_index(["ds"])
+    return forecast, params, fit_time
+
+
+def _get_prophet_mp_context() -> multiprocessing.context.BaseContext:
+    """
+    Get the context starting the processes fitting the forecasting models. They're
+    not forked from the current process, whose threads may hold locks, e.g. of the
+    loggers or of the database connection pools, the forked processes then waiting
+    for them forever.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _get_prophet_executor(processes: int) -> Executor:
+    """Get the pool of processes fitting the forecasting models, once per process"""
+    global _prophet_executor  # pylint: disable=global-statement,invalid-name
+    with _prophet_executor_lock:
+        pid, executor = _prophet_executor or (None, None)
+        if pid != os.getpid() or executor is None:
+            # forked processes inherit the pool but not its processes
+            executor = ProcessPoolExecutor(
+                max_workers=processes, mp_context=_get_prophet_mp_context()
+            )
+            _prophet_executor = (os.getpid(), executor)
+        return executor
+
+
+def _reset_prophet_executor(executor: Executor) -> None:
+    """Drop a broken pool of processes, for the next forecasts to start a new one"""
+    global _prophet_executor  # pylint: disable=global-statement,invalid-name
+    with _prophet_executor_lock:
+        if _prophet_executor and _prophet_executor[1] is executor:
+            _prophet_executor = None
+    executor.shutdown(wait=False)
+
+
+def _prophet_fit_series(  # pylint: disable=too-many-arguments,too-many-locals
+    series: Dict[str, DataFrame],
+    confidence_interval: float,
+    seasonality: Tuple[Union[bool, str, int], ...],
+    periods: int,
+    freq: str,
+    query_key: Optional[str] = None,
+    datasource_uid: Optional[str] = None,
+) -> Dict[str, DataFrame]:
+    """
+    Forecast series, reusing the forecasts of the unchanged series and starting the
+    fitting of the others from the parameters of their last fit, when cached.
+
+    The models are cached per query, the series of unknown queries only reusing the
+    forecasts of identical series.
+    """
+    config: Dict[str, Any] = current_app.config if has_app_context() else {}
+    cache = cache_manager.data_cache if has_app_context() else None
+    cache_timeout = config.get("PROPHET_MODEL_CACHE_TIMEOUT")
+    stats_logger = config.get("STATS_LOGGER")
+
+    cache_keys: Dict[str, str] = {}
+    data_hashes: Dict[str, str] = {}
+    forecasts: Dict[str, DataFrame] = {}
+    inits: Dict[str, Optional[Dict[str, Any]]] = {}
+    for column, series_df in series.items():
+        data_hashes[column] = hashlib.md5(
+            hash_pandas_object(series_df, index=False).values.tobytes()
+        ).hexdigest()
+        cache_keys[column] = "prophet_" + md5_sha_from_dict(
+            {
+                "query": query_key,
+                "series": column if query_key else data_hashes[column],
+                "seasonality": seasonality,
+                "freq": freq,
+            }
+        )
+        entry = (
+            cache_manager.get_data(cache_keys[column], datasource_uid)
+            if cache
+            else None
+        )
+        if (
+            entry
+            and entry["data_hash"] == data_hashes[column]
+            and entry["periods"] == periods
+            and entry["confidence_interval"] == confidence_interval
+        ):
+            forecasts[column] = entry["forecast"]
+        else:
+            inits[column] = entry["params"] if entry else None
+    if stats_logger:
+        stats_logger.gauge("prophet.reused_forecasts", len(forecasts))
+
+    fit = partial(
+        _prophet_fit_and_predict,
+        confidence_interval=confidence_interval,
+        yearly_seasonality=seasonality[0],
+        weekly_seasonality=seasonality[1],
+        daily_seasonality=seasonality[2],
+        periods=periods,
+        freq=freq,
+    )
+    processes = config.get("PROPHET_PROCESSES") or 1
+    if processes > 1 and len(inits) > 1:
+        executor = _get_prophet_executor(processes)
+        futures = {
+            column: executor.submit(fit, series[column], init=init)
+            for column, init in inits.items()
+        }
+        try:
+            results = {column: future.result() for column, future in futures.items()}
+        except BrokenProcessPool:
+            # e.g. a process was killed, the pool doesn't run any task anymore
+            _reset_prophet_executor(executor)
+            raise
+    else:
+        results = {
+            column: fit(series[column], init=init) for column, init in inits.items()
+        }
+
+    for column, (forecast, params, fit_time) in results.items():
+        logger.info(
+            "Fitted the forecasting model of %s in %.2f ms%s",
+            column,
+            fit_time,
+            " (warm start)" if inits[column] else "",
+        )
+        if stats_logger:
+            stats_logger.timing("prophet.fit_time", fit_time)
+        forecasts[column] = forecast
+        if cache:
+            set_and_log_cache(
+                cache,
+                cache_keys[column],
+                {
+                    "data_hash": data_hashes[column],
+                    "periods": periods,
+                    "confidence_interval": confidence_interval,
+                    "forecast": forecast,
+                    "params": params,
+                },
+                cache_timeout,
+                datasource_uid,
+            )
+    return {column: forecasts[column] for column in series}
 
 
 def prophet(  # pylint: disable=too-many-arguments
@@ -650,6 +820,8 @@ def prophet(  # pylint: disable=too-many-arguments
     yearly_seasonality: Optional[Union[bool, int]] = None,
     weekly_seasonality: Optional[Union[bool, int]] = None,
     daily_seasonality: Optional[Union[bool, int]] = None,
+    query_key: Optional[str] = None,
+    datasource_uid: Optional[str] = None,
 ) -> DataFrame:
     """
     Add forecasts to each series in a timeseries dataframe, along with confidence
@@ -674,6 +846,10 @@ def prophet(  # pylint: disable=too-many-arguments
     :param daily_seasonality: Should daily seasonality be applied.
            An integer value will specify Fourier order of seasonality, `None` will
            automatically detect seasonality.
+    :param query_key: The identity of the query of the DataFrame, keying the cached
+           forecasting models of its series
+    :param datasource_uid: The uid of the datasource of the query, the cached
+           forecasting models being invalidated with its cached data
     :return: DataFrame with contributions, with temporal column at beginning if present
     """
     # validate inputs
@@ -697,29 +873,36 @@ def prophet(  # pylint: disable=too-many-arguments
     if len(df.columns) < 2:
         raise QueryObjectValidationError(_("DataFrame include at least one series"))
 
-    target_df = DataFrame()
-    for column in [column for column in df.columns if column != DTTM_ALIAS]:
-        fit_df = _prophet_fit_and_predict(
-            df=df[[DTTM_ALIAS, column]].rename(columns={DTTM_ALIAS: "ds", column: "y"}),
-            confidence_interval=confidence_interval,
-            yearly_seasonality=_prophet_parse_seasonality(yearly_seasonality),
-            weekly_seasonality=_prophet_parse_seasonality(weekly_seasonality),
-            daily_seasonality=_prophet_parse_seasonality(daily_seasonality),
-            periods=periods,
-            freq=freq,
-        )
-        new_columns = [
+    forecasts = _prophet_fit_series(
+        series={
+            column: df[[DTTM_ALIAS, column]].rename(
+                columns={DTTM_ALIAS: "ds", column: "y"}
+            )
+            for column in df.columns
+            if column != DTTM_ALIAS
+        },
+        confidence_interval=confidence_interval,
+        seasonality=(
+            _prophet_parse_seasonality(yearly_seasonality),
+            _prophet_parse_seasonality(weekly_seasonality),
+            _prophet_parse_seasonality(daily_seasonality),
+        ),
+        periods=periods,
+        freq=freq,
+        query_key=query_key,
+        datasource_uid=datasource_uid,
+    )
+    fit_dfs = []
+    for column, fit_df in forecasts.items():
+        fit_df = fit_df.copy()
+        fit_df.columns = [
             f"{column}__yhat",
             f"{column}__yhat_lower",
             f"{column}__yhat_upper",
             f"{column}",
         ]
-        fit_df.columns = new_columns
-        if target_df.empty:
-            target_df = fit_df
-        else:
-            for new_column in new_columns:
-                target_df = target_df.assign(**{new_column: fit_df[new_column]})
+        fit_dfs.append(fit_df)
+    target_df = concat(fit_dfs, axis=1)
     target_df.reset_index(level=0, inplace=True)
     return target_df.rename(columns={"ds": DTTM_ALIAS})
 
@@ -0,0 +1,126 @@
+"""Progress tracking of the running SQL Lab queries.
+
+The engines polling a running query for its progress used to read the query from
+the metadata database and commit it on every poll. `QueryProgressTracker` keeps the
+progress in memory, writes it at most every ``SQLLAB_PROGRESS_UPDATE_INTERVAL``
+seconds when it changed meaningfully, and learns that the query was stopped from a
+flag set in the cache by the stop request, or from the status of the query re-read
+from the database with the periodic writes.
+"""
+import time
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy.orm import Session
+
+from rabbitai.extensions import cache_manager
+from rabbitai.models.sql_lab import Query
+from rabbitai.utils.core import QueryStatus
+
+# the statuses of the queries which must no longer run
+STOPPED_STATUSES = (QueryStatus.STOPPED, QueryStatus.TIMED_OUT)
+
+
+def get_stopped_cache_key(query_id: int) -> str:
+    return f"query_stopped_{query_id}"
+
+
+def set_query_stopped(query_id: int) -> None:
+    """
+    Flag the query as stopped, for the worker running it to cancel it.
+
+    :param query_id: The id of the stopped query
+    """
+    cache_manager.cache.set(
+        get_stopped_cache_key(query_id),
+        True,
+        timeout=current_app.config["SQLLAB_ASYNC_TIME_LIMIT_SEC"],
+    )
+
+
+def is_query_stopped(query_id: int) -> bool:
+    """
+    Return True if the query was flagged as stopped, False otherwise. Without a
+    cache the flag is never set, the status of the query must be read instead.
+
+    :param query_id: The id of the query
+    :returns: Whether the query was flagged as stopped
+    """
+    return bool(cache_manager.cache.get(get_stopped_cache_key(query_id)))
+
+
+class QueryProgressTracker:
+    """
+    Track the progress of a running query, coalescing its writes to the metadata
+    database.
+    """
+
+    def __init__(self, query: Query, session: Session) -> None:
+        self.query_id = query.id
+        self._session = session
+        self._interval = current_app.config["SQLLAB_PROGRESS_UPDATE_INTERVAL"]
+        self._min_delta = current_app.config["SQLLAB_PROGRESS_MIN_DELTA"]
+        self._progress = query.progress or 0
+        self._written_progress = self._progress
+        self._tracking_url: Optional[str] = None
+        self._stopped = False
+        self._last_write = time.monotonic()
+
+    def update(
+        self, progress: Optional[float] = None, tracking_url: Optional[str] = None
+    ) -> None:
+        """
+        Update the progress of the query. A new tracking url is written right away,
+        the progress with the next periodic write.
+
+        :param progress: The progress of the query, in percent
+        :param tracking_url: The url tracking the query in the engine
+        """
+        if progress is not None and progress > self._progress:
+            self._progress = progress
+        if tracking_url and tracking_url != self._tracking_url:
+            self._tracking_url = tracking_url
+            self._write()
+
+    def is_stopped(self) -> bool:
+        """
+        Return True if the query was stopped, False otherwise. The pending progress
+        is written, and the status of the query read, every
+        ``SQLLAB_PROGRESS_UPDATE_INTERVAL`` seconds.
+
+        :returns: Whether the query was stopped
+        """
+        if not self._stopped and is_query_stopped(self.query_id):
+            self._stopped = True
+        if not self._stopped and time.monotonic() - self._last_write >= self._interval:
+            self._write()
+        return self._stopped
+
+    def flush(self) -> None:
+        """Write the pending progress of the query"""
+        if not self._stopped and self._progress > self._written_progress:
+            self._write(force=True)
+
+    def _write(self, force: bool = False) -> None:
+        self._last_write = time.monotonic()
+        # the status may have been changed by another process, the instance in the
+        # identity map of the session is refreshed from the database
+        query = (
+            self._session.query(Query)
+            .filter_by(id=self.query_id)
+            .populate_existing()
+            .one()
+        )
+        if query.status in STOPPED_STATUSES:
+            self._stopped = True
+            return
+
+        if force or self._progress - self._written_progress >= self._min_delta:
+            if self._progress > query.progress:
+                query.progress = self._progress
+            self._written_progress = self._progress
+        if self._tracking_url and query.tracking_url != self._tracking_url:
+            query.tracking_url = self._tracking_url
+        # also ends the transaction when nothing changed, for the next read not to be
+        # served from its snapshot on the databases isolating repeatable reads
+        self._session.commit()
@@ -0,0 +1,205 @@
+"""Arrow IPC storage format for SQL Lab results stored in the results backend.
+
+The query metadata and the data are stored separately: the metadata (columns,
+query, status) under the results key, and the data as a sequence of compressed
+Arrow IPC streams of at most ``RESULTS_BACKEND_ARROW_BATCH_ROWS`` rows each, under
+their own keys. This allows readers to fetch only the batches covering the rows
+they need instead of deserializing the whole result. Results sorted by a column
+are stored the same way, under keys derived from the results key, so that
+windows of sorted rows can be read as cheaply.
+"""
+import base64
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import simplejson as json
+from cachelib.base import BaseCache
+
+from rabbitai.exceptions import QueryObjectValidationError, SerializationError
+from rabbitai.utils.core import json_iso_dttm_ser, zlib_compress, zlib_decompress
+from rabbitai.utils.hashing import md5_sha_from_str
+
+logger = logging.getLogger(__name__)
+
+# prefix of the metadata blob, used to tell the Arrow IPC format apart from the
+# legacy (zlib compressed msgpack/JSON) payloads
+ARROW_RESULTS_MAGIC = b"RBAIPC1:"
+
+
+def get_batch_key(key: str, index: int) -> str:
+    return f"{key}/batch/{index}"
+
+
+def get_sorted_key(key: str, column: str, descending: bool) -> str:
+    direction = "desc" if descending else "asc"
+    return f"{key}/sorted/{direction}/{md5_sha_from_str(column)}"
+
+
+def is_arrow_results(blob: Any) -> bool:
+    """Whether a blob read from the results backend holds Arrow IPC metadata"""
+    return isinstance(blob, bytes) and blob.startswith(ARROW_RESULTS_MAGIC)
+
+
+def write_arrow_results(  # pylint: disable=too-many-arguments
+    results_backend: BaseCache,
+    key: str,
+    payload: Dict[str, Any],
+    table: pa.Table,
+    cache_timeout: Optional[int],
+    batch_rows: int = 10000,
+    compression: Optional[str] = "zstd",
+) -> Dict[str, Any]:
+    """
+    Store a query payload and its data in the results backend.
+
+    :param results_backend: the results backend
+    :param key: the results key
+    :param payload: the query payload, without data
+    :param table: the query results
+    :param cache_timeout: timeout of the stored entries
+    :param batch_rows: maximum number of rows per stored batch
+    :param compression: IPC buffer compression codec (``lz4``, ``zstd`` or ``None``)
+    :return: the stored metadata
+    """
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    batches: Dict[str, bytes] = {}
+    batch_sizes: List[int] = []
+    for batch in table.to_batches(max_chunksize=batch_rows):
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_batch(batch)
+        batches[get_batch_key(key, len(batch_sizes))] = sink.getvalue().to_pybytes()
+        batch_sizes.append(batch.num_rows)
+
+    metadata = {
+        **payload,
+        "batches": batch_sizes,
+        "schema": base64.b64encode(table.schema.serialize().to_pybytes()).decode(),
+    }
+    if batches:
+        results_backend.set_many(batches, timeout=cache_timeout)
+    results_backend.set(
+        key,
+        ARROW_RESULTS_MAGIC
+        + zlib_compress(json.dumps(metadata, default=json_iso_dttm_ser)),
+        cache_timeout,
+    )
+    logger.debug(
+        "*** stored %i rows in %i Arrow batches", table.num_rows, len(batch_sizes)
+    )
+    return metadata
+
+
+def read_arrow_results_metadata(blob: bytes) -> Dict[str, Any]:
+    """Decode the metadata blob stored by `write_arrow_results`"""
+    return json.loads(zlib_decompress(blob[len(ARROW_RESULTS_MAGIC) :]))
+
+
+def read_arrow_results(
+    results_backend: BaseCache,
+    key: str,
+    metadata: Dict[str, Any],
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> pa.Table:
+    """
+    Read a window of rows of a stored result, fetching only the batches that
+    overlap with it.
+
+    :param results_backend: the results backend
+    :param key: the results key
+    :param metadata: the metadata returned by `read_arrow_results_metadata`
+    :param offset: index of the first row to read
+    :param limit: maximum number of rows to read, all remaining rows if `None`
+    :return: the requested rows
+    :raises SerializationError: if some of the batches are missing or corrupt
+    """
+    end = None if limit is None else offset + limit
+    indexes: List[int] = []
+    first_row = 0
+    batch_start = 0
+    for index, num_rows in enumerate(metadata["batches"]):
+        batch_end = batch_start + num_rows
+        if batch_end > offset and (end is None or batch_start < end):
+            if not indexes:
+                first_row = batch_start
+            indexes.append(index)
+        batch_start = batch_end
+
+    try:
+        schema = pa.ipc.read_schema(pa.py_buffer(base64.b64decode(metadata["schema"])))
+        blobs = (
+            results_backend.get_many(*[get_batch_key(key, i) for i in indexes])
+            if indexes
+            else []
+        )
+        if any(blob is None for blob in blobs):
+            raise SerializationError("Some of the result batches have expired")
+        batches = [
+            batch
+            for blob in blobs
+            for batch in pa.ipc.open_stream(pa.py_buffer(blob)).read_all().to_batches()
+        ]
+        table = pa.Table.from_batches(batches, schema=schema)
+    except (pa.ArrowException, KeyError, ValueError) as ex:
+        raise SerializationError("Unable to deserialize table") from ex
+
+    rows = None if end is None else end - max(offset, first_row)
+    return table.slice(max(offset - first_row, 0), rows)
+
+
+def sort_arrow_results(  # pylint: disable=too-many-arguments
+    results_backend: BaseCache,
+    key: str,
+    metadata: Dict[str, Any],
+    column: str,
+    descending: bool = False,
+    cache_timeout: Optional[int] = None,
+    batch_rows: int = 10000,
+    compression: Optional[str] = "zstd",
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Get a stored result sorted by a column. The whole result is only read and
+    sorted the first time, the sorted result is then stored alongside it.
+
+    Null values are sorted last.
+
+    :param results_backend: the results backend
+    :param key: the results key
+    :param metadata: the metadata returned by `read_arrow_results_metadata`
+    :param column: the column to sort by
+    :param descending: whether to sort in descending order
+    :param cache_timeout: timeout of the stored sorted result
+    :param batch_rows: maximum number of rows per stored batch
+    :param compression: IPC buffer compression codec (``lz4``, ``zstd`` or ``None``)
+    :return: the key and the metadata of the sorted result
+    :raises QueryObjectValidationError: if the result can't be sorted by the column
+    :raises SerializationError: if some of the batches are missing or corrupt
+    """
+    sorted_key = get_sorted_key(key, column, descending)
+    blob = results_backend.get(sorted_key)
+    if is_arrow_results(blob):
+        return sorted_key, read_arrow_results_metadata(blob)
+
+    table = read_arrow_results(results_backend, key, metadata)
+    if column not in table.schema.names:
+        raise QueryObjectValidationError(f"Unknown column: {column}")
+    order = "descending" if descending else "ascending"
+    try:
+        table = table.take(pc.sort_indices(table, sort_keys=[(column, order)]))
+    except pa.ArrowNotImplementedError as ex:
+        raise QueryObjectValidationError(f"Unable to sort by column: {column}") from ex
+
+    payload = {k: v for k, v in metadata.items() if k not in ("batches", "schema")}
+    sorted_metadata = write_arrow_results(
+        results_backend,
+        sorted_key,
+        payload,
+        table,
+        cache_timeout,
+        batch_rows=batch_rows,
+        compression=compression,
+    )
+    return sorted_key, sorted_metadata
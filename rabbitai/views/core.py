@@ -2,14 +2,25 @@ import logging
 import re
 from contextlib import closing
 from datetime import datetime, timedelta
-from typing import Any, Callable, cast, Dict, List, Optional, Union
+from itertools import chain
+from typing import Any, Callable, cast, Dict, List, Optional, Tuple, Union
 from urllib import parse
 
 import backoff
 import humanize
 import pandas as pd
 import simplejson as json
-from flask import abort, flash, g, Markup, redirect, render_template, request, Response
+from flask import (
+    abort,
+    flash,
+    g,
+    Markup,
+    redirect,
+    render_template,
+    request,
+    Response,
+    stream_with_context,
+)
 from flask_appbuilder import expose
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_appbuilder.security.decorators import (
@@ -60,6 +71,7 @@ from rabbitai.exceptions import (
     CacheLoadError,
     CertificateException,
     DatabaseNotFound,
+    QueryObjectValidationError,
     SerializationError,
     RabbitaiException,
     RabbitaiGenericDBErrorException,
@@ -87,6 +99,11 @@ from rabbitai.utils.cache import etag_cache
 from rabbitai.utils.core import ReservedUrlParameters
 from rabbitai.utils.dates import now_as_float
 from rabbitai.utils.decorators import check_dashboard_access
+from rabbitai.utils.query_progress import set_query_stopped
+from rabbitai.utils.results_backend import (
+    is_arrow_results,
+    read_arrow_results_metadata,
+)
 from rabbitai.views.base import (
     api,
     BaseRabbitaiView,
@@ -105,8 +122,11 @@ from rabbitai.views.base import (
     validate_sqlatable,
 )
 from rabbitai.views.utils import (
+    _arrow_results_to_dfs,
+    _deserialize_arrow_results,
     _deserialize_results_payload,
     apply_display_max_row_limit,
+    apply_results_window,
     bootstrap_user_data,
     check_datasource_perms,
     check_explore_cache_perms,
@@ -2093,14 +2113,21 @@ class Rabbitai(BaseRabbitaiView):
         return self.results_exec(key)
 
     @staticmethod
-    def results_exec(key: str,) -> FlaskResponse:
-        """Serves a key off of the results backend
+    def _get_stored_results(
+        key: str,
+    ) -> Tuple[Any, Optional[Query], Optional[FlaskResponse]]:
+        """
+        Read a key off of the results backend and the query it belongs to,
+        checking that the user can access it.
 
-        It is possible to pass the `rows` query argument to limit the number
-        of rows returned.
+        :return: the stored blob and the query, or the error response
         """
         if not results_backend:
-            return json_error_response("Results backend isn't configured")
+            return (
+                None,
+                None,
+                json_error_response("Results backend isn't configured"),
+            )
 
         read_from_results_backend_start = now_as_float()
         blob = results_backend.get(key)
@@ -2109,39 +2136,74 @@ class Rabbitai(BaseRabbitaiView):
             now_as_float() - read_from_results_backend_start,
         )
         if not blob:
-            return json_error_response(
-                "Data could not be retrieved. " "You may want to re-run the query.",
-                status=410,
+            return (
+                None,
+                None,
+                json_error_response(
+                    "Data could not be retrieved. " "You may want to re-run the query.",
+                    status=410,
+                ),
             )
 
         query = db.session.query(Query).filter_by(results_key=key).one_or_none()
         if query is None:
-            return json_error_response(
-                "Data could not be retrieved. You may want to re-run the query.",
-                status=404,
+            return (
+                None,
+                None,
+                json_error_response(
+                    "Data could not be retrieved. You may want to re-run the query.",
+                    status=404,
+                ),
             )
 
         try:
             query.raise_for_access()
         except RabbitaiSecurityException as ex:
-            return json_errors_response([ex.error], status=403)
+            return None, None, json_errors_response([ex.error], status=403)
+        return blob, query, None
+
+    @staticmethod
+    def results_exec(key: str,) -> FlaskResponse:
+        """Serves a key off of the results backend
+
+        It is possible to pass the `rows` query argument to limit the number
+        of rows returned.
+        """
+        blob, query, error_response = Rabbitai._get_stored_results(key)
+        if error_response:
+            return error_response
+
+        rows: Optional[int] = None
+        if "rows" in request.args:
+            try:
+                rows = int(request.args["rows"])
+            except ValueError:
+                return json_error_response("Invalid `rows` argument", status=400)
 
-        payload = utils.zlib_decompress(blob, decode=not results_backend_use_msgpack)
         try:
-            obj = _deserialize_results_payload(
-                payload, query, cast(bool, results_backend_use_msgpack)
-            )
+            if is_arrow_results(blob):
+                # only read the batches holding the rows that are displayed
+                obj = _deserialize_arrow_results(
+                    results_backend,
+                    key,
+                    blob,
+                    query,
+                    limit=None if rows is None else rows or config["DISPLAY_MAX_ROW"],
+                )
+            else:
+                payload = utils.zlib_decompress(
+                    blob, decode=not results_backend_use_msgpack
+                )
+                obj = _deserialize_results_payload(
+                    payload, query, cast(bool, results_backend_use_msgpack)
+                )
         except SerializationError:
             return json_error_response(
                 __("Data could not be deserialized. You may want to re-run the query."),
                 status=404,
             )
 
-        if "rows" in request.args:
-            try:
-                rows = int(request.args["rows"])
-            except ValueError:
-                return json_error_response("Invalid `rows` argument", status=400)
+        if rows is not None:
             obj = apply_display_max_row_limit(obj, rows)
 
         return json_success(
@@ -2150,6 +2212,81 @@ class Rabbitai(BaseRabbitaiView):
             )
         )
 
+    @has_access_api
+    @expose("/results/<key>/window/")
+    @event_logger.log_this
+    def results_window(self, key: str) -> FlaskResponse:
+        """Serves a window of the rows of a key off of the results backend
+
+        The window is set by the `offset` (0 by default) and `limit` query
+        arguments, the limit being capped at `DISPLAY_MAX_ROW`. The rows can be
+        sorted by the column named by the `order_by` query argument, in
+        descending order when `order_desc` is true.
+
+        Only the batches holding the rows of the window are read from results
+        stored in the Arrow IPC format. Sorted results are stored the first time
+        they are requested.
+        """
+        blob, query, error_response = self._get_stored_results(key)
+        if error_response:
+            return error_response
+
+        display_max_row = config["DISPLAY_MAX_ROW"]
+        try:
+            offset = int(request.args.get("offset", 0))
+            limit = int(request.args.get("limit", display_max_row))
+        except ValueError:
+            offset = limit = -1
+        if offset < 0 or limit < 0:
+            return json_error_response(
+                "Invalid `offset` or `limit` argument", status=400
+            )
+        limit = min(limit, display_max_row)
+        order_by = request.args.get("order_by")
+        order_desc = utils.parse_boolean_string(request.args.get("order_desc"))
+
+        try:
+            if is_arrow_results(blob):
+                obj = _deserialize_arrow_results(
+                    results_backend,
+                    key,
+                    blob,
+                    query,
+                    offset=offset,
+                    limit=limit,
+                    order_by=order_by,
+                    order_desc=order_desc,
+                )
+            else:
+                payload = utils.zlib_decompress(
+                    blob, decode=not results_backend_use_msgpack
+                )
+                obj = apply_results_window(
+                    _deserialize_results_payload(
+                        payload, query, cast(bool, results_backend_use_msgpack)
+                    ),
+                    offset=offset,
+                    limit=limit,
+                    order_by=order_by,
+                    order_desc=order_desc,
+                )
+        except QueryObjectValidationError as ex:
+            return json_error_response(str(ex), status=400)
+        except SerializationError:
+            return json_error_response(
+                __("Data could not be deserialized. You may want to re-run the query."),
+                status=404,
+            )
+
+        obj.update(
+            {"offset": offset, "limit": limit, "totalRows": obj["query"]["rows"]}
+        )
+        return json_success(
+            json.dumps(
+                obj, default=utils.json_iso_dttm_ser, ignore_nan=True, encoding=None
+            )
+        )
+
     @has_access_api
     @expose("/stop_query/", methods=["POST"])
     @event_logger.log_this
@@ -2178,6 +2315,7 @@ class Rabbitai(BaseRabbitaiView):
             return self.json_response("OK")
         query.status = QueryStatus.STOPPED
         db.session.commit()
+        set_query_stopped(query.id)
 
         return self.json_response("OK")
 
@@ -2558,43 +2696,61 @@ class Rabbitai(BaseRabbitaiView):
         if results_backend and query.results_key:
             logger.info("Fetching CSV from results backend [%s]", query.results_key)
             blob = results_backend.get(query.results_key)
-        if blob:
-            logger.info("Decompressing")
-            payload = utils.zlib_decompress(
-                blob, decode=not results_backend_use_msgpack
-            )
-            obj = _deserialize_results_payload(
-                payload, query, cast(bool, results_backend_use_msgpack)
+        chunk_rows = config["CSV_EXPORT_CHUNK_ROWS"]
+        if blob and is_arrow_results(blob):
+            logger.info("Streaming Arrow batches to CSV")
+            metadata = read_arrow_results_metadata(blob)
+            row_count = sum(metadata["batches"])
+            csv_chunks = csv.dfs_to_escaped_csv(
+                _arrow_results_to_dfs(results_backend, query.results_key, metadata),
+                index=False,
+                **config["CSV_EXPORT"],
             )
-            columns = [c["name"] for c in obj["columns"]]
-            df = pd.DataFrame.from_records(obj["data"], columns=columns)
-            logger.info("Using pandas to convert to CSV")
         else:
-            logger.info("Running a query to turn into CSV")
-            if query.select_sql:
-                sql = query.select_sql
-                limit = None
+            if blob:
+                logger.info("Decompressing")
+                payload = utils.zlib_decompress(
+                    blob, decode=not results_backend_use_msgpack
+                )
+                obj = _deserialize_results_payload(
+                    payload, query, cast(bool, results_backend_use_msgpack)
+                )
+                columns = [c["name"] for c in obj["columns"]]
+                df = pd.DataFrame.from_records(obj["data"], columns=columns)
+                logger.info("Using pandas to convert to CSV")
             else:
-                sql = query.executed_sql
-                limit = ParsedQuery(sql).limit
-            if limit is not None and query.limiting_factor in {
-                LimitingFactor.QUERY,
-                LimitingFactor.DROPDOWN,
-                LimitingFactor.QUERY_AND_DROPDOWN,
-            }:
-                # remove extra row from `increased_limit`
-                limit -= 1
-            df = query.database.get_df(sql, query.schema)[:limit]
-
-        csv_data = csv.df_to_escaped_csv(df, index=False, **config["CSV_EXPORT"])
+                logger.info("Running a query to turn into CSV")
+                if query.select_sql:
+                    sql = query.select_sql
+                    limit = None
+                else:
+                    sql = query.executed_sql
+                    limit = ParsedQuery(sql).limit
+                if limit is not None and query.limiting_factor in {
+                    LimitingFactor.QUERY,
+                    LimitingFactor.DROPDOWN,
+                    LimitingFactor.QUERY_AND_DROPDOWN,
+                }:
+                    # remove extra row from `increased_limit`
+                    limit -= 1
+                df = query.database.get_df(sql, query.schema)[:limit]
+            row_count = len(df.index)
+            csv_chunks = csv.df_to_escaped_csv_chunks(
+                df, chunk_rows, index=False, **config["CSV_EXPORT"]
+            )
+
+        # encode the first chunk eagerly so that errors are raised before the
+        # response headers are sent
+        first_chunk = next(csv_chunks)
         quoted_csv_name = parse.quote(query.name)
         response = CsvResponse(
-            csv_data, headers=generate_download_headers("csv", quoted_csv_name)
+            stream_with_context(chain([first_chunk], csv_chunks)),
+            headers=generate_download_headers("csv", quoted_csv_name),
         )
         event_info = {
             "event_type": "data_export",
             "client_id": client_id,
-            "row_count": len(df.index),
+            "row_count": row_count,
             "database": query.database.name,
             "schema": query.schema,
             "sql": query.sql,
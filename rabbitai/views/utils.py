@@ -2,12 +2,25 @@ import logging
 from collections import defaultdict
 from datetime import date
 from functools import wraps
-from typing import Any, Callable, DefaultDict, Dict, List, Optional, Set, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 from urllib import parse
 
 import msgpack
+import pandas as pd
 import pyarrow as pa
 import simplejson as json
+from cachelib.base import BaseCache
 from flask import g, request
 from flask_appbuilder.security.sqla import models as ab_models
 from flask_appbuilder.security.sqla.models import User
@@ -20,6 +33,7 @@ from rabbitai.connectors.connector_registry import ConnectorRegistry
 from rabbitai.errors import ErrorLevel, RabbitaiError, RabbitaiErrorType
 from rabbitai.exceptions import (
     CacheLoadError,
+    QueryObjectValidationError,
     SerializationError,
     RabbitaiException,
     RabbitaiSecurityException,
@@ -33,6 +47,11 @@ from rabbitai.models.sql_lab import Query
 from rabbitai.typing import FormData
 from rabbitai.utils.core import QueryStatus, TimeRangeEndpoint
 from rabbitai.utils.decorators import stats_timing
+from rabbitai.utils.results_backend import (
+    read_arrow_results,
+    read_arrow_results_metadata,
+    sort_arrow_results,
+)
 from rabbitai.viz import BaseViz
 
 logger = logging.getLogger(__name__)
@@ -275,6 +294,53 @@ def apply_display_max_row_limit(
     return sql_results
 
 
+def apply_results_window(
+    sql_results: Dict[str, Any],
+    offset: int = 0,
+    limit: Optional[int] = None,
+    order_by: Optional[str] = None,
+    order_desc: bool = False,
+) -> Dict[str, Any]:
+    """
+    Given a `sql_results` nested structure holding all the rows of a query, keeps
+    only a window of its rows, optionally sorted by a column (null values last).
+
+    :param sql_results: The results of a sql query from sql_lab.get_sql_results
+    :param offset: index of the first row to keep
+    :param limit: maximum number of rows to keep, all remaining rows if `None`
+    :param order_by: name of the column to sort the rows by
+    :param order_desc: whether to sort the rows in descending order
+    :returns: The mutated sql_results structure
+    :raises QueryObjectValidationError: if the rows can't be sorted by the column
+    """
+    data = sql_results["data"]
+    if order_by is not None:
+        _validate_results_order_by(sql_results, order_by)
+        nulls = [row for row in data if row.get(order_by) is None]
+        try:
+            data = sorted(
+                (row for row in data if row.get(order_by) is not None),
+                key=lambda row: row[order_by],
+                reverse=order_desc,
+            )
+        except TypeError as ex:
+            raise QueryObjectValidationError(
+                _("Unable to sort by column: %(column)s", column=order_by)
+            ) from ex
+        data.extend(nulls)
+
+    end = None if limit is None else offset + limit
+    sql_results["data"] = data[offset:end]
+    return sql_results
+
+
+def _validate_results_order_by(sql_results: Dict[str, Any], order_by: str) -> None:
+    if order_by not in {column["name"] for column in sql_results["selected_columns"]}:
+        raise QueryObjectValidationError(
+            _("Unknown column: %(column)s", column=order_by)
+        )
+
+
 def get_time_range_endpoints(
     form_data: FormData, slc: Optional[Slice] = None, slice_id: Optional[int] = None
 ) -> Optional[Tuple[TimeRangeEndpoint, TimeRangeEndpoint]]:
@@ -623,6 +689,75 @@ def _deserialize_results_payload(
         return json.loads(payload)
 
 
+def _deserialize_arrow_results(  # pylint: disable=too-many-arguments
+    results_backend: BaseCache,
+    key: str,
+    blob: bytes,
+    query: Query,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    order_by: Optional[str] = None,
+    order_desc: bool = False,
+) -> Dict[str, Any]:
+    """
+    Build the results payload of a query stored in the Arrow IPC format, reading
+    only the batches that hold the requested rows.
+
+    When sorting by a column, the result is sorted and stored sorted the first
+    time only, so that later windows of the sorted rows are as cheap to read.
+    """
+    ds_payload = read_arrow_results_metadata(blob)
+    if order_by is not None:
+        _validate_results_order_by(ds_payload, order_by)
+        cache_timeout = query.database.cache_timeout
+        if cache_timeout is None:
+            cache_timeout = app.config["CACHE_DEFAULT_TIMEOUT"]
+        with stats_timing("sqllab.query.results_backend_sort", stats_logger):
+            key, ds_payload = sort_arrow_results(
+                results_backend,
+                key,
+                ds_payload,
+                order_by,
+                descending=order_desc,
+                cache_timeout=cache_timeout,
+                batch_rows=app.config["RESULTS_BACKEND_ARROW_BATCH_ROWS"],
+                compression=app.config["RESULTS_BACKEND_ARROW_COMPRESSION"],
+            )
+    with stats_timing("sqllab.query.results_backend_pa_deserialize", stats_logger):
+        pa_table = read_arrow_results(
+            results_backend, key, ds_payload, offset=offset, limit=limit
+        )
+
+    df = result_set.RabbitaiResultSet.convert_table_to_df(pa_table)
+    db_engine_spec = query.database.db_engine_spec
+    all_columns, data, expanded_columns = db_engine_spec.expand_data(
+        ds_payload["selected_columns"], dataframe.df_to_records(df) or []
+    )
+    del ds_payload["batches"], ds_payload["schema"]
+    ds_payload.update(
+        {"data": data, "columns": all_columns, "expanded_columns": expanded_columns}
+    )
+    return ds_payload
+
+
+def _arrow_results_to_dfs(
+    results_backend: BaseCache, key: str, metadata: Dict[str, Any]
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a result stored in the Arrow IPC format one batch at a time, so that
+    only a single batch is held in memory.
+    """
+    offset = 0
+    # an empty result still yields an (empty) DataFrame with its columns
+    for num_rows in metadata["batches"] or [0]:
+        yield result_set.RabbitaiResultSet.convert_table_to_df(
+            read_arrow_results(
+                results_backend, key, metadata, offset=offset, limit=num_rows
+            )
+        )
+        offset += num_rows
+
+
 def get_cta_schema_name(
     database: Database, user: ab_models.User, schema: str, sql: str
 ) -> Optional[str]:
@@ -10,6 +10,7 @@ import logging
 import math
 import re
 from collections import defaultdict, OrderedDict
+from contextlib import nullcontext
 from datetime import date, datetime, timedelta
 from itertools import product
 from typing import (
@@ -39,6 +40,7 @@ from pandas.tseries.frequencies import to_offset
 
 from rabbitai import app, db, is_feature_enabled
 from rabbitai.constants import NULL_STRING
+from rabbitai.dataframe import df_to_columns
 from rabbitai.errors import ErrorLevel, RabbitaiError, RabbitaiErrorType
 from rabbitai.exceptions import (
     CacheLoadError,
@@ -51,8 +53,8 @@ from rabbitai.extensions import cache_manager, security_manager
 from rabbitai.models.cache import CacheKey
 from rabbitai.models.helpers import QueryResult
 from rabbitai.typing import QueryObjectDict, VizData, VizPayload
-from rabbitai.utils import core as utils, csv
-from rabbitai.utils.cache import set_and_log_cache
+from rabbitai.utils import core as utils, csv, geo
+from rabbitai.utils.cache import set_and_log_cache, single_flight
 from rabbitai.utils.core import (
     DTTM_ALIAS,
     JS_MAX_INTEGER,
@@ -63,6 +65,11 @@ from rabbitai.utils.core import (
 from rabbitai.utils.date_parser import get_since_until, parse_past_timedelta
 from rabbitai.utils.dates import datetime_to_epoch
 from rabbitai.utils.hashing import md5_sha_from_str
+from rabbitai.utils.incremental_cache import (
+    get_incremental_result,
+    get_partitions,
+    Partition,
+)
 
 import dataclasses  # isort:skip
 
@@ -131,6 +138,10 @@ class BaseViz:
     """缓存类型，默认df"""
     enforce_numerical_metrics = True
     """是否强制数值指标，默认True"""
+    incremental_cache = False
+    """是否按天增量缓存时间序列数据，默认False"""
+    supports_columnar = True
+    """是否支持列式数据，重新处理 to_series 等记录输出的可视化应为False"""
 
     def __init__(
         self,
@@ -182,6 +193,15 @@ class BaseViz:
         """是否强制缓存。"""
         return self._force_cached
 
+    @property
+    def columnar(self) -> bool:
+        """是否返回列式数据，由表单数据的 result_format 指定，默认返回记录。"""
+        return (
+            self.supports_columnar
+            and self.form_data.get("result_format")
+            == utils.ChartDataResultFormat.COLUMNAR
+        )
+
     def process_metrics(self) -> None:
         """处理指标，从 form_data 中获取指标名称和值，建立指标字典。"""
 
@@ -334,6 +354,59 @@ class BaseViz:
             df.replace([np.inf, -np.inf], np.nan, inplace=True)
         return df
 
+    def get_incremental_df(
+        self, query_obj: QueryObjectDict, **kwargs: Any
+    ) -> pd.DataFrame:
+        """
+        返回查询对象的数据帧，对于可增量缓存的时间序列查询，使用其时间范围内各天的缓存数据，
+        只查询缺失和仍在接收数据的天。
+
+        :param query_obj: 查询对象
+        :param kwargs: 缓存键的额外键值
+        :return: 数据帧
+        """
+        partitions = (
+            get_partitions(query_obj, self.datasource)
+            if self.incremental_cache and not self.force
+            else None
+        )
+        if partitions:
+
+            def get_partition_query_obj(partition: Partition) -> QueryObjectDict:
+                return {
+                    **query_obj,
+                    "from_dttm": partition.from_dttm,
+                    "to_dttm": partition.to_dttm,
+                }
+
+            def get_partition_result(partition: Partition) -> Dict[str, Any]:
+                df = self.get_df(get_partition_query_obj(partition))
+                return {
+                    "df": df,
+                    "query": self.query,
+                    "status": self.status,
+                    "error_message": None,
+                }
+
+            result = get_incremental_result(
+                partitions,
+                # the data of a partition is shared by all the time ranges including it
+                lambda partition: self.cache_key(
+                    get_partition_query_obj(partition),
+                    partition=[partition.from_dttm, partition.to_dttm],
+                    time_range=None,
+                    **kwargs,
+                ),
+                get_partition_result,
+                self.datasource.uid,
+                query_obj.get("row_limit"),
+            )
+            if result:
+                self.query = result["query"]
+                self.status = result["status"]
+                return result["df"]
+        return self.get_df(query_obj)
+
     def df_metrics_to_num(self, df: pd.DataFrame) -> None:
         """Converting metrics to numeric when pandas.read_sql cannot"""
         metrics = self.metric_labels
@@ -487,7 +560,7 @@ class BaseViz:
             if k in cache_dict:
                 del cache_dict[k]
 
-        cache_dict["time_range"] = self.form_data.get("time_range")
+        cache_dict.setdefault("time_range", self.form_data.get("time_range"))
         cache_dict["datasource"] = self.datasource.uid
         cache_dict["extra_cache_keys"] = self.datasource.get_extra_cache_keys(query_obj)
         cache_dict["rls"] = (
@@ -563,7 +636,7 @@ class BaseViz:
         stacktrace = None
         df = None
         if cache_key and cache_manager.data_cache and not self.force:
-            cache_value = cache_manager.data_cache.get(cache_key)
+            cache_value = cache_manager.get_data(cache_key, self.datasource.uid)
             if cache_value:
                 stats_logger.incr("loading_from_cache")
                 try:
@@ -586,64 +659,86 @@ class BaseViz:
                     f"force_cached (viz.py): value not found for cache key {cache_key}"
                 )
                 raise CacheLoadError(_("Cached value not found"))
-            try:
-                invalid_columns = [
-                    col
-                    for col in (query_obj.get("columns") or [])
-                               + (query_obj.get("groupby") or [])
-                               + utils.get_column_names_from_metrics(
-                        cast(
-                            List[Union[str, Dict[str, Any]]],
-                            query_obj.get("metrics") or [],
+            with (
+                single_flight(cache_manager.data_cache, cache_key)
+                if cache_key and cache_manager.data_cache and not self.force
+                else nullcontext()
+            ) as coalesced_value:
+                if coalesced_value:
+                    # computed by a concurrent request while waiting for the lock
+                    cache_value = coalesced_value
+                    df = cache_value["df"]
+                    self.query = cache_value["query"]
+                    self.status = utils.QueryStatus.SUCCESS
+                    is_loaded = True
+                    stats_logger.incr("loaded_from_cache")
+                else:
+                    try:
+                        invalid_columns = [
+                            col
+                            for col in (query_obj.get("columns") or [])
+                            + (query_obj.get("groupby") or [])
+                            + utils.get_column_names_from_metrics(
+                                cast(
+                                    List[Union[str, Dict[str, Any]]],
+                                    query_obj.get("metrics") or [],
+                                )
+                            )
+                            if col not in self.datasource.column_names
+                        ]
+                        if invalid_columns:
+                            raise QueryObjectValidationError(
+                                _(
+                                    "Columns missing in datasource: "
+                                    "%(invalid_columns)s",
+                                    invalid_columns=invalid_columns,
+                                )
+                            )
+                        df = self.get_incremental_df(query_obj, **kwargs)
+                        if self.status != utils.QueryStatus.FAILED:
+                            stats_logger.incr("loaded_from_source")
+                            if not self.force:
+                                stats_logger.incr(
+                                    "loaded_from_source_without_force"
+                                )
+                            is_loaded = True
+                    except QueryObjectValidationError as ex:
+                        error = dataclasses.asdict(
+                            RabbitaiError(
+                                message=str(ex),
+                                level=ErrorLevel.ERROR,
+                                error_type=RabbitaiErrorType.VIZ_GET_DF_ERROR,
+                            )
                         )
-                    )
-                    if col not in self.datasource.column_names
-                ]
-                if invalid_columns:
-                    raise QueryObjectValidationError(
-                        _(
-                            "Columns missing in datasource: %(invalid_columns)s",
-                            invalid_columns=invalid_columns,
+                        self.errors.append(error)
+                        self.status = utils.QueryStatus.FAILED
+                    except Exception as ex:
+                        logger.exception(ex)
+
+                        error = dataclasses.asdict(
+                            RabbitaiError(
+                                message=str(ex),
+                                level=ErrorLevel.ERROR,
+                                error_type=RabbitaiErrorType.VIZ_GET_DF_ERROR,
+                            )
                         )
-                    )
-                df = self.get_df(query_obj)
-                if self.status != utils.QueryStatus.FAILED:
-                    stats_logger.incr("loaded_from_source")
-                    if not self.force:
-                        stats_logger.incr("loaded_from_source_without_force")
-                    is_loaded = True
-            except QueryObjectValidationError as ex:
-                error = dataclasses.asdict(
-                    RabbitaiError(
-                        message=str(ex),
-                        level=ErrorLevel.ERROR,
-                        error_type=RabbitaiErrorType.VIZ_GET_DF_ERROR,
-                    )
-                )
-                self.errors.append(error)
-                self.status = utils.QueryStatus.FAILED
-            except Exception as ex:
-                logger.exception(ex)
-
-                error = dataclasses.asdict(
-                    RabbitaiError(
-                        message=str(ex),
-                        level=ErrorLevel.ERROR,
-                        error_type=RabbitaiErrorType.VIZ_GET_DF_ERROR,
-                    )
-                )
-                self.errors.append(error)
-                self.status = utils.QueryStatus.FAILED
-                stacktrace = utils.get_stacktrace()
-
-            if is_loaded and cache_key and self.status != utils.QueryStatus.FAILED:
-                set_and_log_cache(
-                    cache_manager.data_cache,
-                    cache_key,
-                    {"df": df, "query": self.query},
-                    self.cache_timeout,
-                    self.datasource.uid,
-                )
+                        self.errors.append(error)
+                        self.status = utils.QueryStatus.FAILED
+                        stacktrace = utils.get_stacktrace()
+
+                    if (
+                        is_loaded
+                        and cache_key
+                        and self.status != utils.QueryStatus.FAILED
+                    ):
+                        set_and_log_cache(
+                            cache_manager.data_cache,
+                            cache_key,
+                            {"df": df, "query": self.query},
+                            self.cache_timeout,
+                            self.datasource.uid,
+                        )
+
         return {
             "cache_key": cache_key,
             "cached_dttm": cache_value["dttm"] if cache_value is not None else None,
@@ -661,8 +756,8 @@ class BaseViz:
         }
 
     def json_dumps(self, obj: Any, sort_keys: bool = False) -> str:
-        return json.dumps(
-            obj, default=utils.json_int_dttm_ser, ignore_nan=True, sort_keys=sort_keys
+        return utils.fast_json_dumps(
+            obj, default=utils.json_int_dttm_ser, sort_keys=sort_keys
         )
 
     def has_error(self, payload: VizPayload) -> bool:
@@ -837,8 +932,8 @@ class TableViz(BaseViz):
         )
 
     def json_dumps(self, obj: Any, sort_keys: bool = False) -> str:
-        return json.dumps(
-            obj, default=utils.json_iso_dttm_ser, sort_keys=sort_keys, ignore_nan=True
+        return utils.fast_json_dumps(
+            obj, default=utils.json_iso_dttm_ser, sort_keys=sort_keys
         )
 
 
@@ -983,8 +1078,11 @@ class PivotTableViz(BaseViz):
         for column_name in groupby + columns:
             column = self.datasource.get_column(column_name)
             if column and column.is_temporal:
-                ts = df[column_name].apply(self._format_datetime)
-                df[column_name] = ts
+                # format each distinct timestamp once
+                values = df[column_name]
+                uniques = values.drop_duplicates()
+                formatted = uniques.map(self._format_datetime)
+                df[column_name] = values.map(pd.Series(formatted.values, index=uniques))
 
         if self.form_data.get("transpose_pivot"):
             groupby, columns = columns, groupby
@@ -1285,6 +1383,7 @@ class NVD3TimeSeriesViz(NVD3Viz):
     verbose_name = _("Time Series - Line Chart")
     sort_series = False
     is_timeseries = True
+    incremental_cache = True
     pivot_fill_value: Optional[int] = None
 
     def query_obj(self) -> QueryObjectDict:
@@ -1310,12 +1409,12 @@ class NVD3TimeSeriesViz(NVD3Viz):
             else:
                 cols.append(col)
         df.columns = cols
-        series = df.to_dict("series")
 
+        index = df.index.tolist()
         chart_data = []
-        for name in df.T.index.tolist():
-            ys = series[name]
-            if df[name].dtype.kind not in "biufc":
+        for i, name in enumerate(df.columns.tolist()):
+            ys = df.iloc[:, i]
+            if ys.dtype.kind not in "biufc" or not ys.notna().any():
                 continue
             series_title: Union[List[str], str, Tuple[str, ...]]
             if isinstance(name, list):
@@ -1339,19 +1438,11 @@ class NVD3TimeSeriesViz(NVD3Viz):
                 elif isinstance(series_title, tuple):
                     series_title = series_title + (title_suffix,)
 
-            values = []
-            non_nan_cnt = 0
-            for ds in df.index:
-                if ds in ys:
-                    d = {"x": ds, "y": ys[ds]}
-                    if not np.isnan(ys[ds]):
-                        non_nan_cnt += 1
-                else:
-                    d = {}
-                values.append(d)
-
-            if non_nan_cnt == 0:
-                continue
+            values: Union[List[Dict[str, Any]], Dict[str, List[Any]]]
+            if self.columnar:
+                values = {"x": index, "y": ys.tolist()}
+            else:
+                values = [{"x": x, "y": y} for x, y in zip(index, ys.tolist())]
 
             d = {"key": series_title, "values": values}
             if classed:
@@ -1496,6 +1587,7 @@ class MultiLineViz(NVD3Viz):
     verbose_name = _("Time Series - Multiple Line Charts")
 
     is_timeseries = True
+    supports_columnar = False
 
     def query_obj(self) -> QueryObjectDict:
         return {}
@@ -1529,6 +1621,8 @@ class MultiLineViz(NVD3Viz):
                 chart_fd["extra_filters"] = multiline_fd["extra_filters"]
             if "time_range" in multiline_fd:
                 chart_fd["time_range"] = multiline_fd["time_range"]
+            # the values of the series are extended with the bounds below
+            chart_fd.pop("result_format", None)
             viz_obj = viz_types[chart.viz_type](
                 chart.datasource,
                 form_data=chart_fd,
@@ -1823,6 +1917,10 @@ class DistributionBarViz(BaseViz):
 
         # Re-order the columns adhering to the metric ordering.
         pt = pt[metrics]
+        xs = [
+            ", ".join([str(s) for s in x]) if isinstance(x, (tuple, list)) else str(x)
+            for x in pt.index
+        ]
         chart_data = []
         for name, ys in pt.items():
             if pt[name].dtype.kind not in "biufc" or name in self.groupby:
@@ -1832,14 +1930,11 @@ class DistributionBarViz(BaseViz):
             else:
                 offset = 0 if len(metrics) > 1 else 1
                 series_title = ", ".join([str(s) for s in name[offset:]])
-            values = []
-            for i, v in ys.items():
-                x = i
-                if isinstance(x, (tuple, list)):
-                    x = ", ".join([str(s) for s in x])
-                else:
-                    x = str(x)
-                values.append({"x": x, "y": v})
+            values: Union[List[Dict[str, Any]], Dict[str, List[Any]]]
+            if self.columnar:
+                values = {"x": xs, "y": ys.tolist()}
+            else:
+                values = [{"x": x, "y": y} for x, y in zip(xs, ys.tolist())]
             d = {"key": series_title, "values": values}
             chart_data.append(d)
         return chart_data
@@ -2230,13 +2325,14 @@ class HeatmapViz(BaseViz):
             if len(gb) <= 1:
                 overall = True
             else:
-                df["perc"] = gb.apply(
-                    lambda x: (x.v - x.v.min()) / (x.v.max() - x.v.min())
-                )
-                df["rank"] = gb.apply(lambda x: x.v.rank(pct=True))
+                group_min = gb.v.transform("min")
+                df["perc"] = (df.v - group_min) / (gb.v.transform("max") - group_min)
+                df["rank"] = gb.v.rank(pct=True)
         if overall:
             df["perc"] = (df.v - min_) / (max_ - min_)
             df["rank"] = df.v.rank(pct=True)
+        if self.columnar:
+            return {"columns": df_to_columns(df)["data"], "extents": [min_, max_]}
         return {"records": df.to_dict(orient="records"), "extents": [min_, max_]}
 
 
@@ -2252,6 +2348,7 @@ class HorizonViz(NVD3TimeSeriesViz):
         '<a href="https://www.npmjs.com/package/d3-horizon-chart">'
         "d3-horizon-chart</a>"
     )
+    supports_columnar = False
 
 
 class MapboxViz(BaseViz):
@@ -2455,6 +2552,24 @@ class BaseDeckGLViz(BaseViz):
         except Exception:
             raise SpatialException(_("Invalid spatial point encountered: %s" % s))
 
+    @staticmethod
+    def parse_points(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Parse a column of points, as `parse_coordinates`.
+
+        :param values: The points
+        :returns: The latitudes and the longitudes, NaN for the empty points
+        """
+        try:
+            latitudes, longitudes, _altitudes = geo.geodetic_parse(
+                values, allow_empty=True
+            )
+        except ValueError as ex:
+            raise SpatialException(
+                _("Invalid spatial point encountered: %s" % ex.args[0])
+            )
+        return latitudes, longitudes
+
     @staticmethod
     def reverse_geohash_decode(geohash_code: str) -> Tuple[str, str]:
         lat, lng = geohash.decode(geohash_code)
@@ -2478,10 +2593,15 @@ class BaseDeckGLViz(BaseViz):
             )
         elif spatial.get("type") == "delimited":
             lon_lat_col = spatial.get("lonlatCol")
-            df[key] = df[lon_lat_col].apply(self.parse_coordinates)
+            latitudes, longitudes = self.parse_points(df[lon_lat_col])
+            df[key] = [
+                None if math.isnan(latitude) else (latitude, longitude)
+                for latitude, longitude in zip(latitudes.tolist(), longitudes.tolist())
+            ]
             del df[lon_lat_col]
         elif spatial.get("type") == "geohash":
-            df[key] = df[spatial.get("geohashCol")].map(self.reverse_geohash_decode)
+            latitudes, longitudes = geo.geohash_decode(df[spatial.get("geohashCol")])
+            df[key] = list(zip(longitudes.tolist(), latitudes.tolist()))
             del df[spatial.get("geohashCol")]
 
         if spatial.get("reverseCheckbox"):
@@ -2496,6 +2616,45 @@ class BaseDeckGLViz(BaseViz):
             )
         return df
 
+    def get_spatial_positions(self, key: str, df: pd.DataFrame) -> List[List[float]]:
+        """
+        Get the positions of a spatial control as vectors, the columnar counterpart
+        of `process_spatial_data_obj`.
+
+        :param key: The key of the spatial control
+        :param df: The DataFrame
+        :returns: The positions, as the pairs of `process_spatial_data_obj`
+        """
+        spatial = self.form_data.get(key)
+        if spatial is None:
+            raise ValueError(_("Bad spatial key"))
+
+        if spatial.get("type") == "latlong":
+            x = pd.to_numeric(df[spatial.get("lonCol")], errors="coerce")
+            y = pd.to_numeric(df[spatial.get("latCol")], errors="coerce")
+        elif spatial.get("type") == "delimited":
+            x, y = self.parse_points(df[spatial.get("lonlatCol")])
+        elif spatial.get("type") == "geohash":
+            y, x = geo.geohash_decode(df[spatial.get("geohashCol")])
+        else:
+            raise NullValueException(
+                _(
+                    "Encountered invalid NULL spatial entry, \
+                                       please consider filtering those out"
+                )
+            )
+
+        if spatial.get("reverseCheckbox"):
+            x, y = y, x
+        return np.column_stack((x, y)).tolist()
+
+    def get_weights(self, df: pd.DataFrame) -> Any:
+        """The weights of the points, the values of the metric or 1"""
+        weights = df.get(self.metric_label) if self.metric_label else None
+        if weights is None:
+            return 1
+        return weights.fillna(0).replace(0, 1)
+
     def add_null_filters(self) -> None:
         fd = self.form_data
         spatial_columns = set()
@@ -2556,6 +2715,15 @@ class BaseDeckGLViz(BaseViz):
         if df.empty:
             return None
 
+        if self.columnar:
+            columns = self.get_columns(df)
+            if columns is not None:
+                return {
+                    "columns": columns,
+                    "mapboxApiKey": config["MAPBOX_API_KEY"],
+                    "metricLabels": self.metric_labels,
+                }
+
         # Processing spatial info
         for key in self.spatial_control_keys:
             df = self.process_spatial_data_obj(key, df)
@@ -2577,6 +2745,40 @@ class BaseDeckGLViz(BaseViz):
     def get_properties(self, d: Dict[str, Any]) -> Dict[str, Any]:
         raise NotImplementedError()
 
+    def get_columns(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """
+        Get the columnar payload of the features, the lists of the values of each
+        of their properties, requested with the ``columnar`` result format.
+
+        :param df: The DataFrame
+        :returns: The properties, None if the viz only supports features
+        """
+        properties = self.get_property_columns(df)
+        if properties is None:
+            return None
+        series = {
+            name: value
+            for name, value in properties.items()
+            if isinstance(value, pd.Series)
+        }
+        data = df_to_columns(pd.DataFrame(series))["data"] if series else {}
+        columns = {name: data.get(name, value) for name, value in properties.items()}
+        js_columns = self.form_data.get("js_columns")
+        if js_columns:
+            columns["extraProps"] = df_to_columns(df[js_columns])["data"]
+        return columns
+
+    def get_property_columns(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """
+        Get the properties of all the features at once, each property being a
+        column, a list of values, one per feature, or a single value shared by all
+        the features.
+
+        :param df: The DataFrame
+        :returns: The properties, None if the viz only supports features
+        """
+        return None
+
 
 class DeckScatterViz(BaseDeckGLViz):
     """deck.gl's ScatterLayer"""
@@ -2615,6 +2817,16 @@ class DeckScatterViz(BaseDeckGLViz):
             DTTM_ALIAS: d.get(DTTM_ALIAS),
         }
 
+    def get_property_columns(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        metric = df.get(self.metric_label) if self.metric_label else None
+        return {
+            "metric": metric,
+            "radius": self.fixed_value if self.fixed_value else metric,
+            "cat_color": df.get(self.dim) if self.dim else None,
+            "position": self.get_spatial_positions("spatial", df),
+            DTTM_ALIAS: df.get(DTTM_ALIAS),
+        }
+
     def get_data(self, df: pd.DataFrame) -> VizData:
         fd = self.form_data
         self.metric_label = utils.get_metric_name(self.metric) if self.metric else None
@@ -2646,6 +2858,13 @@ class DeckScreengrid(BaseDeckGLViz):
             "__timestamp": d.get(DTTM_ALIAS) or d.get("__time"),
         }
 
+    def get_property_columns(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        return {
+            "position": self.get_spatial_positions("spatial", df),
+            "weight": self.get_weights(df),
+            "__timestamp": df.get(DTTM_ALIAS, df.get("__time")),
+        }
+
     def get_data(self, df: pd.DataFrame) -> VizData:
         self.metric_label = utils.get_metric_name(self.metric) if self.metric else None
         return super().get_data(df)
@@ -2664,6 +2883,12 @@ class DeckGrid(BaseDeckGLViz):
             "weight": (d.get(self.metric_label) if self.metric_label else None) or 1,
         }
 
+    def get_property_columns(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        return {
+            "position": self.get_spatial_positions("spatial", df),
+            "weight": self.get_weights(df),
+        }
+
     def get_data(self, df: pd.DataFrame) -> VizData:
         self.metric_label = utils.get_metric_name(self.metric) if self.metric else None
         return super().get_data(df)
@@ -2768,6 +2993,12 @@ class DeckHex(BaseDeckGLViz):
             "weight": (d.get(self.metric_label) if self.metric_label else None) or 1,
         }
 
+    def get_property_columns(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        return {
+            "position": self.get_spatial_positions("spatial", df),
+            "weight": self.get_weights(df),
+        }
+
     def get_data(self, df: pd.DataFrame) -> VizData:
         self.metric_label = utils.get_metric_name(self.metric) if self.metric else None
         return super(DeckHex, self).get_data(df)
@@ -2813,6 +3044,15 @@ class DeckArc(BaseDeckGLViz):
             DTTM_ALIAS: d.get(DTTM_ALIAS),
         }
 
+    def get_property_columns(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        dim = self.form_data.get("dimension")
+        return {
+            "sourcePosition": self.get_spatial_positions("start_spatial", df),
+            "targetPosition": self.get_spatial_positions("end_spatial", df),
+            "cat_color": df.get(dim) if dim else None,
+            DTTM_ALIAS: df.get(DTTM_ALIAS),
+        }
+
     def get_data(self, df: pd.DataFrame) -> VizData:
         if df.empty:
             return None
@@ -2820,8 +3060,9 @@ class DeckArc(BaseDeckGLViz):
         d = super().get_data(df)
 
         return {
-            "features": d["features"],  # type: ignore
-            "mapboxApiKey": config["MAPBOX_API_KEY"],
+            key: value
+            for key, value in d.items()  # type: ignore
+            if key in ("features", "columns", "mapboxApiKey")
         }
 
 
@@ -2929,6 +3170,7 @@ class RoseViz(NVD3TimeSeriesViz):
     verbose_name = _("Time Series - Nightingale Rose Chart")
     sort_series = False
     is_timeseries = True
+    supports_columnar = False
 
     def get_data(self, df: pd.DataFrame) -> VizData:
         if df.empty:
@@ -2961,6 +3203,7 @@ class PartitionViz(NVD3TimeSeriesViz):
 
     viz_type = "partition"
     verbose_name = _("Partition Diagram")
+    supports_columnar = False
 
     def query_obj(self) -> QueryObjectDict:
         query_obj = super().query_obj()
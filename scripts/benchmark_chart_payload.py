@@ -0,0 +1,74 @@
+import time
+from typing import Any, Callable, Dict
+
+import click
+import numpy as np
+import pandas as pd
+import simplejson
+
+from rabbitai.dataframe import df_to_columns, df_to_records
+from rabbitai.utils.core import fast_json_dumps, json_int_dttm_ser
+
+
+def generate_df(rows: int) -> pd.DataFrame:
+    """
+    生成一个包含常见图表数据列类型的数据帧。
+
+    :param rows: 行数。
+    :return:
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "__timestamp": pd.date_range("2000-01-01", periods=rows, freq="min"),
+            "name": rng.choice(["a", "b", "c", "=d", None], rows),
+            "count": rng.integers(0, 1000, rows),
+            "big_id": rng.integers(2 ** 60, 2 ** 62, rows),
+            "sum__num": rng.random(rows),
+        }
+    )
+    df.loc[df.index % 10 == 0, "sum__num"] = np.nan
+    return df
+
+
+def benchmark(func: Callable[[], Any], repeat: int) -> float:
+    """返回多次执行中的最短耗时（秒）。"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+@click.command()
+@click.option("--rows", default=100000, help="Number of rows of the DataFrame.")
+@click.option("--repeat", default=5, help="Number of runs of each method.")
+def main(rows: int = 100000, repeat: int = 5) -> None:
+    df = generate_df(rows)
+    print(f"Serializing a DataFrame of {rows} rows, best of {repeat} runs\n")
+
+    methods: Dict[str, Callable[[], Any]] = {
+        "records (to_dict + simplejson)": lambda: simplejson.dumps(
+            df.to_dict(orient="records"), default=json_int_dttm_ser, ignore_nan=True
+        ),
+        "records (df_to_records + simplejson)": lambda: simplejson.dumps(
+            df_to_records(df), default=json_int_dttm_ser, ignore_nan=True
+        ),
+        "records (df_to_records + fast_json_dumps)": lambda: fast_json_dumps(
+            df_to_records(df)
+        ),
+        "columnar (df_to_columns + fast_json_dumps)": lambda: fast_json_dumps(
+            df_to_columns(df)
+        ),
+    }
+    results = {label: benchmark(func, repeat) for label, func in methods.items()}
+    sizes = {label: len(func()) for label, func in methods.items()}
+
+    print("Results:\n")
+    for label, duration in results.items():
+        print(f"{label}: {duration:.3f} s, {sizes[label] / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
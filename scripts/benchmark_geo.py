@@ -0,0 +1,99 @@
+import time
+from typing import Any, Callable, Dict, Tuple
+
+import click
+import geohash as geohash_lib
+import numpy as np
+import pandas as pd
+from geopy.point import Point
+
+from rabbitai.utils import geo
+
+
+def generate_df(rows: int) -> pd.DataFrame:
+    """
+    生成一个包含经纬度、地理哈希和地理坐标字符串列的数据帧。
+
+    :param rows: 行数。
+    :return:
+    """
+    rng = np.random.default_rng(0)
+    latitudes = rng.uniform(-90, 90, rows)
+    longitudes = rng.uniform(-180, 180, rows)
+    return pd.DataFrame(
+        {
+            "latitude": latitudes,
+            "longitude": longitudes,
+            "geohash": geo.geohash_encode(latitudes, longitudes),
+            "geodetic": [
+                f"{latitude:.8f}, {longitude:.8f}, {altitude:.1f}m"
+                for latitude, longitude, altitude in zip(
+                    latitudes, longitudes, rng.uniform(0, 1000, rows)
+                )
+            ],
+        }
+    )
+
+
+def benchmark(func: Callable[[], Any], repeat: int) -> float:
+    """返回多次执行中的最短耗时（秒）。"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def parse_location(location: str) -> Tuple[float, float, float]:
+    point = Point(location)
+    return point[0], point[1], point[2]
+
+
+@click.command()
+@click.option("--rows", default=100000, help="Number of rows of the DataFrame.")
+@click.option("--repeat", default=3, help="Number of runs of each method.")
+def main(rows: int = 100000, repeat: int = 3) -> None:
+    df = generate_df(rows)
+    print(f"Processing the geospatial columns of {rows} rows, best of {repeat} runs\n")
+
+    methods: Dict[str, Dict[str, Callable[[], Any]]] = {
+        "geohash decode": {
+            "per row": lambda: list(zip(*df["geohash"].apply(geohash_lib.decode))),
+            "vectorized": lambda: geo.geohash_decode(df["geohash"]),
+        },
+        "geohash encode": {
+            "per row": lambda: df.apply(
+                lambda row: geohash_lib.encode(row["latitude"], row["longitude"]),
+                axis=1,
+            ),
+            "vectorized": lambda: geo.geohash_encode(df["latitude"], df["longitude"]),
+        },
+        "geodetic parse": {
+            "per row": lambda: list(zip(*df["geodetic"].apply(parse_location))),
+            "vectorized": lambda: geo.geodetic_parse(df["geodetic"]),
+        },
+        "deck.gl positions": {
+            "features": lambda: [
+                {"position": position}
+                for position in zip(*geo.geohash_decode(df["geohash"])[::-1])
+            ],
+            "columnar": lambda: np.column_stack(
+                geo.geohash_decode(df["geohash"])[::-1]
+            ).tolist(),
+        },
+    }
+
+    print("Results:\n")
+    for operation, implementations in methods.items():
+        durations = {
+            label: benchmark(func, repeat) for label, func in implementations.items()
+        }
+        results = ", ".join(
+            f"{label}: {duration:.3f} s" for label, duration in durations.items()
+        )
+        print(f"{operation}: {results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import time
+from typing import Dict, List, Optional
+from unittest import mock
+
+import click
+from flask.testing import FlaskClient
+
+from rabbitai.app import create_app
+from rabbitai.security.manager import CompiledPermissions, RabbitaiSecurityManager
+
+ENDPOINTS = ["/api/v1/chart/", "/api/v1/dashboard/", "/api/v1/dataset/"]
+
+
+def benchmark(client: FlaskClient, url: str, repeat: int) -> float:
+    """返回多次请求中的最短耗时（秒）。"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        durations.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.data
+    return min(durations)
+
+
+def compile_on_each_check(
+    self: RabbitaiSecurityManager, user_id: Optional[int]
+) -> CompiledPermissions:
+    """每次权限检查都查询数据库，即编译权限之前的行为。"""
+    return self._compile_permissions(user_id)  # pylint: disable=protected-access
+
+
+@click.command()
+@click.option("--username", default="admin", help="User requesting the endpoints.")
+@click.option("--password", default="general", help="Password of the user.")
+@click.option("--repeat", default=20, help="Number of requests to each endpoint.")
+def main(username: str = "admin", password: str = "general", repeat: int = 20) -> None:
+    app = create_app()
+    client = app.test_client()
+    client.post(
+        "/login/",
+        data={"username": username, "password": password},
+        follow_redirects=True,
+    )
+    print(f"Requesting the list endpoints as {username}, best of {repeat} runs\n")
+
+    results: Dict[str, List[float]] = {url: [] for url in ENDPOINTS}
+    with mock.patch.object(
+        RabbitaiSecurityManager, "get_compiled_permissions", compile_on_each_check
+    ):
+        for url in ENDPOINTS:
+            results[url].append(benchmark(client, url, repeat))
+    for url in ENDPOINTS:
+        results[url].append(benchmark(client, url, repeat))
+
+    print("Results (queried on each check -> compiled):\n")
+    for url, (before, after) in results.items():
+        print(f"{url}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
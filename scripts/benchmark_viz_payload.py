@@ -0,0 +1,118 @@
+import time
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+import click
+import numpy as np
+import pandas as pd
+import simplejson
+
+from rabbitai.app import create_app
+
+
+def generate_df(groups: int, timestamps: int) -> pd.DataFrame:
+    """
+    生成一个时间序列数据帧，每个分组在每个时间点都有一行。
+
+    :param groups: 分组数。
+    :param timestamps: 时间点数。
+    :return:
+    """
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "__timestamp": np.tile(
+                pd.date_range("2000-01-01", periods=timestamps, freq="min"), groups
+            ),
+            "name": np.repeat([f"group {i}" for i in range(groups)], timestamps),
+            "sum__num": rng.random(groups * timestamps),
+        }
+    )
+
+
+def benchmark(func: Callable[[], Any], repeat: int) -> float:
+    """返回多次执行中的最短耗时（秒）。"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def legacy_values(df: pd.DataFrame) -> List[List[Dict[str, Any]]]:
+    """逐点构建时间序列的值，即向量化之前的实现。"""
+    series = df.to_dict("series")
+    chart_data = []
+    for name in df.T.index.tolist():
+        ys = series[name]
+        chart_data.append([{"x": ds, "y": ys[ds]} for ds in df.index if ds in ys])
+    return chart_data
+
+
+@click.command()
+@click.option("--groups", default=100, help="Number of series.")
+@click.option("--timestamps", default=10000, help="Number of points of each series.")
+@click.option("--repeat", default=3, help="Number of runs of each method.")
+def main(groups: int = 100, timestamps: int = 10000, repeat: int = 3) -> None:
+    app = create_app()
+    with app.app_context():
+        # pylint: disable=import-outside-toplevel
+        from rabbitai import viz
+        from rabbitai.utils.core import json_int_dttm_ser
+
+        df = generate_df(groups, timestamps)
+        print(
+            f"Building the payloads of {groups} series of {timestamps} points, "
+            f"best of {repeat} runs\n"
+        )
+
+        def get_data(viz_class: Any, form_data: Dict[str, Any]) -> Any:
+            viz_obj = viz_class(mock.Mock(), form_data)
+            data = viz_obj.get_data(df.copy())
+            return simplejson.dumps(data, default=json_int_dttm_ser, ignore_nan=True)
+
+        line = {"viz_type": "line", "groupby": ["name"], "metrics": ["sum__num"]}
+        dist_bar = {
+            "viz_type": "dist_bar",
+            "groupby": ["__timestamp"],
+            "columns": ["name"],
+            "metrics": ["sum__num"],
+        }
+        heatmap = {
+            "viz_type": "heatmap",
+            "all_columns_x": "name",
+            "all_columns_y": "__timestamp",
+            "metric": "sum__num",
+            "normalize_across": "x",
+        }
+        pivoted = viz.NVD3TimeSeriesViz(mock.Mock(), line).process_data(df.copy())
+        methods: Dict[str, Callable[[], Any]] = {
+            "line values (legacy, per point)": lambda: legacy_values(pivoted),
+            "line values (vectorized)": lambda: viz.NVD3TimeSeriesViz(
+                mock.Mock(), line
+            ).to_series(pivoted.copy()),
+            "line payload (records)": lambda: get_data(viz.NVD3TimeSeriesViz, line),
+            "line payload (columnar)": lambda: get_data(
+                viz.NVD3TimeSeriesViz, {**line, "result_format": "columnar"}
+            ),
+            "dist_bar payload (records)": lambda: get_data(
+                viz.DistributionBarViz, dist_bar
+            ),
+            "dist_bar payload (columnar)": lambda: get_data(
+                viz.DistributionBarViz, {**dist_bar, "result_format": "columnar"}
+            ),
+            "heatmap payload (records)": lambda: get_data(viz.HeatmapViz, heatmap),
+            "heatmap payload (columnar)": lambda: get_data(
+                viz.HeatmapViz, {**heatmap, "result_format": "columnar"}
+            ),
+        }
+        results = {label: benchmark(func, repeat) for label, func in methods.items()}
+
+    print("Results:\n")
+    for label, duration in results.items():
+        print(f"{label}: {duration:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -130,6 +130,7 @@ setup(
         "mmsql": ["pymssql>=2.1.4, <2.2"],
         "mysql": ["mysqlclient==1.4.2.post1"],
         "oracle": ["cx-Oracle>8.0.0, <8.1"],
+        "orjson": ["orjson>=3.5.0, <4"],
         "pinot": ["pinotdb>=0.3.3, <0.4"],
         "postgres": ["psycopg2-binary==2.8.5"],
         "presto": ["pyhive[presto]>=0.4.0"],
@@ -1,10 +1,17 @@
 """Unit tests for Rabbitai with caching"""
 import json
+import threading
+import time
+from unittest import mock
 
+import pandas as pd
 import pytest
+from cachelib import SimpleCache
 
 from rabbitai import app, db
 from rabbitai.extensions import cache_manager
+from rabbitai.utils.cache import set_and_log_cache, single_flight
+from rabbitai.utils.cache_codec import ArrowDataCacheCodec
 from rabbitai.utils.core import QueryStatus
 from tests.fixtures.birth_names_dashboard import load_birth_names_dashboard_with_slices
 
@@ -84,3 +91,86 @@ class TestCache(RabbitaiTestCase):
         app.config["DATA_CACHE_CONFIG"] = data_cache_config
         app.config["CACHE_DEFAULT_TIMEOUT"] = cache_default_timeout
         cache_manager.init_app(app)
+
+
+class TestSetAndLogCache(RabbitaiTestCase):
+    @mock.patch.dict(app.config, {"DATA_CACHE_MAX_VALUE_SIZE": 10})
+    @mock.patch("rabbitai.utils.cache.stats_logger")
+    def test_set_and_log_cache_value_too_large(self, stats_logger):
+        with mock.patch.object(cache_manager, "_data_codec", ArrowDataCacheCodec()):
+            set_and_log_cache(
+                cache_manager.data_cache,
+                "key",
+                {"df": pd.DataFrame({"a": [1]}), "query": "SELECT 1"},
+                datasource_uid="1__table",
+            )
+
+        stats_logger.incr.assert_called_once_with("set_cache_key.too_large")
+        stats_logger.gauge.assert_called_once_with(
+            "data_cache.value_size.1__table", mock.ANY
+        )
+        self.assertIsNone(cache_manager.data_cache.get("key"))
+
+    @mock.patch("rabbitai.utils.cache.stats_logger")
+    def test_set_and_log_cache_failed(self, stats_logger):
+        cache = mock.Mock()
+        cache.set.return_value = False
+        set_and_log_cache(cache, "key", {"query": "SELECT 1"})
+        stats_logger.incr.assert_called_once_with("set_cache_key.failed")
+
+
+class TestSingleFlight(RabbitaiTestCase):
+    @mock.patch.dict(app.config, {"DATA_CACHE_SINGLE_FLIGHT": False})
+    def test_single_flight_disabled(self):
+        cache = SimpleCache()
+        cache.set("key", {"df": 1})
+        with single_flight(cache, "key") as value:
+            self.assertIsNone(value)
+        self.assertIsNone(cache.get("key__lock"))
+
+    @mock.patch.dict(
+        app.config,
+        {
+            "DATA_CACHE_SINGLE_FLIGHT": True,
+            "DATA_CACHE_SINGLE_FLIGHT_POLL_INTERVAL": 0.01,
+        },
+    )
+    def test_single_flight_coalesces_concurrent_requests(self):
+        cache = SimpleCache()
+        computed = []
+        results = []
+
+        def request():
+            with single_flight(cache, "key") as value:
+                if value is None:
+                    computed.append(True)
+                    time.sleep(0.1)
+                    value = {"df": 1}
+                    cache.set("key", value)
+                results.append(value)
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(computed), 1)
+        self.assertEqual(results, [{"df": 1}] * 5)
+        self.assertIsNone(cache.get("key__lock"))
+
+    @mock.patch.dict(
+        app.config,
+        {
+            "DATA_CACHE_SINGLE_FLIGHT": True,
+            "DATA_CACHE_SINGLE_FLIGHT_POLL_INTERVAL": 0.01,
+            "DATA_CACHE_SINGLE_FLIGHT_WAIT_TIMEOUT": 0.05,
+        },
+    )
+    def test_single_flight_wait_timeout(self):
+        cache = SimpleCache()
+        # lock held by another process
+        cache.add("key__lock", "token")
+        with single_flight(cache, "key") as value:
+            self.assertIsNone(value)
+        self.assertEqual(cache.get("key__lock"), "token")
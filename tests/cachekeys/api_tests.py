@@ -1,11 +1,13 @@
 # isort:skip_file
 """Unit tests for Rabbitai"""
+import json
 from typing import Dict, Any
 
 from tests.test_app import app  # noqa
 
 from rabbitai.extensions import cache_manager, db
 from rabbitai.models.cache import CacheKey
+from rabbitai.utils.core import memoized
 from tests.base_tests import (
     RabbitaiTestCase,
     post_assert_metric,
@@ -145,3 +147,35 @@ def test_invalidate_existing_caches(logged_in_admin):
         .datasource_uid
         == "X__table"
     )
+
+
+def test_memoized_caches(logged_in_admin):
+    @memoized
+    def memoized_function(a):
+        return a
+
+    memoized_function(1)
+    name = memoized_function.name
+
+    rv = test_client.get("api/v1/cachekey/memoized")
+    assert rv.status_code == 200
+    stats = {s["name"]: s for s in json.loads(rv.data)["result"]}
+    assert stats[name]["size"] == 1
+
+    rv = post_assert_metric(
+        test_client,
+        "api/v1/cachekey/memoized/clear",
+        {"names": [name]},
+        "clear_memoized",
+    )
+    assert rv.status_code == 200
+    assert json.loads(rv.data) == {"cleared": 1}
+    assert memoized_function.stats()["size"] == 0
+
+    rv = post_assert_metric(
+        test_client,
+        "api/v1/cachekey/memoized/clear",
+        {"names": "name"},
+        "clear_memoized",
+    )
+    assert rv.status_code == 400
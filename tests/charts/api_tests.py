@@ -21,6 +21,7 @@ from sqlalchemy.sql import func
 from tests.fixtures.world_bank_dashboard import load_world_bank_dashboard_with_slices
 from tests.test_app import app
 from rabbitai.charts.commands.data import ChartDataCommand
+from rabbitai.common.query_context import QueryContext
 from rabbitai.connectors.sqla.models import SqlaTable, TableColumn
 from rabbitai.errors import RabbitaiErrorType
 from rabbitai.extensions import async_query_manager, cache_manager, db
@@ -1167,6 +1168,70 @@ class TestChartApi(RabbitaiTestCase, ApiOwnersTestCaseMixin, InsertChartMixin):
         rv = self.post_assert_metric(CHART_DATA_URI, request_payload, "data")
         self.assertEqual(rv.status_code, 200)
 
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_chart_data_columnar_result_format(self):
+        """
+        Chart data API: Test chart data with columnar result format
+        """
+        self.login(username="admin")
+        request_payload = get_query_context("birth_names")
+        request_payload["result_format"] = "columnar"
+        rv = self.post_assert_metric(CHART_DATA_URI, request_payload, "data")
+        self.assertEqual(rv.status_code, 200)
+        result = json.loads(rv.data.decode("utf-8"))["result"][0]
+        data = result["data"]
+        self.assertEqual(data["columns"], result["colnames"])
+        self.assertEqual(
+            [len(values) for values in data["data"].values()],
+            [result["rowcount"]] * len(data["columns"]),
+        )
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_chart_data_batch(self):
+        """
+        Chart data API: Test batch chart data, with identical query objects computed
+        once and errors reported per query context
+        """
+        self.login(username="admin")
+        request_payload = get_query_context("birth_names")
+        invalid_payload = get_query_context("birth_names")
+        invalid_payload["result_format"] = "csv"
+        with mock.patch(
+            "rabbitai.common.query_context.QueryContext.get_query_object_payload",
+            autospec=True,
+            side_effect=QueryContext.get_query_object_payload,
+        ) as get_query_object_payload:
+            rv = self.post_assert_metric(
+                f"{CHART_DATA_URI}/batch",
+                {"queries": [request_payload, invalid_payload, request_payload]},
+                "data_batch",
+            )
+            self.assertEqual(rv.status_code, 200)
+            self.assertEqual(rv.mimetype, "application/x-ndjson")
+            lines = [json.loads(line) for line in rv.data.decode("utf-8").splitlines()]
+            self.assertEqual(
+                get_query_object_payload.call_count, len(request_payload["queries"])
+            )
+
+        results = {line["index"]: line for line in lines}
+        self.assertEqual(sorted(results), [0, 1, 2])
+        self.assertEqual(results[1]["status"], 400)
+        self.assertEqual(results[0]["result"], results[2]["result"])
+        self.assertEqual(
+            results[0]["result"][0]["rowcount"],
+            self.get_expected_row_count("client_id_1"),
+        )
+
+    def test_chart_data_batch_empty(self):
+        """
+        Chart data API: Test batch chart data without query contexts
+        """
+        self.login(username="admin")
+        rv = self.post_assert_metric(
+            f"{CHART_DATA_URI}/batch", {"queries": []}, "data_batch"
+        )
+        self.assertEqual(rv.status_code, 400)
+
     # Test chart csv without permission
     @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
     def test_chart_data_csv_result_format_permission_denined(self):
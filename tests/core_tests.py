@@ -1,5 +1,6 @@
 # isort:skip_file
 """Unit tests for Rabbitai"""
+import copy
 import csv
 import datetime
 import doctest
@@ -19,7 +20,9 @@ import unittest
 from unittest import mock
 
 import pandas as pd
+import pyarrow as pa
 import sqlalchemy as sqla
+from cachelib import SimpleCache
 from sqlalchemy.exc import SQLAlchemyError
 from rabbitai.models.cache import CacheKey
 from rabbitai.utils.core import get_example_database
@@ -36,7 +39,7 @@ from rabbitai import (
 from rabbitai.connectors.sqla.models import SqlaTable
 from rabbitai.db_engine_specs.base import BaseEngineSpec
 from rabbitai.db_engine_specs.mssql import MssqlEngineSpec
-from rabbitai.exceptions import RabbitaiException
+from rabbitai.exceptions import QueryObjectValidationError, RabbitaiException
 from rabbitai.extensions import async_query_manager
 from rabbitai.models import core as models
 from rabbitai.models.annotations import Annotation, AnnotationLayer
@@ -46,8 +49,10 @@ from rabbitai.models.slice import Slice
 from rabbitai.models.sql_lab import Query
 from rabbitai.result_set import RabbitaiResultSet
 from rabbitai.utils import core as utils
+from rabbitai.utils.results_backend import write_arrow_results
 from rabbitai.views import core as views
 from rabbitai.views.database.views import DatabaseView
+from rabbitai.views.utils import apply_results_window
 
 from .base_tests import RabbitaiTestCase
 from tests.fixtures.world_bank_dashboard import load_world_bank_dashboard_with_slices
@@ -1227,6 +1232,109 @@ class TestCore(RabbitaiTestCase):
 
         app.config["RESULTS_BACKEND_USE_MSGPACK"] = use_msgpack
 
+    def test_display_limit_arrow_results(self):
+        self.login()
+
+        results_backend = SimpleCache()
+        table = pa.table({"col_0": list(range(100))})
+        payload = {
+            "status": utils.QueryStatus.SUCCESS,
+            "query": {"rows": 100},
+            "columns": [{"name": "col_0", "type": "INT", "is_date": False}],
+            "selected_columns": [{"name": "col_0", "type": "INT", "is_date": False}],
+            "expanded_columns": [],
+        }
+        write_arrow_results(results_backend, "key", payload, table, 60, batch_rows=10)
+
+        query_mock = mock.Mock()
+        query_mock.database.db_engine_spec = BaseEngineSpec
+
+        with mock.patch("rabbitai.views.core.results_backend", results_backend):
+            with mock.patch("rabbitai.views.core.db") as mock_rabbitai_db:
+                mock_rabbitai_db.session.query().filter_by().one_or_none.return_value = (
+                    query_mock
+                )
+                with mock.patch.object(
+                    results_backend, "get_many", wraps=results_backend.get_many
+                ) as get_many:
+                    result_limited = json.loads(
+                        self.get_resp("/rabbitai/results/key/?rows=1")
+                    )
+                    # only the first batch is read from the results backend
+                    get_many.assert_called_once_with("key/batch/0")
+                result_key = json.loads(self.get_resp("/rabbitai/results/key/"))
+
+        self.assertEqual(result_limited["data"], [{"col_0": 0}])
+        self.assertTrue(result_limited["displayLimitReached"])
+        self.assertEqual(result_key["data"], [{"col_0": i} for i in range(100)])
+        self.assertNotIn("batches", result_key)
+
+    def test_results_window_arrow_results(self):
+        self.login()
+
+        results_backend = SimpleCache()
+        table = pa.table({"col_0": list(range(100))})
+        payload = {
+            "status": utils.QueryStatus.SUCCESS,
+            "query": {"rows": 100},
+            "columns": [{"name": "col_0", "type": "INT", "is_date": False}],
+            "selected_columns": [{"name": "col_0", "type": "INT", "is_date": False}],
+            "expanded_columns": [],
+        }
+        write_arrow_results(results_backend, "key", payload, table, 60, batch_rows=10)
+
+        query_mock = mock.Mock()
+        query_mock.database.db_engine_spec = BaseEngineSpec
+        query_mock.database.cache_timeout = None
+
+        with mock.patch("rabbitai.views.core.results_backend", results_backend):
+            with mock.patch("rabbitai.views.core.db") as mock_rabbitai_db:
+                mock_rabbitai_db.session.query().filter_by().one_or_none.return_value = (
+                    query_mock
+                )
+                with mock.patch.object(
+                    results_backend, "get_many", wraps=results_backend.get_many
+                ) as get_many:
+                    result = json.loads(
+                        self.get_resp(
+                            "/rabbitai/results/key/window/?offset=15&limit=10"
+                        )
+                    )
+                    # only the batches holding the window are read
+                    get_many.assert_called_once_with("key/batch/1", "key/batch/2")
+                result_sorted = json.loads(
+                    self.get_resp(
+                        "/rabbitai/results/key/window/"
+                        "?offset=5&limit=3&order_by=col_0&order_desc=true"
+                    )
+                )
+                resp = self.client.get("/rabbitai/results/key/window/?order_by=unknown")
+                self.assertEqual(resp.status_code, 400)
+                resp = self.client.get("/rabbitai/results/key/window/?offset=-1")
+                self.assertEqual(resp.status_code, 400)
+
+        self.assertEqual(result["data"], [{"col_0": i} for i in range(15, 25)])
+        self.assertEqual(result["offset"], 15)
+        self.assertEqual(result["limit"], 10)
+        self.assertEqual(result["totalRows"], 100)
+        self.assertEqual(result_sorted["data"], [{"col_0": i} for i in (94, 93, 92)])
+
+    def test_apply_results_window(self):
+        sql_results = {
+            "selected_columns": [{"name": "a"}, {"name": "b"}],
+            "data": [{"a": 2, "b": "x"}, {"a": None, "b": "y"}, {"a": 1, "b": "z"}],
+        }
+        result = apply_results_window(
+            copy.deepcopy(sql_results), offset=1, limit=2, order_by="a"
+        )
+        self.assertEqual(result["data"], [{"a": 2, "b": "x"}, {"a": None, "b": "y"}])
+        result = apply_results_window(
+            copy.deepcopy(sql_results), order_by="a", order_desc=True
+        )
+        self.assertEqual([row["a"] for row in result["data"]], [2, 1, None])
+        with self.assertRaises(QueryObjectValidationError):
+            apply_results_window(copy.deepcopy(sql_results), order_by="c")
+
     def test_results_default_deserialization(self):
         use_new_deserialization = False
         data = [("a", 4, 4.0, "2019-08-18T16:39:16.660000")]
@@ -3,7 +3,7 @@ import numpy as np
 import pandas as pd
 
 import tests.test_app
-from rabbitai.dataframe import df_to_records
+from rabbitai.dataframe import df_to_columns, df_to_records
 from rabbitai.db_engine_specs import BaseEngineSpec
 from rabbitai.result_set import RabbitaiResultSet
 
@@ -35,3 +35,26 @@ class TestRabbitaiDataFrame(RabbitaiTestCase):
                 {"a": 2, "b": 100, "c": "c2"},
             ],
         )
+
+    def test_df_to_columns(self):
+        df = pd.DataFrame(
+            {
+                "a": [1, 1239162456494753670],
+                "b": [1.5, np.nan],
+                "c": ["c1", None],
+                "d": pd.to_datetime(["2020-01-01", None]),
+            }
+        )
+
+        self.assertEqual(
+            df_to_columns(df),
+            {
+                "columns": ["a", "b", "c", "d"],
+                "data": {
+                    "a": [1, "1239162456494753670"],
+                    "b": [1.5, None],
+                    "c": ["c1", None],
+                    "d": [1577836800000.0, None],
+                },
+            },
+        )
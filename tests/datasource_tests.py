@@ -221,6 +221,26 @@ class TestDatasource(RabbitaiTestCase):
             },
         )
 
+    def test_get_datasource_changed_by_another_session(self):
+        tbl = self.get_table_by_name("birth_names")
+        datasource = ConnectorRegistry.get_datasource("table", tbl.id, db.session)
+        description = datasource.description
+
+        other_session = db.create_scoped_session()
+        other_session.query(SqlaTable).filter_by(id=tbl.id).update(
+            {"description": "changed"}
+        )
+        other_session.commit()
+        try:
+            datasource = ConnectorRegistry.get_datasource("table", tbl.id, db.session)
+            self.assertEqual(datasource.description, "changed")
+        finally:
+            other_session.query(SqlaTable).filter_by(id=tbl.id).update(
+                {"description": description}
+            )
+            other_session.commit()
+            other_session.close()
+
     def test_get_datasource_with_health_check(self):
         def my_check(datasource):
             return "Warning message!"
@@ -257,6 +257,24 @@ class TestDbEngineSpecs(TestDbEngineSpec):
         result = BaseEngineSpec.pyodbc_rows_to_tuples(data)
         self.assertListEqual(result, data)
 
+    def test_fetch_data_batches(self):
+        rows = [(i,) for i in range(7)]
+        cursor = mock.Mock()
+        cursor.fetchmany.side_effect = lambda size: [
+            rows.pop(0) for _ in range(min(size, len(rows)))
+        ]
+        batches = list(BaseEngineSpec.fetch_data_batches(cursor, batch_size=3))
+        self.assertEqual(batches, [[(0,), (1,), (2,)], [(3,), (4,), (5,)], [(6,)]])
+
+    def test_fetch_data_batches_with_limit(self):
+        rows = [(i,) for i in range(7)]
+        cursor = mock.Mock()
+        cursor.fetchmany.side_effect = lambda size: [
+            rows.pop(0) for _ in range(min(size, len(rows)))
+        ]
+        batches = list(BaseEngineSpec.fetch_data_batches(cursor, 4, batch_size=3))
+        self.assertEqual(batches, [[(0,), (1,), (2,)], [(3,)]])
+
 
 def test_is_readonly():
     def is_readonly(sql: str) -> bool:
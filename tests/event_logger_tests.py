@@ -1,4 +1,5 @@
 import logging
+import threading
 import time
 import unittest
 from datetime import datetime, timedelta
@@ -9,8 +10,10 @@ from flask import current_app
 from freezegun import freeze_time
 
 from rabbitai import security_manager
+from rabbitai.utils.batch_worker import BatchWorker
 from rabbitai.utils.log import (
     AbstractEventLogger,
+    BufferedDBEventLogger,
     DBEventLogger,
     get_event_logger_from_cfg_value,
 )
@@ -96,6 +99,51 @@ class TestEventLogger(unittest.TestCase):
             )
             self.assertGreaterEqual(payload["duration_ms"], 100)
 
+    @patch.object(DBEventLogger, "save_logs")
+    def test_buffered_log(self, mock_save_logs):
+        logger = BufferedDBEventLogger(batch_size=2, flush_interval=0.1)
+        saved = threading.Event()
+        mock_save_logs.side_effect = lambda logs: saved.set()
+
+        with app.test_request_context():
+            logger.log(
+                None,
+                "foo",
+                dashboard_id=None,
+                duration_ms=1,
+                slice_id=None,
+                referrer=None,
+                records=[{"a": 1}, {"a": 2}, {"a": 3}],
+            )
+        self.assertTrue(saved.wait(5))
+        logs = mock_save_logs.call_args_list[0][0][0]
+        self.assertEqual([log.json for log in logs], ['{"a": 1}', '{"a": 2}'])
+        self.assertTrue(all(log.dttm for log in logs))
+
+    @patch.object(BatchWorker, "start")
+    @patch.object(DBEventLogger, "save_logs")
+    def test_buffered_log_drops_when_full(self, mock_save_logs, mock_start):
+        logger = BufferedDBEventLogger(max_queue_size=2)
+        logger._app = app
+
+        with app.test_request_context(), patch.object(
+            current_app.config["STATS_LOGGER"], "incr"
+        ) as mock_incr:
+            logger.log(
+                None,
+                "foo",
+                dashboard_id=None,
+                duration_ms=1,
+                slice_id=None,
+                referrer=None,
+                records=[{"a": 1}, {"a": 2}, {"a": 3}],
+            )
+        mock_incr.assert_called_once_with("event_logger.dropped")
+
+        logger.flush()
+        logs = mock_save_logs.call_args[0][0]
+        self.assertEqual([log.json for log in logs], ['{"a": 1}', '{"a": 2}'])
+
     @patch("rabbitai.utils.log.g", spec={})
     @freeze_time("Jan 14th, 2020", auto_tick_seconds=15)
     def test_context_manager_log(self, mock_g):
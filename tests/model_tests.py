@@ -95,7 +95,7 @@ class TestDatabaseModel(RabbitaiTestCase):
         user_name = make_url(model.get_sqla_engine(user_name=example_user).url).username
         self.assertNotEqual(example_user, user_name)
 
-    @mock.patch("rabbitai.models.core.create_engine")
+    @mock.patch("rabbitai.utils.engine_registry.create_engine")
     def test_impersonate_user_presto(self, mocked_create_engine):
         uri = "presto://localhost"
         principal_user = "logged_in_user"
@@ -141,7 +141,7 @@ class TestDatabaseModel(RabbitaiTestCase):
             "password": "original_user_password",
         }
 
-    @mock.patch("rabbitai.models.core.create_engine")
+    @mock.patch("rabbitai.utils.engine_registry.create_engine")
     def test_impersonate_user_hive(self, mocked_create_engine):
         uri = "hive://localhost"
         principal_user = "logged_in_user"
@@ -2,13 +2,19 @@
 from datetime import datetime
 from importlib.util import find_spec
 import math
+import os
 from typing import Any, List, Optional
 
+from unittest import mock
+
+from cachelib import SimpleCache
 from pandas import DataFrame, Series, Timestamp
 import pytest
 
 from rabbitai.exceptions import QueryObjectValidationError
+from rabbitai.extensions import cache_manager
 from rabbitai.utils import pandas_postprocessing as proc
+from rabbitai.utils.cache_codec import ArrowDataCacheCodec
 from rabbitai.utils.core import (
     DTTM_ALIAS,
     PostProcessingContributionOrientation,
@@ -588,6 +594,136 @@ class TestPostProcessing(RabbitaiTestCase):
         assert df[DTTM_ALIAS].iloc[-1].to_pydatetime() == datetime(2022, 5, 31)
         assert len(df) == 9
 
+    def test_prophet_cached_models(self):
+        def fit_and_predict(df, init=None, **kwargs):
+            forecast = df.set_index("ds").assign(
+                yhat=df["y"].values, yhat_lower=0, yhat_upper=1
+            )
+            forecast = forecast[["yhat", "yhat_lower", "yhat_upper", "y"]]
+            return forecast, {"k": len(df)}, 1.0
+
+        with mock.patch.object(cache_manager, "_data_cache", SimpleCache()), mock.patch(
+            "rabbitai.utils.pandas_postprocessing._prophet_fit_and_predict",
+            side_effect=fit_and_predict,
+        ) as fit:
+            df = proc.prophet(
+                df=prophet_df,
+                time_grain="P1M",
+                periods=3,
+                confidence_interval=0.9,
+                query_key="query",
+            )
+            self.assertEqual(fit.call_count, 2)
+            self.assertIsNone(fit.call_args[1]["init"])
+            self.assertListEqual(df["b__yhat"].tolist(), prophet_df["b"].tolist())
+
+            # the forecasts of unchanged series are reused
+            cached_df = proc.prophet(
+                df=prophet_df,
+                time_grain="P1M",
+                periods=3,
+                confidence_interval=0.9,
+                query_key="query",
+            )
+            self.assertEqual(fit.call_count, 2)
+            self.assertTrue(cached_df.equals(df))
+
+            # the models of changed series start from their last fit
+            changed_df = prophet_df.assign(a=[1.1, 1, 1.9, 4])
+            df = proc.prophet(
+                df=changed_df,
+                time_grain="P1M",
+                periods=3,
+                confidence_interval=0.9,
+                query_key="query",
+            )
+            self.assertEqual(fit.call_count, 3)
+            self.assertEqual(fit.call_args[1]["init"], {"k": 4})
+            self.assertListEqual(df["a__yhat"].tolist(), [1.1, 1, 1.9, 4])
+            self.assertListEqual(df["b__yhat"].tolist(), prophet_df["b"].tolist())
+
+            # the models of the series of other queries aren't shared
+            changed_df = prophet_df.assign(a=[1.2, 1, 1.9, 4])
+            proc.prophet(
+                df=changed_df,
+                time_grain="P1M",
+                periods=3,
+                confidence_interval=0.9,
+                query_key="other query",
+            )
+            self.assertEqual(fit.call_count, 5)
+            self.assertIsNone(fit.call_args[1]["init"])
+
+            # the series of unknown queries only reuse the forecasts of identical
+            # series
+            proc.prophet(
+                df=changed_df, time_grain="P1M", periods=3, confidence_interval=0.9,
+            )
+            self.assertEqual(fit.call_count, 7)
+            proc.prophet(
+                df=changed_df, time_grain="P1M", periods=3, confidence_interval=0.9,
+            )
+            self.assertEqual(fit.call_count, 7)
+
+    def test_prophet_broken_process_pool(self):
+        executor = mock.Mock()
+        executor.submit.return_value.result.side_effect = proc.BrokenProcessPool()
+        config = {"PROPHET_PROCESSES": 2}
+        with mock.patch.object(
+            proc, "_prophet_executor", (os.getpid(), executor)
+        ), mock.patch.dict(self.app.config, config), mock.patch.object(
+            cache_manager, "_data_cache", SimpleCache()
+        ):
+            with self.assertRaises(proc.BrokenProcessPool):
+                proc.prophet(
+                    df=prophet_df, time_grain="P1M", periods=3, confidence_interval=0.9
+                )
+            # the next forecasts start a new pool
+            self.assertIsNone(proc._prophet_executor)
+            executor.shutdown.assert_called_once_with(wait=False)
+
+    def test_prophet_cached_models_encoded(self):
+        def fit_and_predict(df, init=None, **kwargs):
+            forecast = df.set_index("ds").assign(
+                yhat=df["y"].values, yhat_lower=0, yhat_upper=1
+            )
+            return forecast, {"k": len(df)}, 1.0
+
+        data_cache = SimpleCache()
+        with mock.patch.object(cache_manager, "_data_cache", data_cache), mock.patch(
+            "rabbitai.utils.pandas_postprocessing._prophet_fit_and_predict",
+            side_effect=fit_and_predict,
+        ) as fit, mock.patch.object(
+            cache_manager, "_data_codec", ArrowDataCacheCodec()
+        ), mock.patch(
+            "rabbitai.utils.cache.cache_key_index"
+        ) as cache_key_index:
+            for _ in range(2):
+                proc.prophet(
+                    df=prophet_df,
+                    time_grain="P1M",
+                    periods=3,
+                    confidence_interval=0.9,
+                    query_key="query",
+                    datasource_uid="1__table",
+                )
+            # the forecasts are stored with the codec of the data cache, and indexed
+            # with the cached data of the datasource
+            self.assertEqual(fit.call_count, 2)
+            values = [data_cache.get(key) for key in data_cache._cache]
+            self.assertEqual(len(values), 2)
+            for value in values:
+                self.assertIsInstance(value, bytes)
+            self.assertEqual(cache_key_index.register.call_count, 2)
+
+    def test_prophet_processes_not_forked(self):
+        with mock.patch.object(proc, "_prophet_executor", None), mock.patch.object(
+            proc, "ProcessPoolExecutor"
+        ) as executor:
+            proc._get_prophet_executor(2)
+        start_method = executor.call_args[1]["mp_context"].get_start_method()
+        self.assertIn(start_method, ("forkserver", "spawn"))
+
     def test_prophet_import(self):
         prophet = find_spec("prophet")
         if prophet is None:
@@ -1,21 +1,29 @@
 import re
 from typing import Any, Dict
+from unittest import mock
 
+import pandas as pd
 import pytest
+from freezegun import freeze_time
 
 from rabbitai import db
 from rabbitai.charts.schemas import ChartDataQueryContextSchema
 from rabbitai.common.query_context import QueryContext
 from rabbitai.common.query_object import QueryObject
 from rabbitai.connectors.connector_registry import ConnectorRegistry
+from rabbitai.exceptions import QueryObjectValidationError
 from rabbitai.extensions import cache_manager
+from rabbitai.utils import pandas_postprocessing
 from rabbitai.utils.core import (
     AdhocMetricExpressionType,
     backend,
     ChartDataResultFormat,
     ChartDataResultType,
+    DTTM_ALIAS,
+    QueryStatus,
     TimeRangeEndpoint,
 )
+from rabbitai.utils.incremental_cache import get_partitions
 from tests.base_tests import RabbitaiTestCase
 from tests.fixtures.birth_names_dashboard import load_birth_names_dashboard_with_slices
 from tests.fixtures.query_context import get_query_context
@@ -27,8 +35,9 @@ def get_sql_text(payload: Dict[str, Any]) -> str:
     responses = query_context.get_payload()
     assert len(responses) == 1
     response = responses["queries"][0]
-    assert len(response) == 2
+    assert len(response) == 3
     assert response["language"] == "sql"
+    assert response["duration_ms"] >= 0
     return response["query"]
 
 
@@ -230,6 +239,119 @@ class TestQueryContext(RabbitaiTestCase):
         self.assertIn("name,sum__num\n", data)
         self.assertEqual(len(data.split("\n")), 12)
 
+    def test_concurrent_query_objects(self):
+        """
+        Ensure that query objects run concurrently return their results in order
+        """
+        self.login(username="admin")
+        payload = get_query_context("birth_names")
+        payload["queries"][0]["row_limit"] = 10
+        payload["queries"].append({**payload["queries"][0], "row_limit": 5})
+        query_context = ChartDataQueryContextSchema().load(payload)
+        with mock.patch.dict(self.app.config, {"CHART_DATA_QUERY_CONCURRENCY": 2}):
+            responses = query_context.get_payload()
+        self.assertEqual(
+            [response["rowcount"] for response in responses["queries"]], [10, 5]
+        )
+        for response in responses["queries"]:
+            self.assertGreaterEqual(response["duration_ms"], 0)
+
+    @freeze_time("2021-03-10 12:00:00")
+    def test_incremental_query_result(self):
+        """
+        Ensure that the days of the time range of a time series are cached whatever
+        its relative time range, and that only the missing and open days are queried
+        """
+        table = self.get_table_by_name("birth_names")
+        failed_days = set()
+
+        def get_query_result(query_object):
+            day = query_object.from_dttm.day
+            if day in failed_days:
+                return {
+                    "df": pd.DataFrame(),
+                    "query": f"SELECT {day}",
+                    "status": QueryStatus.FAILED,
+                    "error_message": "error",
+                }
+            return {
+                "df": pd.DataFrame(
+                    {DTTM_ALIAS: [query_object.from_dttm], "sum__num": [day]}
+                ),
+                "query": f"SELECT {day}",
+                "status": QueryStatus.SUCCESS,
+                "error_message": None,
+            }
+
+        def load_query_context(time_range):
+            payload = get_query_context(table.name, table.id)
+            payload["queries"][0].update(
+                {"is_timeseries": True, "orderby": [], "time_range": time_range}
+            )
+            query_context = ChartDataQueryContextSchema().load(payload)
+            query_object = query_context.queries[0]
+            for partition in get_partitions(
+                query_object.to_dict(), query_context.datasource
+            ):
+                cache_keys.add(
+                    query_context.partition_cache_key(query_object, partition)
+                )
+            return query_context, query_object
+
+        def get_queried_days(time_range):
+            query_context, query_object = load_query_context(time_range)
+            with mock.patch.object(
+                QueryContext, "get_query_result", side_effect=get_query_result
+            ) as mock_get_query_result:
+                result = query_context.get_incremental_query_result(query_object)
+            days = {
+                call[0][0].from_dttm.day
+                for call in mock_get_query_result.call_args_list
+            }
+            return result, days
+
+        cache_keys = set()
+        with mock.patch.dict(self.app.config, {"INCREMENTAL_TIMESERIES_CACHE": True}):
+            for time_range in (
+                "2021-03-07 : now",
+                "Last week",
+                "2021-03-01 : 2021-03-03",
+            ):
+                load_query_context(time_range)
+            for cache_key in cache_keys:
+                cache_manager.data_cache.delete(cache_key)
+            try:
+                result, days = get_queried_days("2021-03-07 : now")
+                self.assertEqual(days, {7, 8, 9, 10})
+                self.assertEqual(result["status"], QueryStatus.SUCCESS)
+                self.assertEqual(result["df"]["sum__num"].tolist(), [7, 8, 9, 10])
+
+                # only the open day is queried again
+                result, days = get_queried_days("2021-03-07 : now")
+                self.assertEqual(days, {10})
+                self.assertEqual(result["df"]["sum__num"].tolist(), [7, 8, 9, 10])
+
+                # the cached days are shared by the other time ranges including them
+                result, days = get_queried_days("Last week")
+                self.assertEqual(days, {3, 4, 5, 6})
+                self.assertEqual(
+                    result["df"]["sum__num"].tolist(), [3, 4, 5, 6, 7, 8, 9]
+                )
+
+                # the failed day isn't cached
+                failed_days.add(2)
+                result, days = get_queried_days("2021-03-01 : 2021-03-03")
+                self.assertEqual(result["status"], QueryStatus.FAILED)
+                self.assertEqual(result["error_message"], "error")
+                failed_days.clear()
+                result, days = get_queried_days("2021-03-01 : 2021-03-03")
+                self.assertEqual(days, {2})
+                self.assertEqual(result["status"], QueryStatus.SUCCESS)
+                self.assertEqual(result["df"]["sum__num"].tolist(), [1, 2])
+            finally:
+                for cache_key in cache_keys:
+                    cache_manager.data_cache.delete(cache_key)
+
     def test_sql_injection_via_groupby(self):
         """
         Ensure that calling invalid columns names in groupby are caught
@@ -419,3 +541,108 @@ class TestQueryContext(RabbitaiTestCase):
         responses = query_context.get_payload()
         new_cache_key = responses["queries"][0]["cache_key"]
         self.assertEqual(orig_cache_key, new_cache_key)
+
+    def test_post_processing_fused_steps(self):
+        """
+        Ensure that fused post processing steps return the same DataFrame as the
+        operations run one after the other
+        """
+        df = pd.DataFrame(
+            {"a": [3, 1, 2, 1], "b": [1.0, 2.0, 3.0, 4.0], "c": ["w", "x", "y", "z"]}
+        )
+        post_processing = [
+            {"operation": "diff", "options": {"columns": {"b": "b_diff"}}},
+            {
+                "operation": "cum",
+                "options": {"columns": {"b_diff": "b_cum"}, "operator": "sum"},
+            },
+            {"operation": "sort", "options": {"columns": {"c": False}}},
+            {
+                "operation": "select",
+                "options": {"columns": ["a", "b", "b_cum"], "rename": {"b": "B"}},
+            },
+            {"operation": "sort", "options": {"columns": {"a": True, "B": True}}},
+        ]
+        query_object = QueryObject(post_processing=post_processing)
+        processed_df = query_object.exec_post_processing(df.copy())
+        self.assertEqual(
+            [timing["operation"] for timing in query_object.post_processing_timings],
+            ["diff+cum", "sort+select+sort"],
+        )
+
+        expected_df = df
+        for post_process in post_processing:
+            expected_df = getattr(pandas_postprocessing, post_process["operation"])(
+                expected_df, **post_process["options"]
+            )
+        self.assertTrue(processed_df.equals(expected_df))
+
+        query_object = QueryObject(post_processing=[{"operation": "_append_columns"}])
+        with self.assertRaises(QueryObjectValidationError):
+            query_object.exec_post_processing(df)
+
+    def test_post_processing_push_down(self):
+        """
+        Ensure that a leading sort is pushed down to the query, and that the metrics
+        not selected aren't queried
+        """
+        metric = {
+            "expressionType": "SIMPLE",
+            "column": {"column_name": "num_girls"},
+            "aggregate": "SUM",
+            "label": "num_girls",
+        }
+        query_object = QueryObject(
+            groupby=["name"],
+            metrics=["sum__num", metric, "count"],
+            post_processing=[
+                {"operation": "sort", "options": {"columns": {"num_girls": False}}},
+                {"operation": "select", "options": {"columns": ["name", "sum__num"]}},
+            ],
+        )
+        self.assertEqual(query_object.orderby, [(metric, False)])
+        self.assertEqual(query_object.metrics, ["sum__num", metric])
+
+        # the first metric ranks the series of a series limit
+        query_object = QueryObject(
+            granularity="ds",
+            groupby=["name"],
+            metrics=["sum__num", "count"],
+            is_timeseries=True,
+            timeseries_limit=5,
+            post_processing=[
+                {"operation": "select", "options": {"columns": ["name", "count"]}},
+            ],
+        )
+        self.assertEqual(query_object.metrics, ["sum__num", "count"])
+        query_object = QueryObject(
+            granularity="ds",
+            groupby=["name"],
+            metrics=["sum__num", "count"],
+            is_timeseries=True,
+            timeseries_limit=5,
+            timeseries_limit_metric="count",
+            post_processing=[
+                {"operation": "select", "options": {"columns": ["name", "count"]}},
+            ],
+        )
+        self.assertEqual(query_object.metrics, ["count"])
+
+        # unknown columns and explicit orderings are left to the query
+        query_object = QueryObject(
+            groupby=["name"],
+            metrics=["sum__num"],
+            orderby=[("sum__num", True)],
+            post_processing=[
+                {"operation": "sort", "options": {"columns": {"sum__num": False}}},
+            ],
+        )
+        self.assertEqual(query_object.orderby, [("sum__num", True)])
+        query_object = QueryObject(
+            groupby=["name"],
+            metrics=["sum__num"],
+            post_processing=[
+                {"operation": "sort", "options": {"columns": {"sum__num__2": False}}},
+            ],
+        )
+        self.assertEqual(query_object.orderby, [])
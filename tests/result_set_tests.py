@@ -1,6 +1,8 @@
 # isort:skip_file
 from datetime import datetime
 
+import pyarrow as pa
+
 import tests.test_app
 from rabbitai.dataframe import df_to_records
 from rabbitai.db_engine_specs import BaseEngineSpec
@@ -232,3 +234,73 @@ class TestRabbitaiResultSet(RabbitaiTestCase):
         ]
         results = RabbitaiResultSet(data, cursor_descr, BaseEngineSpec)
         self.assertEqual(results.columns, [])
+
+    def test_stringify_offending_column_only(self):
+        data = [("a", 1, "x"), ("b", 2, 5)]
+        cursor_descr = [
+            ("one", "varchar", None, None, None, None, True),
+            ("two", "int", None, None, None, None, True),
+            ("three", "varchar", None, None, None, None, True),
+        ]
+        results = RabbitaiResultSet(data, cursor_descr, BaseEngineSpec)
+        self.assertEqual(
+            df_to_records(results.to_pandas_df()),
+            [
+                {"one": "a", "two": 1, "three": '"x"'},
+                {"one": "b", "two": 2, "three": "5"},
+            ],
+        )
+
+    def test_type_from_cursor_description(self):
+        data = [(None, None), (None, None)]
+        cursor_descr = [
+            ("one", "varchar", None, None, None, None, True),
+            ("two", "double", None, None, None, None, True),
+        ]
+        results = RabbitaiResultSet(data, cursor_descr, BaseEngineSpec)
+        self.assertEqual(results.pa_table.schema.field("one").type, pa.string())
+        self.assertEqual(results.pa_table.schema.field("two").type, pa.float64())
+
+    def test_integer_type_not_truncating_floats(self):
+        # drivers may return floats for integer columns, e.g. the result of an
+        # average, building the column as int64 would silently truncate them
+        data = [(1, 1.5), (2, 2.0)]
+        cursor_descr = [
+            ("one", "bigint", None, None, None, None, True),
+            ("two", "bigint", None, None, None, None, True),
+        ]
+        results = RabbitaiResultSet(data, cursor_descr, BaseEngineSpec)
+        self.assertEqual(results.pa_table.schema.field("one").type, pa.int64())
+        self.assertEqual(results.pa_table.schema.field("two").type, pa.float64())
+        self.assertEqual(
+            df_to_records(results.to_pandas_df()),
+            [{"one": 1, "two": 1.5}, {"one": 2, "two": 2.0}],
+        )
+
+    def test_from_batches(self):
+        batches = [
+            [("a", 1, None), ("b", None, None)],
+            [("c", 3, [1, 2])],
+            pa.RecordBatch.from_arrays(
+                [pa.array(["d"]), pa.array([4]), pa.array([None])],
+                names=["one", "two", "three"],
+            ),
+        ]
+        cursor_descr = [
+            ("one", "varchar", None, None, None, None, True),
+            ("two", "int", None, None, None, None, True),
+            ("three", None, None, None, None, None, True),
+        ]
+        results = RabbitaiResultSet.from_batches(
+            iter(batches), cursor_descr, BaseEngineSpec
+        )
+        self.assertEqual(results.size, 4)
+        self.assertEqual(
+            df_to_records(results.to_pandas_df()),
+            [
+                {"one": "a", "two": 1, "three": "null"},
+                {"one": "b", "two": None, "three": "null"},
+                {"one": "c", "two": 3, "three": "[1, 2]"},
+                {"one": "d", "two": 4, "three": "null"},
+            ],
+        )
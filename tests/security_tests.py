@@ -8,6 +8,7 @@ from typing import Any, Dict
 
 import prison
 import pytest
+from cachelib import SimpleCache
 
 from flask import current_app, g
 
@@ -18,6 +19,7 @@ from rabbitai.connectors.druid.models import DruidCluster, DruidDatasource
 from rabbitai.connectors.sqla.models import RowLevelSecurityFilter, SqlaTable
 from rabbitai.errors import ErrorLevel, RabbitaiError, RabbitaiErrorType
 from rabbitai.exceptions import RabbitaiSecurityException
+from rabbitai.extensions import cache_manager
 from rabbitai.models.core import Database
 from rabbitai.models.slice import Slice
 from rabbitai.sql_parse import Table
@@ -1020,6 +1022,60 @@ class TestSecurityManager(RabbitaiTestCase):
         with self.assertRaises(RabbitaiSecurityException):
             security_manager.raise_for_access(viz=test_viz)
 
+    def test_compiled_permissions_memoized_for_session(self):
+        gamma = security_manager.find_user("gamma")
+        with patch.object(
+            security_manager,
+            "_compile_permissions",
+            wraps=security_manager._compile_permissions,
+        ) as compile_permissions:
+            assert security_manager._has_view_access(gamma, "can_read", "Chart")
+            assert not security_manager._has_view_access(
+                gamma, "database_access", "[examples].(id:1)"
+            )
+            assert compile_permissions.call_count == 1
+
+            # granting a permission to a role of the user invalidates them
+            pvm = security_manager.add_permission_view_menu(
+                "schema_access", "[examples].[compiled]"
+            )
+            gamma_role = security_manager.find_role("Gamma")
+            security_manager.add_permission_role(gamma_role, pvm)
+            assert "[examples].[compiled]" in security_manager.get_compiled_permissions(
+                gamma.id
+            ).view_menus.get("schema_access", ())
+            assert compile_permissions.call_count == 2
+
+            security_manager.del_permission_role(gamma_role, pvm)
+            security_manager.del_permission_view_menu(
+                "schema_access", "[examples].[compiled]"
+            )
+
+    def test_compiled_permissions_cached_across_sessions(self):
+        admin = security_manager.find_user("admin")
+        with patch.dict(
+            current_app.config, {"PERMISSIONS_CACHE_TIMEOUT": 60}
+        ), patch.object(cache_manager, "_cache", SimpleCache()), patch.object(
+            security_manager,
+            "_compile_permissions",
+            wraps=security_manager._compile_permissions,
+        ) as compile_permissions:
+            permissions = security_manager.get_compiled_permissions(admin.id)
+            db.session.info.pop("compiled_permissions")  # new request
+            assert security_manager.get_compiled_permissions(admin.id) == permissions
+            assert compile_permissions.call_count == 1
+
+            security_manager.sync_role_definitions()
+            security_manager.get_compiled_permissions(admin.id)
+            assert compile_permissions.call_count == 2
+
+            # updating the login statistics of a user doesn't invalidate them
+            admin.login_count = (admin.login_count or 0) + 1
+            db.session.commit()
+            db.session.info.pop("compiled_permissions", None)  # new request
+            security_manager.get_compiled_permissions(admin.id)
+            assert compile_permissions.call_count == 2
+
 
 class TestRowLevelSecurity(RabbitaiTestCase):
     """
@@ -1189,6 +1245,56 @@ class TestRowLevelSecurity(RabbitaiTestCase):
         assert not self.NAMES_Q_REGEX.search(sql)
         assert not self.BASE_FILTER_REGEX.search(sql)
 
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_rls_filters_memoized_for_request(self):
+        g.user = self.get_user(username="gamma")
+        tbl = self.get_table_by_name("birth_names")
+        with patch.object(
+            security_manager,
+            "_query_rls_filters",
+            wraps=security_manager._query_rls_filters,
+        ) as query_rls_filters:
+            filters = security_manager.get_rls_filters(tbl)
+            assert security_manager.get_rls_filters(tbl) == filters
+            assert query_rls_filters.call_count == 1
+
+            # changing a filter invalidates the memoized filters
+            self.rls_entry3.clause = "name like 'R%'"
+            db.session.commit()
+            clauses = {f.clause for f in security_manager.get_rls_filters(tbl)}
+            assert "name like 'R%'" in clauses
+            assert query_rls_filters.call_count == 2
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_rls_filters_cached_across_requests(self):
+        g.user = self.get_user(username="gamma")
+        tbl = self.get_table_by_name("birth_names")
+        with patch.dict(
+            current_app.config, {"RLS_FILTERS_CACHE_TIMEOUT": 60}
+        ), patch.object(cache_manager, "_cache", SimpleCache()), patch.object(
+            security_manager,
+            "_query_rls_filters",
+            wraps=security_manager._query_rls_filters,
+        ) as query_rls_filters:
+            filters = security_manager.get_rls_filters(tbl)
+            g.pop("rls_filters")  # new request
+            assert security_manager.get_rls_filters(tbl) == filters
+            assert query_rls_filters.call_count == 1
+
+            # removing a role of the user invalidates the cached filters
+            g.user.roles.remove(security_manager.find_role(self.NAME_Q_ROLE))
+            db.session.commit()
+            clauses = {f.clause for f in security_manager.get_rls_filters(tbl)}
+            assert "name like 'Q%'" not in clauses
+            assert query_rls_filters.call_count == 2
+
+            # updating the login statistics of the user doesn't invalidate them
+            g.user.login_count = (g.user.login_count or 0) + 1
+            db.session.commit()
+            g.pop("rls_filters", None)  # new request
+            security_manager.get_rls_filters(tbl)
+            assert query_rls_filters.call_count == 2
+
 
 class TestAccessRequestEndpoints(RabbitaiTestCase):
     def test_access_request_disabled(self):
@@ -530,6 +530,22 @@ class TestSqlLab(RabbitaiTestCase):
         self.assertEqual(len(data["data"]), 1200)
         self.assertEqual(data["query"]["limitingFactor"], LimitingFactor.NOT_LIMITED)
 
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    @mock.patch("rabbitai.sql_lab.SQLLAB_FETCH_BATCH_SIZE", 100)
+    def test_sql_limit_fetch_in_batches(self):
+        self.login("admin")
+        data = self.run_sql(
+            "SELECT * FROM birth_names", client_id="sql_batches_1", query_limit=150,
+        )
+        self.assertEqual(len(data["data"]), 150)
+        self.assertEqual(data["query"]["limitingFactor"], LimitingFactor.DROPDOWN)
+
+        data = self.run_sql(
+            "SELECT * FROM birth_names", client_id="sql_batches_2", query_limit=10000,
+        )
+        self.assertEqual(len(data["data"]), 1200)
+        self.assertEqual(data["query"]["limitingFactor"], LimitingFactor.NOT_LIMITED)
+
     def test_query_api_filter(self) -> None:
         """
         Test query api without can_only_access_owned_queries perm added to
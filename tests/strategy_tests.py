@@ -2,7 +2,7 @@
 """Unit tests for Rabbitai cache warmup"""
 import datetime
 import json
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from tests.fixtures.birth_names_dashboard import load_birth_names_dashboard_with_slices
 
 from sqlalchemy import String, Date, Float
@@ -13,14 +13,16 @@ import pandas as pd
 from rabbitai.models.slice import Slice
 from rabbitai.utils.core import get_example_database
 
-from rabbitai import db
+from rabbitai import app, db
 
 from rabbitai.models.core import Log
 from rabbitai.models.tags import get_tag, ObjectTypes, TaggedObject, TagTypes
 from rabbitai.tasks.cache import (
     DashboardTagsStrategy,
     get_form_data,
+    PredictiveRefreshStrategy,
     TopNDashboardsStrategy,
+    warm_up_charts,
 )
 
 from .base_tests import RabbitaiTestCase
@@ -183,6 +185,58 @@ class TestCacheWarmUp(RabbitaiTestCase):
         expected = sorted([f"{URL_PREFIX}{slc.url}" for slc in dash.slices])
         self.assertEqual(result, expected)
 
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_warm_up_charts(self):
+        dash = self.get_dash_by_slug("births")
+        charts = [(slc, None) for slc in dash.slices if slc.viz_type == "table"]
+        # the same chart with the same filters is warmed up once
+        charts.append(charts[0])
+        with patch.dict(
+            app.config, {"CACHE_WARMUP_MAX_CONCURRENT_QUERIES_PER_DATABASE": 1}
+        ):
+            reports = warm_up_charts(charts)
+        self.assertEqual(len(reports), len(charts) - 1)
+        for report in reports:
+            self.assertNotEqual(report["status"], "failed")
+            self.assertIn("duration_ms", report)
+
+        # the cached charts are skipped
+        reports = warm_up_charts(charts)
+        self.assertEqual({report["status"] for report in reports}, {"cached"})
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_predictive_refresh_strategy(self):
+        db.session.query(Log).delete()
+        dash = self.get_dash_by_slug("births")
+        tables = [slc for slc in dash.slices if slc.viz_type == "table"]
+        hot_chart, cold_chart = tables[:2]
+        now = datetime.datetime.utcnow()
+        for _ in range(3):
+            db.session.add(Log(action="explore_json", slice_id=hot_chart.id, dttm=now))
+        # viewed at another time of the day
+        db.session.add(
+            Log(
+                action="explore_json",
+                slice_id=cold_chart.id,
+                dttm=now - datetime.timedelta(hours=12),
+            )
+        )
+        db.session.commit()
+
+        strategy = PredictiveRefreshStrategy(top_n=5, lead_time=3600)
+        self.assertEqual(strategy.get_hot_chart_ids(now), [hot_chart.id])
+        warm_up_charts(strategy.get_charts(), force=True)
+
+        # the data of the chart expires within the lead time
+        self.assertEqual(strategy.get_charts(), [(hot_chart, None)])
+        self.assertEqual(strategy.stats["prevented_misses"], 1)
+
+        strategy = PredictiveRefreshStrategy(top_n=5, lead_time=0)
+        self.assertEqual(strategy.get_charts(), [])
+        self.assertEqual(strategy.stats["fresh"], 1)
+        db.session.query(Log).delete()
+        db.session.commit()
+
     def reset_tag(self, tag):
         """Remove associated object from tag, used to reset tests"""
         if tag.objects:
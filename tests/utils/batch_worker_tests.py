@@ -0,0 +1,67 @@
+import threading
+from unittest import mock
+
+from rabbitai.utils.batch_worker import BatchWorker
+
+
+def test_batch_worker():
+    batches = []
+    processed = threading.Event()
+
+    def process_batch(items):
+        batches.append(items)
+        if sum(len(batch) for batch in batches) == 3:
+            processed.set()
+
+    worker = BatchWorker(
+        process_batch,
+        name="test-worker",
+        max_queue_size=10,
+        batch_size=2,
+        flush_interval=0.1,
+    )
+    with mock.patch("atexit.register") as register:
+        assert all(worker.put(item) for item in (1, 2, 3))
+    # the queued items are processed before the process exits
+    register.assert_called_once_with(worker.flush)
+    assert processed.wait(5)
+    assert batches == [[1, 2], [3]]
+
+
+@mock.patch.object(BatchWorker, "start")
+def test_batch_worker_drops_when_full(start):
+    batches = []
+    worker = BatchWorker(
+        batches.append,
+        name="test-worker",
+        max_queue_size=2,
+        batch_size=10,
+        flush_interval=0.1,
+    )
+    assert [worker.put(item) for item in (1, 2, 3)] == [True, True, False]
+    assert worker.qsize() == 2
+    worker.flush()
+    assert batches == [[1, 2]]
+    assert worker.qsize() == 0
+
+
+@mock.patch.object(BatchWorker, "start")
+def test_batch_worker_processing_errors(start):
+    batches = []
+
+    def process_batch(items):
+        batches.append(items)
+        raise Exception("failed")
+
+    worker = BatchWorker(
+        process_batch,
+        name="test-worker",
+        max_queue_size=10,
+        batch_size=1,
+        flush_interval=0.1,
+    )
+    worker.put(1)
+    worker.put(2)
+    # a failed batch doesn't prevent the next ones from being processed
+    worker.flush()
+    assert batches == [[1], [2]]
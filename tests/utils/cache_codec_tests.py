@@ -0,0 +1,66 @@
+# pylint: disable=no-self-use
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from rabbitai.utils.cache_codec import ArrowDataCacheCodec, DataCacheCodec
+
+
+def test_data_cache_codec():
+    value = {"df": pd.DataFrame({"a": [1]}), "query": "SELECT 1"}
+    codec = DataCacheCodec()
+    assert codec.encode(value) is value
+    assert codec.decode(value) is value
+
+
+def test_arrow_data_cache_codec():
+    df = pd.DataFrame(
+        {
+            "__timestamp": pd.date_range("2021-01-01", periods=1000, freq="min"),
+            "name": ["a", "b"] * 500,
+            "value": np.arange(1000, dtype=np.float64),
+        }
+    )
+    value = {"df": df, "query": "SELECT 1", "annotation_data": {"layer": [1, 2]}}
+
+    for compression in ("zstd", "lz4", None):
+        codec = ArrowDataCacheCodec(compression=compression)
+        encoded = codec.encode(value)
+        assert isinstance(encoded, bytes)
+        assert encoded.startswith(ArrowDataCacheCodec.magic)
+
+        decoded = codec.decode(encoded)
+        pd.testing.assert_frame_equal(decoded["df"], df)
+        assert decoded["query"] == "SELECT 1"
+        assert decoded["annotation_data"] == {"layer": [1, 2]}
+
+    assert len(ArrowDataCacheCodec().encode(value)) < len(pickle.dumps(value))
+
+
+def test_arrow_data_cache_codec_unsupported_values():
+    codec = ArrowDataCacheCodec()
+
+    # mixed type columns and non string column names are stored unchanged
+    for df in (pd.DataFrame({"a": [1, "a"]}), pd.DataFrame({0: [1]})):
+        value = {"df": df}
+        assert codec.encode(value) is value
+
+    # values cached before enabling the codec are returned unchanged
+    value = {"df": pd.DataFrame({"a": [1]})}
+    assert codec.decode(value) is value
+
+
+def test_arrow_data_cache_codec_nullable_integers():
+    df = pd.DataFrame(
+        {
+            "bigint": pd.Series([1, None, 2 ** 60], dtype=object),
+            "int": [1, 2, 3],
+            "float": [1.5, np.nan, 3.0],
+            "bool": pd.Series([True, None, False], dtype=object),
+        }
+    )
+    codec = ArrowDataCacheCodec()
+    decoded = codec.decode(codec.encode({"df": df}))["df"]
+    pd.testing.assert_frame_equal(decoded, df)
+    assert decoded["bigint"].tolist() == [1, None, 2 ** 60]
@@ -0,0 +1,59 @@
+from unittest import mock
+
+from cachelib import SimpleCache
+
+from rabbitai.extensions import cache_manager
+from rabbitai.utils.batch_worker import BatchWorker
+from rabbitai.utils.cache_key_index import CacheKeyIndex
+from tests.base_tests import RabbitaiTestCase
+from tests.test_app import app
+
+
+class UtilsCacheKeyIndexTests(RabbitaiTestCase):
+    def get_index(self, backend) -> CacheKeyIndex:
+        index = CacheKeyIndex()
+        with mock.patch.dict(app.config, {"DATA_CACHE_KEY_INDEX": True}):
+            index.init_app(app, backend)
+        return index
+
+    def test_disabled_without_redis(self):
+        index = self.get_index(SimpleCache())
+        self.assertFalse(index.enabled)
+        index.register("key", "1__table", 60)
+        self.assertEqual(index.invalidate(["1__table"]), 0)
+
+    def test_disabled_with_redis_cluster(self):
+        class RedisCluster:
+            register_script = mock.Mock()
+
+        index = self.get_index(mock.Mock(_write_client=RedisCluster(), key_prefix=""))
+        self.assertFalse(index.enabled)
+        RedisCluster.register_script.assert_not_called()
+
+    @mock.patch.object(BatchWorker, "start")
+    def test_invalidate(self, start):
+        backend = cache_manager.data_cache.cache
+        index = self.get_index(backend)
+        self.assertTrue(index.enabled)
+        cache = cache_manager.data_cache
+        cache.set("index_key_1", {"data": 1}, timeout=60)
+        cache.set("index_key_2", {"data": 2}, timeout=600)
+        cache.set("index_key_3", {"data": 3}, timeout=60)
+        index.register("index_key_1", "1__table", 60)
+        index.register("index_key_2", "1__table", 600)
+        index.register("index_key_3", "2__table", 60)
+        start.assert_called()
+        index.flush()
+
+        set_key = index._get_set_key("1__table")
+        self.assertEqual(backend._write_client.scard(set_key), 2)
+        # the index lives as long as its longest lived key
+        self.assertGreater(backend._write_client.ttl(set_key), 60)
+
+        self.assertEqual(index.invalidate(["1__table", "3__table"]), 2)
+        self.assertIsNone(cache.get("index_key_1"))
+        self.assertIsNone(cache.get("index_key_2"))
+        self.assertEqual(cache.get("index_key_3"), {"data": 3})
+        self.assertFalse(backend._write_client.exists(set_key))
+        self.assertEqual(index.invalidate(["2__table"]), 1)
+        self.assertIsNone(cache.get("index_key_3"))
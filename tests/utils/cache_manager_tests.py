@@ -0,0 +1,73 @@
+# pylint: disable=no-self-use
+from unittest import mock
+
+import pandas as pd
+
+from rabbitai.utils.cache_manager import _get_value_size, LocalDataCache
+
+
+def get_value(rows: int = 100) -> dict:
+    return {"df": pd.DataFrame({"a": range(rows)}), "query": "SELECT a FROM t"}
+
+
+def test_local_data_cache_get_set():
+    stats_logger = mock.Mock()
+    cache = LocalDataCache(max_bytes=1024 * 1024, timeout=60, stats_logger=stats_logger)
+    value = get_value()
+
+    assert cache.get("key") is None
+    assert cache.set("key", value, "1__table")
+    cached_value = cache.get("key")
+    assert cached_value["query"] == value["query"]
+    assert cached_value["df"].equals(value["df"])
+
+    # callers get a copy of the cached DataFrame
+    cached_value["df"]["a"] = 0
+    assert cache.get("key")["df"].equals(value["df"])
+
+    stats_logger.incr.assert_has_calls(
+        [mock.call("local_data_cache.miss"), mock.call("local_data_cache.hit")]
+    )
+
+
+def test_local_data_cache_evicts_least_recently_used():
+    stats_logger = mock.Mock()
+    value_size = _get_value_size(get_value())
+    cache = LocalDataCache(
+        max_bytes=2 * value_size, timeout=60, stats_logger=stats_logger
+    )
+
+    cache.set("a", get_value())
+    cache.set("b", get_value())
+    cache.get("a")
+    cache.set("c", get_value())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.size == 2 * value_size
+    stats_logger.incr.assert_any_call("local_data_cache.eviction")
+
+    # values larger than the cache are not cached
+    assert not cache.set("d", get_value(rows=10000))
+    assert cache.get("d") is None
+
+
+def test_local_data_cache_expiration():
+    cache = LocalDataCache(max_bytes=1024 * 1024, timeout=60)
+    with mock.patch("rabbitai.utils.cache_manager.time.monotonic", return_value=0):
+        cache.set("key", get_value())
+    with mock.patch("rabbitai.utils.cache_manager.time.monotonic", return_value=61):
+        assert cache.get("key") is None
+    assert cache.size == 0
+
+
+def test_local_data_cache_delete_datasources():
+    cache = LocalDataCache(max_bytes=1024 * 1024, timeout=60)
+    cache.set("a", get_value(), "1__table")
+    cache.set("b", get_value(), "2__table")
+
+    cache.delete_datasources(["1__table"])
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
@@ -0,0 +1,108 @@
+import threading
+import time
+from unittest import mock
+
+from flask import g
+from sqlalchemy.orm import object_session
+
+from rabbitai import db
+from rabbitai.connectors.sqla.models import SqlaTable
+from rabbitai.utils.concurrency import (
+    attach_to_thread_session,
+    database_slot,
+    run_concurrently,
+)
+from tests.base_tests import RabbitaiTestCase
+from tests.test_app import app
+
+
+class UtilsConcurrencyTests(RabbitaiTestCase):
+    def test_run_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def task(value: int) -> int:
+            # all the tasks must be running at the same time to get past it
+            barrier.wait()
+            return value
+
+        results = run_concurrently([lambda i=i: task(i) for i in range(3)], 3)
+        self.assertEqual(results, [0, 1, 2])
+
+    def test_run_concurrently_serial(self):
+        thread = threading.current_thread()
+        results = run_concurrently(
+            [lambda: threading.current_thread() for _ in range(3)], 1
+        )
+        self.assertEqual(results, [thread] * 3)
+
+    def test_run_concurrently_context(self):
+        with app.test_request_context("/?foo=bar"):
+            g.user = "alpha"
+            results = run_concurrently(
+                [lambda: g.user, lambda: app.config["ROW_LIMIT"]], 2
+            )
+        self.assertEqual(results, ["alpha", app.config["ROW_LIMIT"]])
+
+    def test_run_concurrently_raises(self):
+        def fail() -> None:
+            raise ValueError("fail")
+
+        with app.app_context():
+            with self.assertRaises(ValueError):
+                run_concurrently([lambda: 1, fail], 2)
+
+    def test_run_concurrently_nested(self):
+        def task() -> list:
+            thread = threading.current_thread()
+            # the outer tasks use 2 of the 3 workers, the nested ones run in them
+            threads = run_concurrently(
+                [lambda: threading.current_thread() for _ in range(3)], 3
+            )
+            return [nested_thread is thread for nested_thread in threads]
+
+        with app.app_context():
+            results = run_concurrently([task, task], 3)
+        self.assertEqual(results, [[True] * 3] * 2)
+
+        with app.app_context():
+            results = run_concurrently([task], 3)
+        # the outer task runs in the current thread, the nested ones concurrently
+        self.assertEqual(results, [[False] * 3])
+
+    def test_attach_to_thread_session(self):
+        with app.app_context():
+            table = db.session.query(SqlaTable).first()
+
+            def task() -> tuple:
+                attached = attach_to_thread_session(table)
+                return (
+                    attached is table,
+                    object_session(attached) is db.session(),
+                    attached.table_name,
+                    attach_to_thread_session(table) is attached,
+                )
+
+            results = run_concurrently([task, task], 2)
+            self.assertEqual(results, [(False, True, table.table_name, True)] * 2)
+            self.assertIs(attach_to_thread_session(table), table)
+
+    def test_database_slot(self):
+        running = 0
+        max_running = 0
+        lock = threading.Lock()
+
+        def task() -> None:
+            nonlocal running, max_running
+            with database_slot(1):
+                with lock:
+                    running += 1
+                    max_running = max(max_running, running)
+                time.sleep(0.05)
+                with lock:
+                    running -= 1
+
+        with mock.patch.dict(
+            app.config, {"CHART_DATA_MAX_CONCURRENT_QUERIES_PER_DATABASE": 2}
+        ), app.app_context():
+            run_concurrently([task] * 6, 6)
+        self.assertEqual(max_running, 2)
@@ -27,13 +27,13 @@ def test_escape_value():
     assert result == "'=value"
 
     result = csv.escape_value("|value")
-    assert result == "'\|value"
+    assert result == r"'\|value"
 
     result = csv.escape_value("%value")
     assert result == "'%value"
 
     result = csv.escape_value("=cmd|' /C calc'!A0")
-    assert result == "'=cmd\|' /C calc'!A0"
+    assert result == r"'=cmd\|' /C calc'!A0"
 
     result = csv.escape_value('""=10+2')
     assert result == '\'""=10+2'
@@ -58,7 +58,34 @@ def test_df_to_escaped_csv():
 
     assert escaped_csv_rows == [
         ["col_a", "'=func()"],
-        ["-10", "'=cmd\|' /C calc'!A0"],
+        ["-10", r"'=cmd\|' /C calc'!A0"],
         ["a", "'=b"],  # pandas seems to be removing the leading ""
         ["' =a", "b"],
     ]
+
+
+def test_escape_series():
+    series = pd.Series(["value", "-10", "=value", "|value", None, 1], dtype=object)
+
+    result = csv.escape_series(series)
+    assert result.tolist() == ["value", "-10", "'=value", r"'\|value", None, 1]
+
+    numbers = pd.Series([-1, 2])
+    assert csv.escape_series(numbers) is numbers
+
+
+def test_df_to_escaped_csv_chunks():
+    df = pd.DataFrame({"=col_a": ["=a", "b", "c"], "col_b": [1, 2, 3]})
+
+    chunks = list(csv.df_to_escaped_csv_chunks(df, chunk_rows=2, index=False))
+
+    assert chunks == ["'=col_a,col_b\n'=a,1\nb,2\n", "c,3\n"]
+    assert "".join(chunks) == csv.df_to_escaped_csv(df, index=False)
+
+
+def test_df_to_escaped_csv_chunks_empty():
+    df = pd.DataFrame({"col_a": []})
+
+    chunks = list(csv.df_to_escaped_csv_chunks(df, index=False))
+
+    assert chunks == ["col_a\n"]
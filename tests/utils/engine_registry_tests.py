@@ -0,0 +1,97 @@
+# pylint: disable=no-self-use,protected-access
+from unittest import mock
+
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
+
+from rabbitai.utils.engine_registry import EngineRegistry, TimedNullPool
+
+URL = make_url("sqlite://")
+
+
+def get_registry(max_size: int = 10, **kwargs) -> EngineRegistry:
+    registry = EngineRegistry()
+    registry.max_size = max_size
+    registry.idle_timeout = kwargs.get("idle_timeout")
+    registry.pool_config = kwargs.get("pool_config")
+    registry.stats_logger = mock.Mock()
+    return registry
+
+
+def test_get_engine_reuses_engines():
+    registry = get_registry()
+    engine = registry.get_engine(1, URL, {})
+
+    assert registry.get_engine(1, URL, {}) is engine
+    assert isinstance(engine.pool, TimedNullPool)
+    registry.stats_logger.incr.assert_has_calls(
+        [mock.call("engine_registry.miss"), mock.call("engine_registry.hit")]
+    )
+
+
+def test_get_engine_per_user_schema_and_params():
+    registry = get_registry()
+    engine = registry.get_engine(1, URL, {})
+
+    assert registry.get_engine(2, URL, {}) is not engine
+    assert registry.get_engine(1, URL, {}, effective_username="alpha") is not engine
+    assert registry.get_engine(1, URL, {}, schema="main") is not engine
+    assert registry.get_engine(1, URL, {"echo": True}) is not engine
+    assert registry.get_engine(1, make_url("sqlite:///a.db"), {}) is not engine
+    assert len(registry._engines) == 6
+
+
+def test_get_engine_not_cached():
+    registry = get_registry(max_size=0)
+    assert registry.get_engine(1, URL, {}) is not registry.get_engine(1, URL, {})
+
+    # unsaved databases
+    registry = get_registry()
+    assert registry.get_engine(None, URL, {}) is not registry.get_engine(None, URL, {})
+    assert not registry._engines
+
+
+def test_get_engine_pool_config():
+    registry = get_registry(pool_config={"pool_size": 2})
+    engine = registry.get_engine(1, URL, {})
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == 2
+
+    engine = registry.get_engine(1, URL, {}, nullpool=True)
+    assert isinstance(engine.pool, TimedNullPool)
+
+
+def test_get_engine_evicts_least_recently_used():
+    registry = get_registry(max_size=2)
+    engine_1 = registry.get_engine(1, URL, {})
+    engine_2 = registry.get_engine(2, URL, {})
+    registry.get_engine(1, URL, {})
+
+    with mock.patch.object(engine_2, "dispose") as dispose:
+        registry.get_engine(3, URL, {})
+        dispose.assert_called_once()
+    assert registry.get_engine(1, URL, {}) is engine_1
+    assert len(registry._engines) == 2
+    registry.stats_logger.incr.assert_any_call("engine_registry.eviction")
+
+
+def test_get_engine_expires_idle_engines():
+    registry = get_registry(idle_timeout=60)
+    with mock.patch("rabbitai.utils.engine_registry.time.monotonic") as monotonic:
+        monotonic.return_value = 0
+        engine = registry.get_engine(1, URL, {})
+        monotonic.return_value = 61
+        registry.get_engine(2, URL, {})
+
+    assert registry.get_engine(1, URL, {}) is not engine
+    registry.stats_logger.incr.assert_any_call("engine_registry.expired")
+
+
+def test_invalidate():
+    registry = get_registry()
+    engine = registry.get_engine(1, URL, {})
+    other_engine = registry.get_engine(2, URL, {})
+
+    registry.invalidate(1)
+    assert registry.get_engine(1, URL, {}) is not engine
+    assert registry.get_engine(2, URL, {}) is other_engine
@@ -0,0 +1,78 @@
+# pylint: disable=no-self-use
+import geohash as geohash_lib
+import numpy as np
+import pandas as pd
+import pytest
+from geopy.point import Point
+
+from rabbitai.utils import geo
+
+
+def get_coordinates(size: int):
+    rng = np.random.default_rng(0)
+    return rng.uniform(-90, 90, size), rng.uniform(-180, 180, size)
+
+
+def test_geohash_encode():
+    latitudes, longitudes = get_coordinates(1000)
+    for precision in (1, 5, 12):
+        assert geo.geohash_encode(latitudes, longitudes, precision).tolist() == [
+            geohash_lib.encode(latitude, longitude, precision)
+            for latitude, longitude in zip(latitudes, longitudes)
+        ]
+
+    assert geo.geohash_encode([40.71277496], [-74.00597306]).tolist() == [
+        "dr5regw3pg6f"
+    ]
+    # longitudes are wrapped
+    assert geo.geohash_encode([0.0], [190.0]).tolist() == [
+        geohash_lib.encode(0.0, -170.0)
+    ]
+    # longer geohashes are encoded by python-geohash
+    assert geo.geohash_encode([0.5], [0.5], 14).tolist() == [
+        geohash_lib.encode(0.5, 0.5, 14)
+    ]
+    with pytest.raises(ValueError):
+        geo.geohash_encode([90.0], [0.0])
+    with pytest.raises(ValueError):
+        geo.geohash_encode([np.nan], [0.0])
+
+
+def test_geohash_decode():
+    latitudes, longitudes = get_coordinates(1000)
+    geohashes = [
+        geohash_lib.encode(latitude, longitude, 1 + i % 14)
+        for i, (latitude, longitude) in enumerate(zip(latitudes, longitudes))
+    ]
+    decoded_latitudes, decoded_longitudes = geo.geohash_decode(pd.Series(geohashes))
+    expected = np.array([geohash_lib.decode(geohash) for geohash in geohashes])
+    np.testing.assert_allclose(decoded_latitudes, expected[:, 0], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(decoded_longitudes, expected[:, 1], rtol=0, atol=1e-12)
+
+    with pytest.raises(ValueError):
+        geo.geohash_decode(["dr5a"])
+
+
+def test_geodetic_parse():
+    points = [
+        "40.71277496, -74.00597306, 5.5km",
+        "-33.85598011 151.20666526 12m",
+        "1.23,3.21",
+        "23 26m 22s N 23 27m 30s E 21.0mi",
+        "10, 190",
+    ]
+    latitudes, longitudes, altitudes = geo.geodetic_parse(pd.Series(points))
+    expected = [Point(point) for point in points]
+    assert latitudes.tolist() == [point.latitude for point in expected]
+    assert longitudes.tolist() == [point.longitude for point in expected]
+    assert altitudes.tolist() == [point.altitude for point in expected]
+
+    latitudes, longitudes, altitudes = geo.geodetic_parse(
+        pd.Series([None, "", "1, 2"]), allow_empty=True
+    )
+    assert np.isnan(latitudes[:2]).all()
+    assert latitudes[2] == 1 and longitudes[2] == 2 and altitudes[2] == 0
+
+    with pytest.raises(ValueError) as excinfo:
+        geo.geodetic_parse(pd.Series(["1, 2", "NULL"]))
+    assert excinfo.value.args == ("NULL",)
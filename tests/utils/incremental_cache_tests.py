@@ -0,0 +1,114 @@
+import uuid
+from datetime import datetime
+from unittest import mock
+
+import pandas as pd
+
+from rabbitai.utils.core import QueryStatus, TimeRangeEndpoint
+from rabbitai.utils.incremental_cache import (
+    get_incremental_result,
+    get_partitions,
+    Partition,
+)
+from tests.base_tests import RabbitaiTestCase
+from tests.test_app import app
+
+NOW = datetime(2021, 3, 10, 12)
+
+
+def get_query_obj(**kwargs):
+    return {
+        "granularity": "ds",
+        "is_timeseries": True,
+        "from_dttm": datetime(2021, 3, 7),
+        "to_dttm": datetime(2021, 3, 10, 12),
+        "groupby": ["gender"],
+        "extras": {
+            "time_grain_sqla": "P1D",
+            "time_range_endpoints": (
+                TimeRangeEndpoint.INCLUSIVE,
+                TimeRangeEndpoint.EXCLUSIVE,
+            ),
+        },
+        **kwargs,
+    }
+
+
+class UtilsIncrementalCacheTests(RabbitaiTestCase):
+    def setUp(self):
+        self.datasource = mock.Mock(type="table", uid=f"{uuid.uuid4()}__table")
+        self.config = mock.patch.dict(
+            app.config, {"INCREMENTAL_TIMESERIES_CACHE": True}
+        )
+        self.config.start()
+
+    def tearDown(self):
+        self.config.stop()
+
+    def test_get_partitions(self):
+        partitions = get_partitions(get_query_obj(), self.datasource, now=NOW)
+        self.assertEqual(
+            partitions,
+            [
+                Partition(datetime(2021, 3, 7), datetime(2021, 3, 8), False),
+                Partition(datetime(2021, 3, 8), datetime(2021, 3, 9), False),
+                Partition(datetime(2021, 3, 9), datetime(2021, 3, 10), False),
+                Partition(datetime(2021, 3, 10), datetime(2021, 3, 10, 12), True),
+            ],
+        )
+        # the days which ended less than an hour ago are still open
+        partitions = get_partitions(
+            get_query_obj(), self.datasource, now=datetime(2021, 3, 10, 0, 30)
+        )
+        self.assertEqual([p.is_open for p in partitions], [False, False, True, True])
+
+    def test_get_partitions_unsupported(self):
+        for query_obj in (
+            get_query_obj(is_timeseries=False),
+            get_query_obj(timeseries_limit=10),
+            get_query_obj(orderby=[("sum__num", False)]),
+            get_query_obj(extras={"time_grain_sqla": "P1W"}),
+            get_query_obj(extras={"time_grain_sqla": "P1D"}),
+            get_query_obj(from_dttm=datetime(2021, 3, 10)),
+        ):
+            self.assertIsNone(get_partitions(query_obj, self.datasource, now=NOW))
+        with mock.patch.dict(app.config, {"INCREMENTAL_TIMESERIES_CACHE": False}):
+            self.assertIsNone(get_partitions(get_query_obj(), self.datasource))
+
+    def test_get_incremental_result(self):
+        partitions = get_partitions(get_query_obj(), self.datasource, now=NOW)
+
+        def get_result(partition):
+            return {
+                "df": pd.DataFrame({"__timestamp": [partition.from_dttm], "num": [1]}),
+                "query": f"SELECT {partition.from_dttm.day}",
+                "status": QueryStatus.SUCCESS,
+                "error_message": None,
+            }
+
+        get_result = mock.Mock(side_effect=get_result)
+        get_cache_key = lambda partition: f"{self.datasource.uid}_{partition}"
+        result = get_incremental_result(
+            partitions, get_cache_key, get_result, self.datasource.uid
+        )
+        self.assertEqual(get_result.call_count, 4)
+        self.assertEqual(len(result["df"].index), 4)
+        self.assertEqual(result["status"], QueryStatus.SUCCESS)
+
+        # only the open partition is queried again
+        result = get_incremental_result(
+            partitions, get_cache_key, get_result, self.datasource.uid
+        )
+        self.assertEqual(get_result.call_count, 5)
+        get_result.assert_called_with(partitions[-1])
+        self.assertEqual(
+            result["df"]["__timestamp"].tolist(), [p.from_dttm for p in partitions]
+        )
+        self.assertEqual(result["query"].count("SELECT"), 4)
+
+        # the rows of the whole time range are limited at once
+        self.assertIsNone(
+            get_incremental_result(
+                partitions, get_cache_key, get_result, self.datasource.uid, 4
+            )
+        )
@@ -0,0 +1,108 @@
+from unittest import mock
+
+from cachelib import SimpleCache
+
+from rabbitai import db
+from rabbitai.extensions import cache_manager
+from rabbitai.models.sql_lab import Query
+from rabbitai.utils.core import get_example_database, QueryStatus
+from rabbitai.utils.query_progress import (
+    is_query_stopped,
+    QueryProgressTracker,
+    set_query_stopped,
+)
+from tests.base_tests import RabbitaiTestCase
+from tests.test_app import app
+
+
+def get_session(query: mock.Mock) -> mock.Mock:
+    session = mock.Mock()
+    filtered = session.query.return_value.filter_by.return_value
+    filtered.populate_existing.return_value.one.return_value = query
+    return session
+
+
+class UtilsQueryProgressTests(RabbitaiTestCase):
+    def test_progress_writes_coalesced(self):
+        query = mock.Mock(id=1, progress=0, tracking_url=None, status="running")
+        session = get_session(query)
+        with mock.patch.dict(
+            app.config,
+            {"SQLLAB_PROGRESS_UPDATE_INTERVAL": 0, "SQLLAB_PROGRESS_MIN_DELTA": 5},
+        ):
+            tracker = QueryProgressTracker(query, session)
+        for progress in (1, 2, 3):
+            tracker.update(progress=progress)
+            self.assertFalse(tracker.is_stopped())
+        # the progress did not increase enough to be written
+        self.assertEqual(query.progress, 0)
+
+        tracker.update(progress=10)
+        self.assertFalse(tracker.is_stopped())
+        self.assertEqual(query.progress, 10)
+
+        tracker.update(progress=11, tracking_url="http://yarn/job/1/")
+        self.assertEqual(query.tracking_url, "http://yarn/job/1/")
+        self.assertEqual(query.progress, 10)
+        tracker.flush()
+        self.assertEqual(query.progress, 11)
+
+    def test_progress_writes_rate_limited(self):
+        query = mock.Mock(id=1, progress=0, tracking_url=None, status="running")
+        session = get_session(query)
+        with mock.patch.dict(app.config, {"SQLLAB_PROGRESS_UPDATE_INTERVAL": 60}):
+            tracker = QueryProgressTracker(query, session)
+        tracker.update(progress=50)
+        self.assertFalse(tracker.is_stopped())
+        session.query.assert_not_called()
+
+    def test_stopped_from_cache_flag(self):
+        query = mock.Mock(id=1, progress=0, tracking_url=None, status="running")
+        session = get_session(query)
+        with mock.patch.object(cache_manager, "_cache", SimpleCache()):
+            self.assertFalse(is_query_stopped(1))
+            with mock.patch.dict(app.config, {"SQLLAB_PROGRESS_UPDATE_INTERVAL": 60}):
+                tracker = QueryProgressTracker(query, session)
+            self.assertFalse(tracker.is_stopped())
+            set_query_stopped(1)
+            self.assertTrue(tracker.is_stopped())
+        session.query.assert_not_called()
+
+    def test_stopped_from_status(self):
+        query = mock.Mock(id=1, progress=0, tracking_url=None, status="running")
+        session = get_session(query)
+        with mock.patch.dict(app.config, {"SQLLAB_PROGRESS_UPDATE_INTERVAL": 0}):
+            tracker = QueryProgressTracker(query, session)
+        self.assertFalse(tracker.is_stopped())
+        session.commit.reset_mock()
+        query.status = QueryStatus.STOPPED
+        self.assertTrue(tracker.is_stopped())
+        tracker.update(progress=50)
+        tracker.flush()
+        self.assertEqual(query.progress, 0)
+        session.commit.assert_not_called()
+
+    def test_stopped_from_status_changed_by_another_session(self):
+        query = Query(
+            client_id="progress_1",
+            database_id=get_example_database().id,
+            sql="SELECT 1",
+            status=QueryStatus.RUNNING,
+        )
+        db.session.add(query)
+        db.session.commit()
+        with mock.patch.dict(app.config, {"SQLLAB_PROGRESS_UPDATE_INTERVAL": 0}):
+            tracker = QueryProgressTracker(query, db.session)
+        self.assertFalse(tracker.is_stopped())
+
+        # e.g. the stop request served by another process
+        other_session = db.create_scoped_session()
+        other_session.query(Query).filter_by(id=query.id).update(
+            {"status": QueryStatus.STOPPED}
+        )
+        other_session.commit()
+        other_session.close()
+        self.assertTrue(tracker.is_stopped())
+
+        db.session.delete(query)
+        db.session.commit()
@@ -3,6 +3,7 @@ import unittest
 import uuid
 from datetime import date, datetime, time, timedelta
 from decimal import Decimal
+from importlib.util import find_spec
 import json
 import os
 import re
@@ -26,14 +27,17 @@ from rabbitai.models.slice import Slice
 from rabbitai.utils.core import (
     base_json_conv,
     cast_to_num,
+    clear_memoized_caches,
     convert_legacy_filters_into_adhoc,
     create_ssl_cert_file,
     DTTM_ALIAS,
+    fast_json_dumps,
     format_timedelta,
     GenericDataType,
     get_form_data_token,
     get_iterable,
     get_email_address_list,
+    get_memoized_stats,
     get_or_create_db,
     get_stacktrace,
     json_int_dttm_ser,
@@ -92,6 +96,54 @@ class TestUtils(RabbitaiTestCase):
         with self.assertRaises(TypeError):
             json_int_dttm_ser("this is not a date")
 
+    def test_fast_json_dumps(self):
+        payload = {
+            "dttm": datetime(2020, 1, 1),
+            "values": [np.int64(1), np.nan, float("nan"), Decimal("1.5"), None],
+            1: "one",
+        }
+        expected = {
+            "dttm": 1577836800000.0,
+            "values": [1, None, None, 1.5, None],
+            "1": "one",
+        }
+        assert json.loads(fast_json_dumps(payload)) == expected
+        with patch("rabbitai.utils.core.orjson", None):
+            assert json.loads(fast_json_dumps(payload)) == expected
+
+        # integers wider than 64 bits fall back to simplejson
+        assert fast_json_dumps([2 ** 70]) == f"[{2 ** 70}]"
+
+    @pytest.mark.skipif(find_spec("orjson") is None, reason="orjson not installed")
+    def test_fast_json_dumps_backends_parity(self):
+        payload = {
+            "dttm": [
+                datetime(2020, 1, 1),
+                pd.Timestamp("2020-01-01 12:00"),
+                np.datetime64("2020-01-01T12:00:00.123"),
+                date(2020, 1, 1),
+            ],
+            "nan": [float("nan"), np.nan, np.float64("nan"), np.float32("nan")],
+            "numpy": [np.int64(1), np.float64(1.5), np.float32(0.5), np.bool_(True)],
+            "array": np.array([1, 2]),
+            1: None,
+        }
+        result = json.loads(fast_json_dumps(payload))
+        with patch("rabbitai.utils.core.orjson", None):
+            assert json.loads(fast_json_dumps(payload)) == result
+        assert result == {
+            "1": None,
+            "array": [1, 2],
+            "dttm": [
+                1577836800000.0,
+                1577880000000.0,
+                1577880000123.0,
+                1577836800000.0,
+            ],
+            "nan": [None, None, None, None],
+            "numpy": [1, 1.5, 0.5, True],
+        }
+
     def test_json_iso_dttm_ser(self):
         dttm = datetime(2020, 1, 1)
         dt = date(2020, 1, 1)
@@ -634,6 +686,76 @@ class TestUtils(RabbitaiTestCase):
         self.assertEqual(instance.watcher, 4)
         self.assertEqual(result1, result8)
 
+    def test_memoized_bounds(self):
+        watcher = {"val": 0}
+
+        @memoized(max_size=2)
+        def test_function(a):
+            watcher["val"] += 1
+            return a * 2
+
+        test_function(1)
+        test_function(2)
+        test_function(1)
+        # the least recently used value is evicted
+        test_function(3)
+        self.assertEqual(watcher["val"], 3)
+        test_function(1)
+        self.assertEqual(watcher["val"], 3)
+        test_function(2)
+        self.assertEqual(watcher["val"], 4)
+
+        stats = test_function.stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 4)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["hit_rate"], 1 / 3)
+
+        with patch("rabbitai.utils.core.default_timer") as mock_timer:
+
+            @memoized(ttl=10)
+            def test_expiring_function():
+                watcher["val"] += 1
+                return watcher["val"]
+
+            mock_timer.return_value = 0
+            self.assertEqual(test_expiring_function(), 5)
+            mock_timer.return_value = 9
+            self.assertEqual(test_expiring_function(), 5)
+            mock_timer.return_value = 10
+            self.assertEqual(test_expiring_function(), 6)
+
+    def test_memoized_on_methods_references_instances_weakly(self):
+        class test_class:
+            @memoized
+            def test_method(self, a):
+                return [a]
+
+        instance = test_class()
+        instance.test_method(1)
+        instance.test_method(2)
+        stats = test_class.test_method.stats()
+        self.assertEqual((stats["size"], stats["instances"]), (2, 1))
+        del instance
+        stats = test_class.test_method.stats()
+        self.assertEqual((stats["size"], stats["instances"]), (0, 0))
+
+    def test_memoized_stats_and_clear(self):
+        @memoized
+        def test_function(a):
+            return a
+
+        test_function(1)
+        test_function(2)
+        name = f"{__name__}.{test_function.func.__qualname__}"
+        self.assertEqual(test_function.name, name)
+        stats = get_memoized_stats([name])
+        self.assertEqual([(s["name"], s["size"]) for s in stats], [(name, 2)])
+        self.assertEqual(clear_memoized_caches([name]), 2)
+        self.assertEqual(test_function.stats()["size"], 0)
+        self.assertEqual(clear_memoized_caches([name]), 0)
+
     @patch("rabbitai.utils.core.to_adhoc", mock_to_adhoc)
     def test_convert_legacy_filters_into_adhoc_where(self):
         form_data = {"where": "a = 1"}
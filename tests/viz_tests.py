@@ -1,6 +1,7 @@
 # isort:skip_file
 from datetime import date, datetime, timezone
 import logging
+import uuid
 from math import nan
 from unittest.mock import Mock, patch
 from typing import Any, Dict, List, Set
@@ -8,13 +9,14 @@ from typing import Any, Dict, List, Set
 import numpy as np
 import pandas as pd
 import pytest
+from freezegun import freeze_time
 
 import tests.test_app
 import rabbitai.viz as viz
 from rabbitai import app
 from rabbitai.constants import NULL_STRING
 from rabbitai.exceptions import QueryObjectValidationError, SpatialException
-from rabbitai.utils.core import DTTM_ALIAS
+from rabbitai.utils.core import DTTM_ALIAS, QueryStatus, TimeRangeEndpoint
 
 from .base_tests import RabbitaiTestCase
 from .utils import load_fixture
@@ -515,6 +517,33 @@ class TestDistBarViz(RabbitaiTestCase):
         ]
         self.assertEqual(expected, data)
 
+    def test_column_nulls_columnar(self):
+        form_data = {
+            "metrics": ["votes"],
+            "adhoc_filters": [],
+            "groupby": ["toppings"],
+            "columns": ["role"],
+            "result_format": "columnar",
+        }
+        datasource = self.get_datasource_mock()
+        df = pd.DataFrame(
+            {
+                "toppings": ["cheese", "pepperoni", "cheese", "pepperoni"],
+                "role": ["engineer", "engineer", None, None],
+                "votes": [3, 5, 1, 2],
+            }
+        )
+        test_viz = viz.DistributionBarViz(datasource, form_data)
+        data = test_viz.get_data(df)
+        expected = [
+            {
+                "key": NULL_STRING,
+                "values": {"x": ["pepperoni", "cheese"], "y": [2, 1]},
+            },
+            {"key": "engineer", "values": {"x": ["pepperoni", "cheese"], "y": [5, 3]}},
+        ]
+        self.assertEqual(expected, data)
+
     def test_column_metrics_in_order(self):
         form_data = {
             "metrics": ["z_column", "votes", "a_column"],
@@ -989,6 +1018,24 @@ class TestRoseVis(RabbitaiTestCase):
         }
         self.assertEqual(expected, res)
 
+    def test_rose_vis_get_data_columnar(self):
+        t1 = pd.Timestamp("2000")
+        t2 = pd.Timestamp("2002")
+        df = pd.DataFrame(
+            {
+                DTTM_ALIAS: [t1, t2, t1, t2],
+                "groupA": ["a1", "a1", "b1", "b1"],
+                "metric1": [1, 2, 3, 4],
+            }
+        )
+        fd = {"metrics": ["metric1"], "groupby": ["groupA"]}
+        records = viz.RoseViz(Mock(), fd).get_data(df.copy())
+        fd["result_format"] = "columnar"
+        test_viz = viz.RoseViz(Mock(), fd)
+        # the series are reprocessed as records, the result format is ignored
+        self.assertFalse(test_viz.columnar)
+        self.assertEqual(records, test_viz.get_data(df.copy()))
+
 
 class TestTimeSeriesTableViz(RabbitaiTestCase):
     def test_get_data_metrics(self):
@@ -1162,6 +1209,91 @@ class TestBaseDeckGLViz(RabbitaiTestCase):
         with self.assertRaises(SpatialException):
             test_viz_deckgl.parse_coordinates("fldkjsalkj,fdlaskjfjadlksj")
 
+    def test_process_spatial_data_obj(self):
+        datasource = self.get_datasource_mock()
+        form_data = {
+            "delimited_key": {"type": "delimited", "lonlatCol": "lonlat"},
+            "geohash_key": {"type": "geohash", "geohashCol": "geo"},
+        }
+        test_viz_deckgl = viz.BaseDeckGLViz(datasource, form_data)
+        geohashes = ["dr5", "s", "7"]
+        df = pd.DataFrame(
+            {"lonlat": ["1.23, 3.21", "1.23 3.21", None], "geo": geohashes}
+        )
+        df = test_viz_deckgl.process_spatial_data_obj("delimited_key", df)
+        self.assertEqual(
+            df["delimited_key"].tolist(), [(1.23, 3.21), (1.23, 3.21), None]
+        )
+        df = test_viz_deckgl.process_spatial_data_obj("geohash_key", df)
+        self.assertEqual(
+            df["geohash_key"].tolist(),
+            [test_viz_deckgl.reverse_geohash_decode(code) for code in geohashes],
+        )
+        self.assertEqual(df.columns.tolist(), ["delimited_key", "geohash_key"])
+
+        with self.assertRaises(SpatialException):
+            test_viz_deckgl.process_spatial_data_obj(
+                "delimited_key", pd.DataFrame({"lonlat": ["1.23, 3.21", "NULL"]})
+            )
+
+    def test_columnar_payload(self):
+        datasource = self.get_datasource_mock()
+        form_data = {
+            "spatial": {
+                "type": "latlong",
+                "lonCol": "lon",
+                "latCol": "lat",
+                "reverseCheckbox": True,
+            },
+            "point_radius_fixed": {"type": "metric", "value": "count"},
+            "dimension": "cat",
+            "js_columns": ["name"],
+            "result_format": "columnar",
+        }
+        df = pd.DataFrame(
+            {
+                "lon": [1.5, 2.5],
+                "lat": [3.5, 4.5],
+                "count": [10, None],
+                "cat": ["a", "b"],
+                "name": ["x", "y"],
+            }
+        )
+        test_viz_deckgl = viz.DeckScatterViz(datasource, form_data)
+        test_viz_deckgl.metric = "count"
+        columnar = test_viz_deckgl.get_data(df.copy())
+        self.assertEqual(
+            columnar["columns"],
+            {
+                "metric": [10.0, None],
+                "radius": [10.0, None],
+                "cat_color": ["a", "b"],
+                "position": [[3.5, 1.5], [4.5, 2.5]],
+                DTTM_ALIAS: None,
+                "extraProps": {"name": ["x", "y"]},
+            },
+        )
+
+        # the features have the same properties
+        del form_data["result_format"]
+        test_viz_deckgl = viz.DeckScatterViz(datasource, form_data)
+        test_viz_deckgl.metric = "count"
+        features = test_viz_deckgl.get_data(df.copy())["features"]
+        self.assertEqual(
+            [feature["position"] for feature in features], [(3.5, 1.5), (4.5, 2.5)]
+        )
+        self.assertEqual([feature["cat_color"] for feature in features], ["a", "b"])
+
+        # the features of the vizzes without columnar properties
+        form_data = load_fixture("deck_geojson_form_data.json")
+        form_data["result_format"] = "columnar"
+        test_viz_deckgl = viz.DeckGeoJson(datasource, form_data)
+        result = test_viz_deckgl.get_data(
+            pd.DataFrame({"test_col": ['{"type": "Point"}']})
+        )
+        self.assertNotIn("columns", result)
+        self.assertEqual(result["features"][0]["type"], "Point")
+
     def test_filter_nulls(self):
         test_form_data = {
             "latlong_key": {"type": "latlong", "lonCol": "lon", "latCol": "lat"},
@@ -1263,6 +1395,105 @@ class TestTimeSeriesViz(RabbitaiTestCase):
         ]
         self.assertEqual(expected, viz_data)
 
+    def test_timeseries_columnar_data(self):
+        datasource = self.get_datasource_mock()
+        form_data = {"groupby": ["name"], "metrics": ["sum__payout"]}
+        df = pd.DataFrame(
+            {
+                "name": ["a", "a", "b", "b", "c"],
+                "__timestamp": pd.to_datetime(
+                    ["2018-02-20", "2018-03-09"] * 2 + ["2018-03-09"]
+                ),
+                "sum__payout": [2, 2, 4, nan, nan],
+            }
+        )
+        records = viz.NVD3TimeSeriesViz(datasource, form_data).get_data(df.copy())
+        form_data["result_format"] = "columnar"
+        columnar = viz.NVD3TimeSeriesViz(datasource, form_data).get_data(df.copy())
+        # the series without values are filtered out
+        self.assertEqual([s["key"] for s in columnar], [("a",), ("b",)])
+        for series, columnar_series in zip(records, columnar):
+            self.assertEqual(
+                [value["x"] for value in series["values"]],
+                columnar_series["values"]["x"],
+            )
+            np.testing.assert_equal(
+                [value["y"] for value in series["values"]],
+                columnar_series["values"]["y"],
+            )
+
+    @freeze_time("2021-03-10 12:00:00")
+    def test_incremental_df(self):
+        datasource = self.get_datasource_mock()
+        datasource.uid = f"{uuid.uuid4()}__table"
+        datasource.get_extra_cache_keys.return_value = []
+        datasource.is_rls_supported = False
+        datasource.changed_on = None
+        query_obj = {
+            "granularity": "ds",
+            "is_timeseries": True,
+            "from_dttm": datetime(2021, 3, 7),
+            "to_dttm": datetime(2021, 3, 10, 12),
+            "metrics": ["sum__num"],
+            "extras": {
+                "time_grain_sqla": "P1D",
+                "time_range_endpoints": (
+                    TimeRangeEndpoint.INCLUSIVE,
+                    TimeRangeEndpoint.EXCLUSIVE,
+                ),
+            },
+        }
+        failed_days = set()
+
+        def get_df(test_viz, query_obj):
+            day = query_obj["from_dttm"].day
+            test_viz.query = f"SELECT {day}"
+            if day in failed_days:
+                test_viz.status = QueryStatus.FAILED
+                return pd.DataFrame()
+            test_viz.status = QueryStatus.SUCCESS
+            return pd.DataFrame(
+                {DTTM_ALIAS: [query_obj["from_dttm"]], "sum__num": [day]}
+            )
+
+        def get_queried_days(time_range, query_obj):
+            test_viz = viz.NVD3TimeSeriesViz(
+                datasource, {"metrics": ["sum__num"], "time_range": time_range}
+            )
+            with patch.object(
+                viz.NVD3TimeSeriesViz, "get_df", autospec=True, side_effect=get_df
+            ) as mock_get_df:
+                df = test_viz.get_incremental_df(query_obj)
+            days = {call[0][1]["from_dttm"].day for call in mock_get_df.call_args_list}
+            return test_viz, df, days
+
+        with patch.dict(app.config, {"INCREMENTAL_TIMESERIES_CACHE": True}):
+            test_viz, df, days = get_queried_days("2021-03-07 : now", query_obj)
+            self.assertEqual(days, {7, 8, 9, 10})
+            self.assertEqual(test_viz.status, QueryStatus.SUCCESS)
+            self.assertEqual(df["sum__num"].tolist(), [7, 8, 9, 10])
+
+            # only the open day is queried again, whatever the relative time range
+            test_viz, df, days = get_queried_days("Last 4 days", query_obj)
+            self.assertEqual(days, {10})
+            self.assertEqual(df["sum__num"].tolist(), [7, 8, 9, 10])
+            self.assertEqual(test_viz.query.count("SELECT"), 4)
+
+            # the failed day isn't cached
+            query_obj = {
+                **query_obj,
+                "from_dttm": datetime(2021, 3, 1),
+                "to_dttm": datetime(2021, 3, 3),
+            }
+            failed_days.add(2)
+            test_viz, df, days = get_queried_days("Last week", query_obj)
+            self.assertEqual(test_viz.status, QueryStatus.FAILED)
+            failed_days.clear()
+            test_viz, df, days = get_queried_days("Last week", query_obj)
+            self.assertEqual(days, {2})
+            self.assertEqual(test_viz.status, QueryStatus.SUCCESS)
+            self.assertEqual(df["sum__num"].tolist(), [1, 2])
+
     def test_process_data_resample(self):
         datasource = self.get_datasource_mock()
 